@@ -0,0 +1,347 @@
+"""Deterministic, seeded synthetic datasets for the supported input formats.
+
+Every generator writes its dataset in a streaming fashion (memory stays flat up to
+millions of messages) and returns a dict describing how to parse it:
+`{"parser": <launcher parser name>, "input": <path>, "parser_args": {...}}`.
+"""
+
+import csv
+import json
+import random
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+FORMATS = (
+    "whatsapp_ios",
+    "whatsapp_android",
+    "telegram",
+    "wire",
+    "threema",
+    "generic_json",
+    "romeo",
+)
+
+OWNER_NAME = "Owner"
+_START = datetime(2024, 1, 1, 8, 0, 0)
+_EPOCH = datetime(1970, 1, 1)
+_WORDS = (
+    "hello", "meeting", "tomorrow", "see", "you", "later", "thanks", "photo", "call", "me",
+    "where", "are", "we", "going", "tonight", "ok", "sure", "address", "send", "please",
+    "train", "late", "minutes", "coffee", "lunch", "weekend", "plans", "great", "idea", "no",
+    "yes", "maybe", "sorry", "bye", "home", "work", "office", "car", "money", "price",
+    "Grüße", "schön", "café", "naïve", "日本", "😀", "👍", "über", "straße", "ça",
+)
+# JPEG magic bytes, so MIME sniffing treats the dummy media like real photos.
+_JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+
+class _MessageSource:
+    """Seeded stream of message fields shared by all formats."""
+
+    def __init__(self, seed, chats, media_ratio, media_files):
+        self.rng = random.Random(seed)
+        self.chats = max(1, chats)
+        self.media_ratio = media_ratio
+        self.media_files = max(1, media_files)
+        self.timestamp = _START
+
+    def messages(self, count):
+        """Yield `count` dicts with chat index, sender, timestamp, text, media and owner flag."""
+        rng = self.rng
+        for index in range(count):
+            self.timestamp += timedelta(seconds=rng.randint(1, 180))
+            chat = rng.randrange(self.chats)
+            is_owner = rng.random() < 0.4
+            words = rng.choices(_WORDS, k=rng.randint(2, 24))
+            if rng.random() < 0.02:
+                words.append(f"https://example.com/item/{index}")
+            text = " ".join(words)
+            if rng.random() < 0.03:
+                text += "\n" + " ".join(rng.choices(_WORDS, k=rng.randint(2, 8)))
+            media = None
+            if rng.random() < self.media_ratio:
+                media = media_file_name(rng.randrange(self.media_files))
+            yield {
+                "index": index,
+                "chat": chat,
+                "sender": OWNER_NAME if is_owner else f"Contact {chat}-{rng.randrange(3)}",
+                "is_owner": is_owner,
+                "timestamp": self.timestamp,
+                "text": text,
+                "media": media,
+            }
+
+
+def _epoch_ms(timestamp):
+    # Naive timestamps are UTC; datetime.timestamp() would apply the local timezone.
+    return int((timestamp - _EPOCH).total_seconds() * 1000)
+
+
+def media_file_name(index):
+    """Return the file name of dummy media file `index`."""
+    return f"image_{index:05d}.jpg"
+
+
+def write_media_files(folder, media_files, media_size, seed, name=media_file_name):
+    """Write `media_files` deterministic dummy JPEG files of `media_size` bytes into `folder`."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    for index in range(media_files):
+        body = rng.randbytes(max(0, media_size - len(_JPEG_HEADER)))
+        (folder / name(index)).write_bytes(_JPEG_HEADER + body)
+
+
+def generate_whatsapp(out_dir, count, platform, source, media_size):
+    """WhatsApp chat export (.txt plus media) for iOS or Android."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_media_files(out_dir, source.media_files, media_size, source.rng.random())
+    with open(out_dir / "WhatsApp Chat with Bench.txt", "w", encoding="utf-8") as handle:
+        for msg in source.messages(count):
+            sender = msg["sender"]
+            if platform == "ios":
+                # iOS exports put an attachment on its own message line, without caption.
+                prefix = f"[{msg['timestamp']:%d.%m.%Y, %H:%M}] {sender}: "
+                body = f"<attached: {msg['media']}>" if msg["media"] else msg["text"]
+            else:
+                prefix = f"{msg['timestamp']:%d/%m/%Y, %H:%M} - {sender}: "
+                body = f"{msg['media']} (file attached)\n{msg['text']}" if msg["media"] else msg["text"]
+            handle.write(prefix + body + "\n")
+    return {
+        "parser": "whatsapp_export",
+        "input": str(out_dir),
+        "parser_args": {"platform": platform, "wa_account_name": OWNER_NAME, "chat_name": "Bench Chat"},
+    }
+
+
+def generate_telegram(out_dir, count, source, media_size):
+    """Telegram Desktop JSON export (result.json plus media/)."""
+    out_dir = Path(out_dir)
+    write_media_files(out_dir / "media", source.media_files, media_size, source.rng.random())
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    with open(out_dir / "result.json", "w", encoding="utf-8") as handle:
+        handle.write('{"name": "Bench Telegram Chat", "type": "personal_chat", "id": 1, "messages": [')
+        for msg in source.messages(count):
+            entry = {
+                "id": msg["index"] + 1,
+                "type": "message",
+                "date": f"{msg['timestamp']:%Y-%m-%dT%H:%M:%S}",
+                "from": msg["sender"],
+                "text": msg["text"],
+            }
+            if msg["media"]:
+                entry["file"] = f"media/{msg['media']}"
+            handle.write(("," if msg["index"] else "") + "\n" + encoder.encode(entry))
+        handle.write("\n]}\n")
+    return {"parser": "telegram_desktop_export", "input": str(out_dir), "parser_args": {"tg_account_name": OWNER_NAME}}
+
+
+def _varint(value):
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _pb_field(field_num, value):
+    if isinstance(value, int):
+        return _varint(field_num << 3) + _varint(value)
+    if isinstance(value, str):
+        raw = value.encode("utf-8")
+    else:
+        raw = _pb_message(value)
+    return _varint((field_num << 3) | 2) + _varint(len(raw)) + raw
+
+
+def _pb_message(fields):
+    return b"".join(_pb_field(int(key), value) for key, value in fields.items())
+
+
+def generate_wire(out_dir, count, source, media_size):
+    """Unencrypted Wire backup (.binpb protobuf files plus media)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    write_media_files(out_dir, source.media_files, media_size, source.rng.random())
+    header = _pb_field(1, {"3": {"1": "owner-id"}})
+    with open(out_dir / "conversations_1.binpb", "wb") as handle:
+        handle.write(header)
+        for chat in range(source.chats):
+            handle.write(_pb_field(2, {"1": {"1": f"conv-{chat}"}, "2": f"Wire Chat {chat}"}))
+    senders = {"owner-id": OWNER_NAME}
+    with open(out_dir / "messages_1.binpb", "wb") as handle:
+        handle.write(header)
+        for msg in source.messages(count):
+            sender_id = "owner-id" if msg["is_owner"] else f"user-{msg['sender'].split()[-1]}"
+            senders.setdefault(sender_id, msg["sender"])
+            entry = {
+                "2": _epoch_ms(msg["timestamp"]),
+                "3": {"1": sender_id},
+                "5": {"1": f"conv-{msg['chat']}"},
+            }
+            if msg["media"]:
+                entry["7"] = {"3": msg["media"]}
+            else:
+                # Multi-line text would not survive the parser's schema-less protobuf decoding.
+                entry["6"] = {"1": msg["text"].replace("\n", " ")}
+            handle.write(_pb_field(3, entry))
+    with open(out_dir / "users_1.binpb", "wb") as handle:
+        handle.write(header)
+        for sender_id, name in senders.items():
+            handle.write(_pb_field(4, {"1": {"1": sender_id}, "2": name}))
+    return {"parser": "wire_messenger_backup", "input": str(out_dir), "parser_args": {}}
+
+
+def _threema_media_name(index):
+    return f"message_media_img{index}"
+
+
+def generate_threema(out_dir, count, source, media_size):
+    """Threema CSV backup (contacts.csv, message_<id>.csv per chat, message_media_<uid> files)."""
+    out_dir = Path(out_dir)
+    write_media_files(out_dir, source.media_files, media_size, source.rng.random(), name=_threema_media_name)
+    with open(out_dir / "contacts.csv", "w", encoding="utf-8", newline="") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(["identity_id", "identity", "nick_name", "firstname", "lastname"])
+        for chat in range(source.chats):
+            writer.writerow([f"C{chat}", f"ID{chat:06d}", f"Contact {chat}", "Contact", str(chat)])
+    fieldnames = ["uid", "posted_at", "type", "isoutbox", "isstatusmessage", "body", "caption", "identity"]
+    handles = [
+        open(out_dir / f"message_C{chat}.csv", "w", encoding="utf-8", newline="")
+        for chat in range(source.chats)
+    ]
+    try:
+        writers = [csv.writer(handle) for handle in handles]
+        for writer in writers:
+            writer.writerow(fieldnames)
+        for msg in source.messages(count):
+            media = msg["media"]
+            uid = f"img{int(media[6:11])}" if media else f"msg{msg['index']}"
+            writers[msg["chat"]].writerow([
+                uid,
+                f"{msg['timestamp']:%Y-%m-%dT%H:%M:%SZ}",
+                "IMAGE" if media else "TEXT",
+                "1" if msg["is_owner"] else "0",
+                "0",
+                "" if media else msg["text"],
+                "",
+                f"ID{msg['chat']:06d}",
+            ])
+    finally:
+        for handle in handles:
+            handle.close()
+    return {"parser": "threema_messenger_backup", "input": str(out_dir), "parser_args": {"threema_account_name": OWNER_NAME}}
+
+
+def generate_generic_json(out_dir, count, source, media_size):
+    """Generic JSON export: one JSON file per chat plus media/."""
+    out_dir = Path(out_dir)
+    write_media_files(out_dir / "media", source.media_files, media_size, source.rng.random())
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    handles = [open(out_dir / f"chat_{chat:04d}.json", "w", encoding="utf-8") for chat in range(source.chats)]
+    first = [True] * len(handles)
+    try:
+        for chat, handle in enumerate(handles):
+            handle.write(f'{{"chat_name": "Generic Chat {chat}", "source": "Bench", "messages": [')
+        for msg in source.messages(count):
+            entry = {
+                "sender": msg["sender"],
+                "timestamp": f"{msg['timestamp']:%Y-%m-%dT%H:%M:%S}",
+                "content": msg["text"],
+                "is_owner": msg["is_owner"],
+            }
+            if msg["media"]:
+                entry["media"] = f"media/{msg['media']}"
+            chat = msg["chat"]
+            handles[chat].write(("\n" if first[chat] else ",\n") + encoder.encode(entry))
+            first[chat] = False
+        for handle in handles:
+            handle.write("\n]}\n")
+    finally:
+        for handle in handles:
+            handle.close()
+    return {"parser": "generic_json", "input": str(out_dir), "parser_args": {}}
+
+
+def generate_romeo(out_dir, count, source, media_size):
+    """Romeo Android SQLite database (media is referenced but never part of the DB)."""
+    del media_size  # Romeo images are not exported; the parser marks them as missing.
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    db_path = out_dir / "planetromeo-room.db.123456"
+    conn = sqlite3.connect(str(db_path))
+    try:
+        conn.executescript(
+            "CREATE TABLE MessageEntity (messageId TEXT NOT NULL PRIMARY KEY, chatPartnerId TEXT NOT NULL, "
+            "text TEXT NOT NULL, date INTEGER NOT NULL, transmissionStatus TEXT NOT NULL, "
+            "saved INTEGER NOT NULL, unread INTEGER NOT NULL);"
+            "CREATE TABLE ChatPartnerEntity (profileId TEXT NOT NULL PRIMARY KEY, onlineStatus TEXT, name TEXT NOT NULL);"
+            "CREATE TABLE ImageAttachmentEntity (id INTEGER NOT NULL PRIMARY KEY AUTOINCREMENT, "
+            "parentMessageId TEXT NOT NULL, imageId TEXT NOT NULL, urlToken TEXT NOT NULL);"
+        )
+        conn.executemany(
+            "INSERT INTO ChatPartnerEntity (profileId, onlineStatus, name) VALUES (?, ?, ?)",
+            [(f"P{chat}", "OFFLINE", f"Romeo Contact {chat}") for chat in range(source.chats)],
+        )
+        messages = []
+        images = []
+        for msg in source.messages(count):
+            message_id = f"M{msg['index']}"
+            messages.append((
+                message_id,
+                f"P{msg['chat']}",
+                "" if msg["media"] else msg["text"],
+                _epoch_ms(msg["timestamp"]),
+                "SENT" if msg["is_owner"] else "RECEIVED",
+                0,
+                0,
+            ))
+            if msg["media"]:
+                images.append((message_id, Path(msg["media"]).stem, "token"))
+            if len(messages) >= 10000:
+                _insert_romeo_rows(conn, messages, images)
+        _insert_romeo_rows(conn, messages, images)
+        conn.execute("CREATE INDEX idx_image_parent ON ImageAttachmentEntity (parentMessageId)")
+        conn.commit()
+    finally:
+        conn.close()
+    return {"parser": "romeo_android_db", "input": str(db_path), "parser_args": {"account_name": OWNER_NAME}}
+
+
+def _insert_romeo_rows(conn, messages, images):
+    conn.executemany("INSERT INTO MessageEntity VALUES (?, ?, ?, ?, ?, ?, ?)", messages)
+    conn.executemany(
+        "INSERT INTO ImageAttachmentEntity (parentMessageId, imageId, urlToken) VALUES (?, ?, ?)", images
+    )
+    messages.clear()
+    images.clear()
+
+
+def generate(fmt, out_dir, count, seed=1, chats=20, media_ratio=0.1, media_files=200, media_size=16384):
+    """Generate dataset `fmt` with `count` messages into `out_dir` and return its parse description."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown benchmark format {fmt}. Available: {list(FORMATS)}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    # WhatsApp and Telegram exports always contain a single chat.
+    single_chat = fmt.startswith("whatsapp") or fmt == "telegram"
+    source = _MessageSource(seed, 1 if single_chat else chats, media_ratio, media_files)
+    if fmt == "whatsapp_ios":
+        return generate_whatsapp(out_dir, count, "ios", source, media_size)
+    if fmt == "whatsapp_android":
+        return generate_whatsapp(out_dir, count, "android", source, media_size)
+    if fmt == "telegram":
+        return generate_telegram(out_dir, count, source, media_size)
+    if fmt == "wire":
+        return generate_wire(out_dir, count, source, media_size)
+    if fmt == "threema":
+        return generate_threema(out_dir, count, source, media_size)
+    if fmt == "generic_json":
+        return generate_generic_json(out_dir, count, source, media_size)
+    return generate_romeo(out_dir, count, source, media_size)
@@ -0,0 +1,275 @@
+"""Performance regression gate: reduced-size benchmarks compared against a committed baseline.
+
+    python bench/perf_gate.py             # check against bench/perf_baseline.json
+    python bench/perf_gate.py --refresh   # measure and rewrite the baseline
+    python test/run_tests.py --perf       # unit tests plus this gate
+
+Every repeat of a benchmark is divided by a fixed pure-Python calibration workload
+timed right before it, and the median of these ratios is compared. The baseline
+therefore stays usable across machines of different speed, and drifting machine
+speed during a run (shared or throttled CPUs) cancels out; the tolerance band
+absorbs the remaining noise.
+"""
+
+import argparse
+import gc
+import io
+import json
+import re
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from bench.generators import FORMATS, generate  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "perf_baseline.json"
+# A benchmark fails when its normalized time exceeds baseline * (1 + tolerance).
+DEFAULT_TOLERANCE = 0.5
+DEFAULT_REPEATS = 9
+# Sized so that every benchmark runs for roughly 50 ms or more; shorter workloads made the
+# ratios swing by more than the tolerance between identical runs.
+PARSE_MESSAGES = 20000
+EXPORT_MESSAGES = 20000
+MEDIA_FILES = 300
+MEDIA_SIZE = 8192
+
+
+def _timed(func, state=None):
+    # Collection pauses depend on whatever ran before; keep them out of the timing.
+    gc.collect()
+    gc.disable()
+    try:
+        started = time.perf_counter()
+        func(state)
+        return time.perf_counter() - started
+    finally:
+        gc.enable()
+
+
+def _measure_benchmark(func, repeats, setup=None):
+    """Return the medians of (seconds, seconds / calibration) over interleaved repeats."""
+    # The median ignores single outliers in both directions (a slow scheduler slice, a lucky run).
+    times = []
+    ratios = []
+    for _ in range(repeats):
+        state = setup() if setup is not None else None
+        calibration = _timed(_calibration)
+        elapsed = _timed(func, state)
+        times.append(elapsed)
+        ratios.append(elapsed / calibration)
+    return statistics.median(times), statistics.median(ratios)
+
+
+def _calibration(_state):
+    """Fixed interpreter-bound workload (dicts, strings, regex, JSON) used as the time unit."""
+    pattern = re.compile(r"https?://\S+")
+    rows = []
+    for index in range(20000):
+        text = f"message {index} see https://example.com/{index} thanks"
+        rows.append({"id": index, "text": text.upper(), "url": pattern.search(text).group(0)})
+    json.loads(json.dumps(rows))
+
+
+class _Workspace:
+    """Generated inputs shared by all benchmarks of one gate run."""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.datasets = {
+            fmt: generate(fmt, self.root / fmt, PARSE_MESSAGES, seed=1, chats=10, media_ratio=0.1,
+                          media_files=20, media_size=512)
+            for fmt in FORMATS
+        }
+        self.media_folder = self.root / "media_source"
+        self.media_folder.mkdir()
+        for index in range(MEDIA_FILES):
+            (self.media_folder / f"file_{index:04d}.bin").write_bytes(bytes([index % 256]) * MEDIA_SIZE)
+        self.media_messages = [
+            {"sender": "A", "content": "", "timestamp": "2024-01-01T00:00:00",
+             "media": f"file_{index % MEDIA_FILES:04d}.bin", "media_mime": "application/octet-stream"}
+            for index in range(MEDIA_FILES * 2)
+        ]
+        self.export_messages = [
+            {"sender": f"Sender {index % 7}", "content": f"Export message {index} with some text",
+             "timestamp": f"2024-01-01T{index // 3600 % 24:02d}:{index // 60 % 60:02d}:{index % 60:02d}",
+             "media": None, "is_owner": index % 3 == 0, "chat": f"Chat {index % 5}"}
+            for index in range(EXPORT_MESSAGES)
+        ]
+        self.wire_bytes = (Path(self.datasets["wire"]["input"]) / "messages_1.binpb").read_bytes()
+        self._outputs = 0
+
+    def fresh_output(self):
+        self._outputs += 1
+        folder = self.root / f"out_{self._outputs}"
+        folder.mkdir()
+        return folder
+
+
+def _parse_benchmark(fmt):
+    def run(workspace, _state):
+        import bubbly_launcher
+        from utils import prepare_input_generic
+
+        dataset = workspace.datasets[fmt]
+        parser = bubbly_launcher.PARSERS[dataset["parser"]]()
+        input_path, media_folder = prepare_input_generic(dataset["input"])
+        if dataset["parser"] == "generic_json":
+            messages = chain.from_iterable(
+                parser.iter_messages(path, media_folder=media_folder, metadata={}, **dataset["parser_args"])
+                for path in parser.resolve_json_paths(input_path)
+            )
+        else:
+            messages = parser.iter_messages(input_path, media_folder=media_folder, metadata={},
+                                            **dataset["parser_args"])
+        for _ in messages:
+            pass
+    return run
+
+
+def _copy_media_benchmark(workspace, output_folder):
+    from exporter import BubblyExporter
+
+    messages = [dict(msg) for msg in workspace.media_messages]
+    BubblyExporter(messages, workspace.media_folder, output_folder, {"chat_name": "Perf"})._copy_media()
+
+
+def _export_html_benchmark(workspace, output_folder):
+    from exporter import BubblyExporter
+
+    messages = [dict(msg) for msg in workspace.export_messages]
+    BubblyExporter(messages, workspace.media_folder, output_folder, {"chat_name": "Perf"}).export_html()
+
+
+def _wire_decode_benchmark(workspace, _state):
+    from parsers.wire_messenger_backup import decode_protobuf_to_dict
+
+    decode_protobuf_to_dict(workspace.wire_bytes)
+
+
+def _benchmarks():
+    """Return (name, func(workspace, state), needs_output_folder) for every gated benchmark."""
+    benchmarks = [(f"parse_{fmt}", _parse_benchmark(fmt), False) for fmt in FORMATS]
+    benchmarks.extend([
+        ("copy_media", _copy_media_benchmark, True),
+        ("export_html", _export_html_benchmark, True),
+        ("wire_decode", _wire_decode_benchmark, False),
+    ])
+    return benchmarks
+
+
+def measure(repeats=DEFAULT_REPEATS):
+    """Run the benchmarks and return `{"calibration_s": ..., "benchmarks": {name: {...}}}`."""
+    results = {}
+    root = Path(tempfile.mkdtemp(prefix="bubbly_perf_"))
+    try:
+        workspace = _Workspace(root)
+        for name, func, needs_output in _benchmarks():
+            setup = workspace.fresh_output if needs_output else None
+            # The exporter reports every written file; keep the gate output readable.
+            with redirect_stdout(io.StringIO()):
+                seconds, normalized = _measure_benchmark(
+                    lambda state, func=func: func(workspace, state), repeats, setup=setup
+                )
+            results[name] = {"seconds": round(seconds, 6), "normalized": round(normalized, 4)}
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+    # Reported for reference only; every benchmark is normalized by its own interleaved calibrations.
+    calibration_s = statistics.median(_timed(_calibration) for _ in range(repeats))
+    return {"calibration_s": round(calibration_s, 6), "benchmarks": results}
+
+
+def load_baseline(path=BASELINE_PATH):
+    """Return the baseline document, or None if it does not exist."""
+    path = Path(path)
+    if not path.is_file():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def refresh_baseline(path=BASELINE_PATH, repeats=DEFAULT_REPEATS, tolerance=None):
+    """Measure and write a new baseline; tolerances of the old file are kept unless `tolerance` is given."""
+    from bubbly_version import BUBBLY_VERSION
+
+    previous = load_baseline(path) or {}
+    measured = measure(repeats=repeats)
+    document = {
+        "bubbly_version": BUBBLY_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "tolerance": tolerance if tolerance is not None else previous.get("tolerance", DEFAULT_TOLERANCE),
+        "tolerances": previous.get("tolerances", {}),
+        **measured,
+    }
+    Path(path).write_text(json.dumps(document, indent=2) + "\n", encoding="utf-8")
+    return document
+
+
+def compare(baseline, measured, tolerance=None):
+    """Return `(rows, regressions)`; rows are (name, baseline, current, ratio, limit, status)."""
+    default_tolerance = baseline.get("tolerance", DEFAULT_TOLERANCE) if tolerance is None else tolerance
+    tolerances = baseline.get("tolerances", {})
+    rows = []
+    regressions = []
+    for name, current in measured["benchmarks"].items():
+        reference = baseline.get("benchmarks", {}).get(name)
+        if reference is None:
+            rows.append((name, None, current["normalized"], None, None, "new"))
+            continue
+        limit = 1 + tolerances.get(name, default_tolerance)
+        ratio = current["normalized"] / reference["normalized"]
+        status = "REGRESSION" if ratio > limit else "ok"
+        rows.append((name, reference["normalized"], current["normalized"], ratio, limit, status))
+        if status == "REGRESSION":
+            regressions.append(name)
+    return rows, regressions
+
+
+def check(path=BASELINE_PATH, repeats=DEFAULT_REPEATS, tolerance=None):
+    """Measure, compare against the baseline and print a table; return True if nothing regressed."""
+    baseline = load_baseline(path)
+    if baseline is None:
+        print(f"No performance baseline at {path}; create one with: python bench/perf_gate.py --refresh")
+        return False
+    measured = measure(repeats=repeats)
+    rows, regressions = compare(baseline, measured, tolerance=tolerance)
+    print(f"Performance gate (calibration {measured['calibration_s'] * 1000:.1f} ms, "
+          f"baseline from {baseline.get('created_at')} / Bubbly {baseline.get('bubbly_version')}):")
+    for name, reference, current, ratio, limit, status in rows:
+        if reference is None:
+            print(f" - {name:<24} {'-':>9} {current:>9.3f}   (not in baseline)")
+            continue
+        print(f" - {name:<24} {reference:>9.3f} {current:>9.3f}  x{ratio:.2f} (limit x{limit:.2f})  {status}")
+    if regressions:
+        print(f"Performance regressions: {', '.join(regressions)}")
+        return False
+    print("Performance gate passed")
+    return True
+
+
+def main(argv=None):
+    """Run the performance gate command line."""
+    parser = argparse.ArgumentParser(description="Bubbly performance regression gate")
+    parser.add_argument("--refresh", action="store_true", help="Measure and rewrite the baseline file")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline file (default: bench/perf_baseline.json)")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Repeats per benchmark, the median is used")
+    parser.add_argument("--tolerance", type=float, help="Allowed slowdown, e.g. 0.5 = 50%% (default: from baseline)")
+    args = parser.parse_args(argv)
+    if args.refresh:
+        document = refresh_baseline(args.baseline, repeats=args.repeats, tolerance=args.tolerance)
+        print(f"Baseline written to {args.baseline} ({len(document['benchmarks'])} benchmarks)")
+        return 0
+    return 0 if check(args.baseline, repeats=args.repeats, tolerance=args.tolerance) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,252 @@
+"""Benchmark the parsers and the exporter on generated datasets.
+
+Example:
+    python bench/run_bench.py --sizes 10000 100000 --output bench_results.json
+
+Each (format, size, case) runs in a fresh interpreter so peak RSS is per case.
+Cases: `parse` streams all messages out of the parser; `export` runs the whole
+launcher flow (single report) and reports the stage metrics of the run.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import chain
+from pathlib import Path
+from types import SimpleNamespace
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from bench.generators import FORMATS, generate  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+CASES = ("parse", "export")
+DATASET_FILE = "dataset.json"
+
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _input_files(dataset):
+    """Return the source files a parser reads (media excluded), as the launcher logs them."""
+    from parsers.generic_json_parser import GenericJsonParser
+    from utils import collect_processed_files
+
+    input_path = Path(dataset["input"])
+    json_paths = None
+    if dataset["parser"] == "generic_json":
+        json_paths = GenericJsonParser().resolve_json_paths(input_path)
+    return [Path(path) for path in collect_processed_files(dataset["parser"], input_path, json_paths=json_paths)]
+
+
+def _run_parse(dataset):
+    import bubbly_launcher
+    from utils import prepare_input_generic
+
+    parser_class = bubbly_launcher.PARSERS[dataset["parser"]]
+    parser = parser_class()
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    input_path, media_folder = prepare_input_generic(dataset["input"])
+    kwargs = dict(dataset["parser_args"])
+    if dataset["parser"] == "generic_json":
+        streams = [
+            parser.iter_messages(path, media_folder=media_folder, metadata={}, **kwargs)
+            for path in parser.resolve_json_paths(input_path)
+        ]
+        messages = chain.from_iterable(streams)
+    else:
+        messages = parser.iter_messages(input_path, media_folder=media_folder, metadata={}, **kwargs)
+    count = sum(1 for _ in messages)
+    return {
+        "messages": count,
+        "wall_s": time.perf_counter() - wall_start,
+        "cpu_s": time.process_time() - cpu_start,
+    }
+
+
+def _run_export(dataset, split_by_chat):
+    import bubbly_launcher
+
+    with tempfile.TemporaryDirectory(prefix="bubbly_bench_out_") as output:
+        args = SimpleNamespace(
+            parser=dataset["parser"],
+            input=dataset["input"],
+            output=output,
+            creator="Bench",
+            case="BENCH",
+            logo=None,
+            parser_args=None,
+            split_by_chat=split_by_chat,
+            log_level="info",
+            _banner_shown=True,
+            _config={"parser_args": dataset["parser_args"]},
+        )
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        result = bubbly_launcher.run_with_args(args)
+        wall_s = time.perf_counter() - wall_start
+        cpu_s = time.process_time() - cpu_start
+        metrics_path = next((result["output_folder"] / "log").glob("bubbly_run_*.metrics.json"))
+        stages = json.loads(metrics_path.read_text(encoding="utf-8"))["stages"]
+    return {"messages": result["message_count"], "wall_s": wall_s, "cpu_s": cpu_s, "stages": stages}
+
+
+def run_case(case, dataset_dir, split_by_chat=False):
+    """Run one benchmark case in this process and return its result dict."""
+    dataset = json.loads((Path(dataset_dir) / DATASET_FILE).read_text(encoding="utf-8"))
+    input_bytes = sum(path.stat().st_size for path in _input_files(dataset))
+    if case == "parse":
+        result = _run_parse(dataset)
+    else:
+        result = _run_export(dataset, split_by_chat)
+    wall_s = result["wall_s"]
+    result.update({
+        "format": dataset["format"],
+        "size": dataset["size"],
+        "case": case,
+        "input_bytes": input_bytes,
+        "messages_per_s": round(result["messages"] / wall_s, 1) if wall_s > 0 else None,
+        "mb_per_s": round(input_bytes / wall_s / 1e6, 3) if wall_s > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+        "wall_s": round(wall_s, 4),
+        "cpu_s": round(result["cpu_s"], 4),
+    })
+    return result
+
+
+def ensure_dataset(work_dir, fmt, size, options):
+    """Generate a dataset unless an identical one already exists; return its folder."""
+    name = (
+        f"{fmt}_{size}_seed{options['seed']}_chats{options['chats']}_media{options['media_ratio']}"
+        f"x{options['media_files']}x{options['media_size']}"
+    )
+    dataset_dir = Path(work_dir) / name
+    if (dataset_dir / DATASET_FILE).is_file():
+        return dataset_dir
+    started = time.perf_counter()
+    description = generate(fmt, dataset_dir / "input", size, **options)
+    description.update({"format": fmt, "size": size, "options": options})
+    (dataset_dir / DATASET_FILE).write_text(json.dumps(description, indent=2), encoding="utf-8")
+    print(f"Generated {fmt} x {size} in {time.perf_counter() - started:.1f}s ({dataset_dir})", file=sys.stderr)
+    return dataset_dir
+
+
+def _run_case_subprocess(case, dataset_dir, split_by_chat, verbose):
+    with tempfile.TemporaryDirectory(prefix="bubbly_bench_") as tmp:
+        result_path = Path(tmp) / "result.json"
+        command = [
+            sys.executable, str(Path(__file__).resolve()),
+            "--run-case", case, "--dataset", str(dataset_dir), "--result", str(result_path),
+        ]
+        if split_by_chat:
+            command.append("--split-by-chat")
+        completed = subprocess.run(
+            command,
+            cwd=str(REPO_ROOT),
+            stdout=None if verbose else subprocess.DEVNULL,
+            stderr=None if verbose else subprocess.PIPE,
+            text=True,
+            check=False,
+        )
+        if completed.returncode != 0:
+            raise RuntimeError(f"Benchmark case {case} failed for {dataset_dir}:\n{completed.stderr or ''}")
+        return json.loads(result_path.read_text(encoding="utf-8"))
+
+
+def run_benchmarks(formats, sizes, cases, work_dir, options, split_by_chat=False, verbose=False):
+    """Run all requested benchmarks; return the results document."""
+    from bubbly_version import BUBBLY_VERSION
+
+    results = []
+    for fmt in formats:
+        for size in sizes:
+            dataset_dir = ensure_dataset(work_dir, fmt, size, options)
+            for case in cases:
+                result = _run_case_subprocess(case, dataset_dir, split_by_chat, verbose)
+                results.append(result)
+                print(
+                    f"{fmt:<18} {size:>9} {case:<7} {result['wall_s']:>9.2f}s "
+                    f"{result['messages_per_s'] or 0:>12.0f} msg/s {result['mb_per_s'] or 0:>8.2f} MB/s "
+                    f"peak {result['peak_rss_mb']} MB",
+                    file=sys.stderr,
+                )
+    return {
+        "bubbly_version": BUBBLY_VERSION,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "options": {**options, "split_by_chat": split_by_chat},
+        "results": results,
+    }
+
+
+def build_arg_parser():
+    """Return the benchmark command-line parser."""
+    parser = argparse.ArgumentParser(description="Benchmark Bubbly parsers and exporter on synthetic data")
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS, metavar="FORMAT",
+                        help=f"Formats to benchmark (default: all of {', '.join(FORMATS)})")
+    parser.add_argument("--sizes", nargs="+", type=int, default=[10000], help="Messages per dataset (default: 10000)")
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=CASES, help="Cases to run (default: all)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed of the generators (default: 1)")
+    parser.add_argument("--chats", type=int, default=20, help="Chats per multi-chat dataset (default: 20)")
+    parser.add_argument("--media-ratio", type=float, default=0.1, help="Share of messages with media (default: 0.1)")
+    parser.add_argument("--media-files", type=int, default=200, help="Distinct media files (default: 200)")
+    parser.add_argument("--media-size", type=int, default=16384, help="Bytes per media file (default: 16384)")
+    parser.add_argument("--split-by-chat", action="store_true", help="Export one report per chat in the export case")
+    parser.add_argument("--work-dir", default=str(Path(tempfile.gettempdir()) / "bubbly_bench"),
+                        help="Folder for generated datasets, reused across runs (default: <tmp>/bubbly_bench)")
+    parser.add_argument("--output", help="Write the results JSON to this file (default: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Show the output of the benchmarked runs")
+    parser.add_argument("--run-case", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--dataset", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    return parser
+
+
+def main(argv=None):
+    """Run the benchmark command line."""
+    args = build_arg_parser().parse_args(argv)
+    if args.run_case:
+        result = run_case(args.run_case, args.dataset, split_by_chat=args.split_by_chat)
+        Path(args.result).write_text(json.dumps(result), encoding="utf-8")
+        return
+    options = {
+        "seed": args.seed,
+        "chats": args.chats,
+        "media_ratio": args.media_ratio,
+        "media_files": args.media_files,
+        "media_size": args.media_size,
+    }
+    document = run_benchmarks(
+        args.formats, args.sizes, args.cases, args.work_dir, options,
+        split_by_chat=args.split_by_chat, verbose=args.verbose,
+    )
+    text = json.dumps(document, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,13 @@
 """CLI launcher for parsing chat exports and generating Bubbly reports."""
 
 import re
+from contextlib import ExitStack, nullcontext
 from datetime import datetime
+from itertools import chain, islice
 from pathlib import Path
 
 from bubbly_version import BUBBLY_VERSION
-from exporter import BubblyExporter
+from exporter import EXPORT_BATCH_SIZE, BubblyExporter
 from parsers.generic_json_parser import GenericJsonParser
 from parsers.romeo_android_db import RomeoAndroidDbParser
 from parsers.telegram_desktop_chat_export import TelegramDesktopChatExportParser
@@ -13,7 +15,14 @@ from parsers.threema_messenger_backup import ThreemaMessengerBackupParser
 from parsers.wire_messenger_backup import WireMessengerBackupParser
 from parsers.whatsapp_chat_export import WhatsAppChatExportParser
 from utils import (
+    ContentMediaStore,
+    MessageStore,
+    MessageSummary,
+    ParseCache,
     RunLogger,
+    RunMetrics,
+    RunProfiler,
+    TraceRecorder,
     collect_processed_files,
     export_split_by_chat,
     log_fallback_exception,
@@ -21,7 +30,6 @@ from utils import (
     parse_args,
     parse_parser_args,
     prepare_input_generic,
-    print_cli_summary,
     write_fallback_exception_log,
 )
 
@@ -54,10 +62,52 @@ def print_banner():
     print(banner)
 
 
+def _iter_json_streams(parser_instance, json_paths, media_folder, parser_kwargs):
+    """Lazily stream messages of further generic JSON files (metadata of the first file wins)."""
+    for json_path in json_paths:
+        yield from parser_instance.iter_messages(
+            json_path,
+            media_folder=media_folder,
+            **parser_kwargs,
+        )
+
+
+def _spill_messages(message_store, messages, metrics):
+    """Move a message stream into `message_store` batch by batch; parse time stays in the parse stage."""
+    iterator = iter(messages)
+    while True:
+        batch = list(islice(iterator, EXPORT_BATCH_SIZE))
+        if not batch:
+            break
+        with metrics.stage("spill_write", items=len(batch)):
+            message_store.add(batch)
+    metrics.add("spill_write", byte_count=message_store.size_bytes())
+
+
+def _total_file_size(paths):
+    total = 0
+    for path in paths:
+        try:
+            total += Path(path).stat().st_size
+        except OSError:
+            continue
+    return total
+
+
 def run_with_args(args):
     """Run the end-to-end launcher flow with a prepared argument namespace."""
     output_base = None
     run_logger_started = False
+    metrics = RunMetrics()
+    profiler = None
+    if getattr(args, "profile", False):
+        profiler = RunProfiler()
+        metrics.on_stage_end = profiler.stage_finished
+        profiler.start()
+    tracer = None
+    if getattr(args, "trace", False):
+        tracer = TraceRecorder()
+        tracer.activate()
     try:
         args.output = str(normalize_user_path(args.output, must_exist=False))
         if getattr(args, "logo", None):
@@ -67,10 +117,11 @@ def run_with_args(args):
             raise ValueError(f"Unknown parser {args.parser}. Available: {list(PARSERS.keys())}")
         parser_instance = parser_class()
 
-        if hasattr(parser_instance, "prepare_input"):
-            input_path, media_folder = parser_instance.prepare_input(args.input)
-        else:
-            input_path, media_folder = prepare_input_generic(args.input)
+        with metrics.stage("prepare_input"):
+            if hasattr(parser_instance, "prepare_input"):
+                input_path, media_folder = parser_instance.prepare_input(args.input)
+            else:
+                input_path, media_folder = prepare_input_generic(args.input)
 
         config_parser_args = {}
         if isinstance(getattr(args, "_config", None), dict):
@@ -82,12 +133,29 @@ def run_with_args(args):
             "case": args.case,
             "chat_name": parser_kwargs.get("chat_name"),
         })
+        sort_memory_mb = getattr(args, "sort_memory_mb", None)
+        spill_setting = getattr(args, "spill", None)
+        spill_root = None
+        if spill_setting not in (None, False):
+            spill_root = (
+                spill_setting if isinstance(spill_setting, str) and spill_setting else Path(args.output)
+            )
+        # Resource settings for parsers that merge several sources into one timeline (Threema):
+        # same memory budget as the export sort, sorted runs next to the output or spill folder
+        # instead of the system temp (often a small tmpfs). Not parser_args, so not in the cache key.
+        sort_temp_dir = normalize_user_path(spill_root or args.output, must_exist=False)
+        sort_kwargs = {"sort_memory_mb": sort_memory_mb, "sort_temp_dir": sort_temp_dir}
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_base = Path(args.output) / f"bubbly_{timestamp}"
         safe_case = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(args.case)).strip("._-")
         if not safe_case:
             safe_case = "case"
+        incremental = bool(getattr(args, "incremental", False))
+        if incremental:
+            # A stable folder per case, so later runs can update the previous export.
+            output_base = Path(args.output) / f"bubbly_{safe_case}"
+        else:
+            output_base = Path(args.output) / f"bubbly_{timestamp}"
 
         report_path = None
         with RunLogger(
@@ -97,85 +165,185 @@ def run_with_args(args):
             cli_parser_args=cli_parser_args,
             parser_kwargs=parser_kwargs,
             log_level=args.log_level,
-        ):
+        ) as run_logger, ExitStack() as resources:
             run_logger_started = True
             if not getattr(args, "_banner_shown", False):
                 print_banner()
 
+            parse_cache = None
+            parse_cache_setting = getattr(args, "parse_cache", None)
+            if parse_cache_setting not in (None, False):
+                parse_cache_root = (
+                    parse_cache_setting if isinstance(parse_cache_setting, str) and parse_cache_setting
+                    else Path(args.output) / "bubbly_parse_cache"
+                )
+                parse_cache = resources.enter_context(ParseCache(
+                    normalize_user_path(parse_cache_root, must_exist=False),
+                    BUBBLY_VERSION,
+                    hash_inputs=getattr(args, "parse_cache_hash", False),
+                ))
+
+            json_paths = []
             if parser_class is GenericJsonParser:
                 json_file = parser_kwargs.get("json_file")
                 json_paths = parser_instance.resolve_json_paths(input_path, json_file=json_file)
                 processed_files = collect_processed_files(args.parser, input_path, json_paths=json_paths)
-                print(f"Processed source files ({len(processed_files)}):")
-                for file_path in processed_files:
-                    print(f" - {file_path}")
-                messages_all = []
-                metadata_all = None
-
-                for json_path in json_paths:
-                    run_kwargs = dict(parser_kwargs)
-                    messages, metadata = parser_instance.parse(
-                        json_path,
-                        media_folder=media_folder,
-                        **run_kwargs,
-                    )
-                    messages_all.extend(messages)
-                    if metadata_all is None:
-                        metadata_all = metadata
-
-                if metadata_all is None:
-                    raise ValueError("No JSON messages found to export")
-
-                metadata_all = dict(metadata_all)
-                if len(json_paths) > 1 and not args.split_by_chat:
-                    metadata_all["chat_name"] = "Multiple chats"
             else:
                 processed_files = collect_processed_files(args.parser, input_path)
-                print(f"Processed source files ({len(processed_files)}):")
-                for file_path in processed_files:
-                    print(f" - {file_path}")
-                messages_all, metadata_all = parser_instance.parse(
-                    input_path,
+            print(f"Processed source files ({len(processed_files)}):")
+            for file_path in processed_files:
+                print(f" - {file_path}")
+            if parser_class is GenericJsonParser and not json_paths:
+                raise ValueError("No JSON messages found to export")
+
+            cached = None
+            if parse_cache is not None:
+                cache_key = parse_cache.make_key(
+                    args.parser, normalize_user_path(args.input, must_exist=True), parser_kwargs
+                )
+                cached = parse_cache.load(cache_key)
+                print(f"Parse cache {'hit' if cached else 'miss'}: {cache_key[:12]} ({parse_cache.root})")
+
+            if cached is not None:
+                messages_all, metadata_all = cached
+                # Report fields come from this run, not from the run that filled the cache.
+                metadata_all.update({"user": args.creator, "case": args.case})
+            elif parser_class is GenericJsonParser:
+                metadata_all = {}
+                first_stream = parser_instance.iter_messages(
+                    json_paths[0],
                     media_folder=media_folder,
+                    metadata=metadata_all,
                     **parser_kwargs,
                 )
-
-            output_folder = output_base
-            if args.split_by_chat:
-                export_split_by_chat(
-                    messages_all,
-                    metadata_all,
-                    media_folder,
-                    output_folder,
-                    args.logo,
-                    safe_case,
+                messages_all = chain(
+                    first_stream,
+                    _iter_json_streams(parser_instance, json_paths[1:], media_folder, parser_kwargs),
                 )
+            elif hasattr(parser_instance, "iter_messages"):
+                metadata_all = {}
+                messages_all = parser_instance.iter_messages(
+                    input_path,
+                    media_folder=media_folder,
+                    metadata=metadata_all,
+                    # Merged, so a stray sort_memory_mb parser arg cannot clash with the run setting.
+                    **{**parser_kwargs, **sort_kwargs},
+                )
+            else:
+                with metrics.stage("parse"):
+                    messages_all, metadata_all = parser_instance.parse(
+                        input_path,
+                        media_folder=media_folder,
+                        **parser_kwargs,
+                    )
+            if cached is None:
+                # Parsers stream, so parse time is spent whenever the exporter pulls the next message.
+                metrics.add("parse", byte_count=_total_file_size(processed_files))
+                messages_all = metrics.timed_iter("parse", messages_all)
             else:
-                output_html_name = f"{safe_case}_report.html"
-                exporter = BubblyExporter(
-                    messages_all,
-                    media_folder,
-                    output_folder,
-                    metadata_all,
-                    logo_path=args.logo,
+                messages_all = metrics.timed_iter("parse_cache_load", messages_all)
+            if cached is None and parse_cache is not None:
+                messages_all = parse_cache.record(cache_key, messages_all, metadata_all)
+
+            if parser_class is GenericJsonParser and len(json_paths) > 1 and not args.split_by_chat:
+                # A copy, so the parse cache keeps the parser's own metadata.
+                metadata_all = {**metadata_all, "chat_name": "Multiple chats"}
+
+            if spill_root is not None:
+                message_store = resources.enter_context(
+                    MessageStore(normalize_user_path(spill_root, must_exist=False))
                 )
-                exporter.export_html(output_html_name=output_html_name)
-                report_path = output_folder / output_html_name
+                _spill_messages(message_store, messages_all, metrics)
+                print(f"Spilled {len(message_store)} messages to {message_store.db_path}")
+                # Exporters read timestamp-ordered cursors from the store instead of the parser stream.
+                messages_all = message_store
+
+            media_store_root = None
+            if getattr(args, "media_layout", None) == "content" or getattr(args, "media_store", None):
+                media_store_root = getattr(args, "media_store", None) or Path(args.output) / "bubbly_media_store"
+            with (
+                ContentMediaStore(normalize_user_path(media_store_root))
+                if media_store_root else nullcontext()
+            ) as media_store:
+                summary = MessageSummary()
+                exporter_options = {
+                    "media_workers": getattr(args, "media_workers", None),
+                    "media_mode": getattr(args, "media_mode", None),
+                    "media_store": media_store,
+                    "message_layout": getattr(args, "message_layout", None),
+                    "chunk_size": getattr(args, "chunk_size", None),
+                    "payload_compression": getattr(args, "payload_compression", None),
+                    "sort_memory_mb": sort_memory_mb,
+                    "search_index": getattr(args, "search_index", True),
+                }
+                output_folder = output_base
+                if args.split_by_chat:
+                    export_split_by_chat(
+                        messages_all,
+                        metadata_all,
+                        media_folder,
+                        output_folder,
+                        args.logo,
+                        safe_case,
+                        summary=summary,
+                        jobs=getattr(args, "jobs", None),
+                        incremental=incremental,
+                        metrics=metrics,
+                        **exporter_options,
+                    )
+                else:
+                    output_html_name = f"{safe_case}_report.html"
+                    exporter = BubblyExporter(
+                        messages_all,
+                        media_folder,
+                        output_folder,
+                        metadata_all,
+                        logo_path=args.logo,
+                        summary=summary,
+                        metrics=metrics,
+                        **exporter_options,
+                    )
+                    exporter.export_html(output_html_name=output_html_name)
+                    report_path = output_folder / output_html_name
+                if media_store is not None:
+                    print(
+                        f"Media store: {media_store.root} "
+                        f"(hashed {media_store.hashed_count}, newly stored {media_store.stored_count})"
+                    )
 
-            print_cli_summary(messages_all, metadata_all)
+            if profiler is not None:
+                profiler.stop()
+            summary.print_summary(metadata_all, metrics=metrics)
+            metrics_path = run_logger.log_path.with_suffix(".metrics.json")
+            metrics.write(metrics_path)
+            print(f"Run metrics: {metrics_path}")
+            if profiler is not None:
+                profiler.print_hot_functions()
+                prof_path, alloc_path = profiler.write(run_logger.log_path)
+                print(f"Profile: {prof_path} (open with `python -m pstats` or snakeviz)")
+                print(f"Allocation snapshots: {alloc_path}")
+            if tracer is not None:
+                trace_path = run_logger.log_path.with_suffix(".trace.json")
+                tracer.write(trace_path)
+                print(f"Trace: {trace_path} (open in https://ui.perfetto.dev or chrome://tracing)")
         return {
             "output_folder": output_folder,
             "report_path": report_path,
-            "message_count": len(messages_all),
+            "message_count": summary.total_messages,
         }
     except SystemExit:
         raise
     except Exception as exc:
+        if profiler is not None:
+            profiler.stop()
         fallback_base = (output_base / "log") if output_base is not None else None
         log_path = write_fallback_exception_log(exc, output_base=fallback_base)
         if not run_logger_started:
             log_fallback_exception(exc, log_path)
         raise
+    finally:
+        if tracer is not None:
+            tracer.deactivate()
 
 
 def main():
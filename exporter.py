@@ -1,17 +1,473 @@
 """HTML exporter for Bubbly chat reports."""
 
+from abc import ABC, abstractmethod
+import base64
+import errno
+import gzip
+import hashlib
+import io
+import os
 import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timedelta
+from urllib.parse import quote
 import json
 import mimetypes
+import zlib
 from bubbly_version import BUBBLY_VERSION
+from parsers.base_parser import message_json_default
+from utils.external_sort import ExternalSorter
+from utils.metrics import RunMetrics
+from utils.mime_detection import detect_mime, extension_for_mime
+from utils.report_template import load_report_template
+from utils.search_index import SearchIndexBuilder
+from utils.tracing import trace_span
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Messages are pulled from the input stream and processed in batches of this size.
+EXPORT_BATCH_SIZE = 1000
+# Default number of threads used to probe and copy media files.
+DEFAULT_MEDIA_WORKERS = 4
+# Encoder for the message array embedded in the HTML; same output as json.dumps(..., ensure_ascii=False).
+_HTML_JSON_ENCODER = json.JSONEncoder(ensure_ascii=False, default=message_json_default)
+# Read size when streaming the spooled message array into the report.
+_SPOOL_CHUNK_SIZE = 1024 * 1024
+# Where the message data goes: embedded in the page ("inline") or written as
+# data/<report>/chunk_NNNN.js files that chat.js loads progressively ("chunks").
+MESSAGE_LAYOUTS = ("inline", "chunks")
+# Messages per data chunk file in the "chunks" layout.
+DEFAULT_CHUNK_SIZE = 5000
+# Optional compression of the inline message payload (base64 in the page, decoded by
+# chat.js). "deflate" is the zlib format, as understood by DecompressionStream("deflate").
+PAYLOAD_COMPRESSIONS = ("none", "gzip", "deflate")
+_COMPRESS_LEVEL = 6
+# Bytes per base64 block when streaming the compressed payload; a multiple of 3 avoids padding.
+_BASE64_BLOCK_SIZE = 3 * 256 * 1024
+# How media files are materialized in the output folder. Every mode falls back
+# to a plain copy per file when the filesystem does not support it.
+# "auto" tries reflink, then hardlink, then copy.
+MEDIA_MODES = ("copy", "hardlink", "symlink", "reflink", "auto")
+# Linux FICLONE ioctl request number (_IOW(0x94, 9, int)).
+_FICLONE = 0x40049409
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MS = timedelta(milliseconds=1)
+# Columnar message payload read by chat.js: dictionary-encoded columns (ids into string
+# tables shared by all blocks of a report), the owner flag, and plain value columns.
+# Any other message field goes into a sparse per-block "extra" object.
+_TABLE_COLUMNS = (("sender", "sender"), ("chat", "chat"), ("mime", "media_mime"))
+_VALUE_COLUMNS = (("timestamp", "timestamp"), ("ts_ms", "ts_ms"), ("content", "content"), ("media", "media"))
+_COLUMN_FIELDS = frozenset(
+    [field for _name, field in _TABLE_COLUMNS] + [field for _name, field in _VALUE_COLUMNS] + ["is_owner"]
+)
+# Legacy WhatsApp timestamp layouts that chat.js used to parse itself.
+_LEGACY_TIMESTAMP_FORMATS = ("%d/%m/%Y, %H:%M", "%d.%m.%Y, %H:%M")
+
+
+def timestamp_ms(value):
+    """Return the `ts_ms` of a message timestamp, or None if it cannot be parsed.
+
+    Timestamps are the wall-clock time shown in the report and are counted as if they
+    were UTC, so chat.js can compare them with wall-clock filter bounds without knowing
+    the viewer's time zone. An offset is dropped, not applied: "11:00+02:00" is shown,
+    filtered and sorted as 11:00.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    text = value.strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        parsed = None
+        for layout in _LEGACY_TIMESTAMP_FORMATS:
+            try:
+                parsed = datetime.strptime(text, layout)
+                break
+            except ValueError:
+                continue
+        if parsed is None:
+            return None
+    parsed = parsed.replace(tzinfo=None)
+    return (parsed - _EPOCH) // _ONE_MS
+
+
+def _ts_sort_key(msg):
+    # Messages without a usable timestamp go last, as chat.js used to show them.
+    ts = msg["ts_ms"]
+    return (ts is None, ts or 0)
+
+
+def _reflink_file(src, dest):
+    """Clone `src` into `dest` sharing extents (FICLONE); raise OSError if the filesystem cannot.
+
+    copy_file_range is not used: without CoW support it silently makes a full byte copy,
+    which would keep `auto` from falling back to a hardlink.
+    """
+    if fcntl is None:
+        raise OSError(errno.EOPNOTSUPP, "reflink is not supported on this platform")
+    with open(src, "rb") as src_handle, open(dest, "wb") as dest_handle:
+        fcntl.ioctl(dest_handle.fileno(), _FICLONE, src_handle.fileno())
+
+
+def decode_message_blocks(blocks):
+    """Decode columnar payload blocks, in report order, back into message dicts (as chat.js does)."""
+    tables = {name: [] for name, _field in _TABLE_COLUMNS}
+    messages = []
+    for block in blocks:
+        for name, values in block["tables"].items():
+            tables[name].extend(values)
+        columns = block["columns"]
+        extra = block["extra"]
+        for index in range(block["count"]):
+            msg = {field: tables[name][columns[name][index]] for name, field in _TABLE_COLUMNS}
+            msg["is_owner"] = bool(columns["owner"][index])
+            for name, field in _VALUE_COLUMNS:
+                msg[field] = columns[name][index]
+            msg.update(extra.get(str(index), {}))
+            messages.append(msg)
+    return messages
+
+
+class _StringTables:
+    """String tables shared by all payload blocks of one report; ids are table positions.
+
+    Each block lists only the strings first used in it, so chunked reports extend the
+    tables chunk by chunk and ids stay valid across chunks.
+    """
+
+    def __init__(self):
+        self._ids = {name: {} for name, _field in _TABLE_COLUMNS}
+        self._added = {name: [] for name, _field in _TABLE_COLUMNS}
+
+    def id_for(self, name, value):
+        """Return the id of `value` in table `name`, adding it if it is new."""
+        ids = self._ids[name]
+        found = ids.get(value)
+        if found is None:
+            found = ids[value] = len(ids)
+            self._added[name].append(value)
+        return found
+
+    def take_added(self):
+        """Return the strings added since the previous call, per table."""
+        added = self._added
+        self._added = {name: [] for name in added}
+        return added
+
+
+class _ReportIdentity:
+    """Report id that chat.js stores tags and notes under; independent of message order.
+
+    It is derived from the message count, the smallest and largest message key and
+    the chat labels, so re-exporting the same messages in another order (e.g. after a
+    parser change or with the export-time sort) keeps the id and the saved annotations.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self._low = None
+        self._high = None
+        self._chats = set()
+
+    def add(self, msg):
+        """Account for one exported message (with its final chat and media values)."""
+        # Same fields as the tag key in chat.js (messageKeyAt).
+        key = "||".join(str(msg.get(field) or "") for field in ("chat", "timestamp", "sender", "content", "media"))
+        if self._low is None or key < self._low:
+            self._low = key
+        if self._high is None or key > self._high:
+            self._high = key
+        self._chats.add(str(msg.get("chat") or "Chat"))
+        self.count += 1
+
+    @property
+    def report_id(self):
+        """Return the id, e.g. `report-1f3a...`."""
+        seed = f"{self.count}|{self._low or ''}|{self._high or ''}|{'|'.join(sorted(self._chats))}"
+        return f"report-{hashlib.sha256(seed.encode('utf-8')).hexdigest()[:16]}"
+
+
+class _ColumnBlock:
+    """One block of the columnar message payload, written column by column.
+
+    Every column collects its JSON values in its own text stream (`open_column()`),
+    so a block can be built one message at a time and streamed out afterwards.
+    """
+
+    def __init__(self, tables, open_column):
+        self.tables = tables
+        self.count = 0
+        self._columns = {name: open_column() for name in ("sender", "chat", "mime", "owner", "timestamp",
+                                                          "ts_ms", "content", "media")}
+        self._extra = open_column()
+        self._extra_count = 0
+
+    def add(self, msg):
+        """Append one message to the columns."""
+        separator = ", " if self.count else ""
+        columns = self._columns
+        for name, field in _TABLE_COLUMNS:
+            columns[name].write(f"{separator}{self.tables.id_for(name, msg.get(field))}")
+        columns["owner"].write(separator + ("1" if msg.get("is_owner") else "0"))
+        for name, field in _VALUE_COLUMNS:
+            columns[name].write(separator + _HTML_JSON_ENCODER.encode(msg.get(field)))
+        extra = {key: value for key, value in msg.items() if key not in _COLUMN_FIELDS and value is not None}
+        if extra:
+            separator = ", " if self._extra_count else ""
+            self._extra.write(f'{separator}"{self.count}": {_HTML_JSON_ENCODER.encode(extra)}')
+            self._extra_count += 1
+        self.count += 1
+
+    def write_to(self, out):
+        """Write the block as JSON to the text stream `out`."""
+        out.write(f'{{"count": {self.count}, "tables": {_HTML_JSON_ENCODER.encode(self.tables.take_added())}')
+        out.write(', "columns": {')
+        for position, (name, column) in enumerate(self._columns.items()):
+            out.write(f'{", " if position else ""}"{name}": [')
+            column.seek(0)
+            shutil.copyfileobj(column, out, _SPOOL_CHUNK_SIZE)
+            out.write("]")
+        out.write('}, "extra": {')
+        self._extra.seek(0)
+        shutil.copyfileobj(self._extra, out, _SPOOL_CHUNK_SIZE)
+        out.write("}}")
+
+    def close(self):
+        """Release the column streams."""
+        for column in self._columns.values():
+            column.close()
+        self._extra.close()
+
+
+class _MessagePayload(ABC):
+    """Destination of the message data shown by chat.js; fed one message at a time."""
+
+    def __enter__(self):
+        """Return the payload for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Release open files."""
+        self.close()
+        return False
+
+    @abstractmethod
+    def add(self, msg):
+        """Encode one message."""
+
+    @abstractmethod
+    def template_values(self):
+        """Finish writing and return the values for the payload placeholders."""
+
+    def close(self):
+        """Release open files."""
+
+
+def _spool_opener(folder):
+    return lambda: tempfile.TemporaryFile("w+", encoding="utf-8", dir=folder, prefix=".bubbly_messages_")
+
+
+class _InlinePayload(_MessagePayload):
+    """Columnar message block spooled to temp files and embedded in the page.
+
+    The header needs the copied media count, so the columns are spooled next to
+    the report and streamed into the page afterwards.
+    """
+
+    def __init__(self, folder):
+        self._block = _ColumnBlock(_StringTables(), _spool_opener(folder))
+
+    def add(self, msg):
+        self._block.add(msg)
+
+    def template_values(self):
+        return {
+            "messages_json_content": self._block.write_to,
+            "message_chunks": "null",
+            "messages_compressed": "null",
+        }
+
+    def close(self):
+        self._block.close()
+
+
+class _DeflateWriter(io.RawIOBase):
+    """Binary writer that zlib-compresses everything written to it into `target`."""
+
+    def __init__(self, target, level):
+        super().__init__()
+        self._target = target
+        self._compressor = zlib.compressobj(level)
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._target.write(self._compressor.compress(data))
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self._target.write(self._compressor.flush())
+        super().close()
+
+
+class _CompressedPayload(_MessagePayload):
+    """Columnar message block compressed into a binary spool and embedded as base64.
+
+    chat.js inflates it with DecompressionStream (or its bundled fallback).
+    """
+
+    def __init__(self, folder, compression):
+        self.compression = compression
+        self.total = 0
+        self._block = _ColumnBlock(_StringTables(), _spool_opener(folder))
+        self._spool = tempfile.TemporaryFile("w+b", dir=folder, prefix=".bubbly_messages_")
+        if compression == "gzip":
+            # Fixed mtime and no file name keep the output reproducible.
+            raw = gzip.GzipFile(filename="", mode="wb", fileobj=self._spool, compresslevel=_COMPRESS_LEVEL, mtime=0)
+        else:
+            raw = _DeflateWriter(self._spool, _COMPRESS_LEVEL)
+        self._text = io.TextIOWrapper(raw, encoding="utf-8")
+
+    def add(self, msg):
+        self._block.add(msg)
+        self.total += 1
+
+    def template_values(self):
+        self._block.write_to(self._text)
+        self._text.close()  # Flushes the compressor; the spool itself stays open.
+        self._spool.seek(0)
+        return {
+            "messages_json_content": "null",
+            "message_chunks": "null",
+            "messages_compressed": self._write_base64,
+        }
+
+    def _write_base64(self, out):
+        out.write(f'{{"format": "{self.compression}", "total": {self.total}, "data": "')
+        while True:
+            block = self._spool.read(_BASE64_BLOCK_SIZE)
+            if not block:
+                break
+            out.write(base64.b64encode(block).decode("ascii"))
+        out.write('"}')
+
+    def close(self):
+        self._block.close()
+        if not self._text.closed:
+            self._text.close()
+        self._spool.close()
+
+
+class _ChunkedPayload(_MessagePayload):
+    """Column blocks written to numbered `chunk_NNNN.js` files loaded via script tags.
+
+    Each file calls `bubblyAddChunk({...})`, which works over file:// where fetch() does not.
+    A chunk is collected in memory (bounded by the chunk size) and written when full.
+    """
+
+    def __init__(self, output_folder, report_name, chunk_size):
+        self.folder = output_folder / "data" / report_name
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.href = f"data/{quote(report_name)}/"
+        self.chunk_size = chunk_size
+        self.chunk_count = 0
+        self.total = 0
+        self._tables = _StringTables()
+        self._block = None
+
+    def add(self, msg):
+        if self._block is None:
+            self._block = _ColumnBlock(self._tables, io.StringIO)
+        self._block.add(msg)
+        self.total += 1
+        if self._block.count >= self.chunk_size:
+            self._finish_chunk()
+
+    def _finish_chunk(self):
+        chunk_path = self.folder / f"chunk_{self.chunk_count:04d}.js"
+        with open(chunk_path, "w", encoding="utf-8") as handle:
+            handle.write("bubblyAddChunk(")
+            self._block.write_to(handle)
+            handle.write(");\n")
+        self._block.close()
+        self._block = None
+        self.chunk_count += 1
+
+    def template_values(self):
+        if self._block is not None:
+            self._finish_chunk()
+        chunks = {"base": self.href, "count": self.chunk_count, "total": self.total}
+        return {"messages_json_content": "null", "message_chunks": json.dumps(chunks), "messages_compressed": "null"}
+
+    def close(self):
+        if self._block is not None:
+            self._block.close()
+            self._block = None
+
 
 class BubblyExporter:
     """Export parsed chat messages and media into a self-contained HTML report."""
 
-    def __init__(self, messages, media_folder, output_folder, metadata, logo_path=None):
+    def __init__(
+        self,
+        messages,
+        media_folder,
+        output_folder,
+        metadata,
+        logo_path=None,
+        summary=None,
+        media_workers=None,
+        media_mode="copy",
+        media_store=None,
+        message_layout="inline",
+        chunk_size=None,
+        payload_compression="none",
+        reuse_existing_media=False,
+        metrics=None,
+        sort_memory_mb=None,
+        search_index=True,
+    ):
+        # Any iterable of message dicts (list or parser stream); consumed once by export_html,
+        # which exports the messages in time order.
         self.messages = messages
+        # Optional collector with an add(message) method, fed each message after processing.
+        self.summary = summary
+        # Stage timings (utils.metrics.RunMetrics); pass one in to collect them across a run.
+        self.metrics = metrics if metrics is not None else RunMetrics()
+        self.media_workers = max(1, int(media_workers or DEFAULT_MEDIA_WORKERS))
+        self.media_mode = media_mode or "copy"
+        if self.media_mode not in MEDIA_MODES:
+            raise ValueError(f"Unknown media mode {self.media_mode}. Available: {list(MEDIA_MODES)}")
+        # Optional content-addressed store (utils.media_store.ContentMediaStore); when set,
+        # media is referenced by digest path and materialized from the store.
+        self.media_store = media_store
+        self.message_layout = message_layout or "inline"
+        if self.message_layout not in MESSAGE_LAYOUTS:
+            raise ValueError(
+                f"Unknown message layout {self.message_layout}. Available: {list(MESSAGE_LAYOUTS)}"
+            )
+        self.chunk_size = max(1, int(chunk_size or DEFAULT_CHUNK_SIZE))
+        self.payload_compression = payload_compression or "none"
+        if self.payload_compression not in PAYLOAD_COMPRESSIONS:
+            raise ValueError(
+                f"Unknown payload compression {self.payload_compression}. Available: {list(PAYLOAD_COMPRESSIONS)}"
+            )
+        if self.payload_compression != "none" and self.message_layout != "inline":
+            raise ValueError("Payload compression is only supported with the inline message layout")
+        # Messages are sorted by time once at export; beyond this budget the sort spills runs to disk.
+        self.sort_memory_mb = sort_memory_mb
+        # Embed a word index (utils.search_index) so chat.js answers word/prefix searches without a scan.
+        self.search_index = bool(search_index)
+        # Incremental re-exports keep media files that an earlier export already placed.
+        self.reuse_existing_media = bool(reuse_existing_media)
         self.media_folder = Path(media_folder)
         self.output_folder = Path(output_folder)
         self.metadata = metadata
@@ -21,154 +477,274 @@ class BubblyExporter:
         self.logo_path = Path(logo_path) if logo_path else None
         self.output_folder.mkdir(parents=True, exist_ok=True)
         (self.output_folder / "media").mkdir(exist_ok=True)
-
-    # ----------------------
-    # Load template file
-    # ----------------------
-    def _load_template(self, file_name: str):
-        path = self.templates_folder / file_name
-        if not path.exists():
-            raise FileNotFoundError(f"Template not found: {path}")
-        return path.read_text(encoding="utf-8")
+        self._copied_targets = set()
+        self._copied_bytes = 0
 
     # ----------------------
     # Copy media files
     # ----------------------
-    def _copy_media(self):
-        copied_count = 0
-        copied_targets = set()
-        for msg in self.messages:
-            media_name = msg.get("media")
-            if not media_name:
-                continue
+    def _copy_media(self, messages=None):
+        """Copy the media of a message batch using a bounded thread pool.
 
-            if isinstance(media_name, str) and media_name.startswith("missing:"):
-                # Already marked by parser, keep as-is.
-                continue
+        Sources are probed and copied concurrently, but destinations are claimed
+        and messages rewritten in message order, so output is deterministic.
+        """
+        messages = list(self.messages if messages is None else messages)
+        sources = {}
+        for msg in messages:
+            key = self._media_key(msg)
+            if key is not None:
+                sources.setdefault(key, None)
 
-            src = self.media_folder / media_name
-            if not src.exists():
-                msg["media"] = f"missing:{media_name}"
-                msg.pop("media_mime", None)
-                continue
+        def probe_source(key):
+            with trace_span("probe_media", "media", file=str(key[0])):
+                return self._probe_media(key)
+
+        def materialize(job):
+            with trace_span("place_media", "media", file=job[1].name):
+                return self._materialize_media(*job)
+
+        copied_count = 0
+        with ThreadPoolExecutor(max_workers=self.media_workers) as executor:
+            sources = dict(zip(sources, executor.map(probe_source, sources)))
 
-            media_mime = msg.get("media_mime") or self._detect_mime_from_magic(src) or mimetypes.guess_type(str(src))[0]
-            if media_mime and not msg.get("media_mime"):
-                msg["media_mime"] = media_mime
-
-            output_media_name = msg.get("media_output") or media_name
-            if not Path(output_media_name).suffix:
-                ext = self._extension_for_mime(media_mime)
-                if ext:
-                    output_media_name = f"{output_media_name}.{ext}"
-
-            dest = self.output_folder / "media" / output_media_name
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            if str(dest) not in copied_targets:
-                try:
-                    if src.resolve() == dest.resolve():
-                        copied_targets.add(str(dest))
-                        continue
-                except OSError:
-                    pass
-                try:
-                    shutil.copy(src, dest)
-                except shutil.SameFileError:
-                    copied_targets.add(str(dest))
+            # Claim destinations on this thread in first-seen order: one copy per target.
+            copy_jobs = []
+            for probe in sources.values():
+                if probe is None or probe["dest_key"] in self._copied_targets:
                     continue
-                copied_targets.add(str(dest))
-                copied_count += 1
+                self._copied_targets.add(probe["dest_key"])
+                copy_jobs.append((probe["src"], probe["dest"]))
+            for (src, _dest), copied in zip(
+                copy_jobs, executor.map(materialize, copy_jobs)
+            ):
+                if copied:
+                    copied_count += copied
+                    self._copied_bytes += src.stat().st_size
 
+        for msg in messages:
+            key = self._media_key(msg)
+            if key is None:
+                continue
+            probe = sources[key]
+            if probe is None:
+                msg["media"] = f"missing:{key[0]}"
+                msg.pop("media_mime", None)
+                continue
+            if probe["mime"] and not msg.get("media_mime"):
+                msg["media_mime"] = probe["mime"]
             # Keep final media path in messages so frontend uses the copied file name.
-            msg["media"] = output_media_name
+            msg["media"] = probe["output_name"]
+            if probe.get("sha256"):
+                msg["media_name"] = probe["media_name"]
+                msg["media_sha256"] = probe["sha256"]
         return copied_count
 
-    def _detect_mime_from_magic(self, path: Path):
-        try:
-            header = path.read_bytes()[:64]
-        except Exception:
+    def _media_key(self, msg):
+        media_name = msg.get("media")
+        if not media_name:
             return None
-        if not header:
+        if isinstance(media_name, str) and media_name.startswith("missing:"):
+            # Already marked by parser, keep as-is.
             return None
+        return media_name, msg.get("media_mime"), msg.get("media_output")
 
-        if header.startswith(b"\xFF\xD8\xFF"):
-            return "image/jpeg"
-        if header.startswith(b"\x89PNG\r\n\x1A\n"):
-            return "image/png"
-        if header.startswith((b"GIF87a", b"GIF89a")):
-            return "image/gif"
-        if header.startswith(b"RIFF") and len(header) >= 12 and header[8:12] == b"WEBP":
-            return "image/webp"
-        if header.startswith(b"%PDF-"):
-            return "application/pdf"
-        if header.startswith(b"OggS"):
-            return "audio/ogg"
-        if header.startswith(b"ID3"):
-            return "audio/mpeg"
-        if len(header) >= 2 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0:
-            return "audio/mpeg"
-        if header.startswith(b"RIFF") and len(header) >= 12 and header[8:12] == b"WAVE":
-            return "audio/wav"
-        if len(header) >= 12 and header[4:8] == b"ftyp":
-            brand = header[8:12]
-            suffix = path.suffix.lower()
-            if brand == b"M4A ":
-                return "audio/mp4"
-            # `isom/mp41/mp42` are common for both audio and video MP4 containers.
-            # Prefer extension-based disambiguation to avoid classifying videos as audio.
-            if brand in {b"isom", b"mp41", b"mp42"}:
-                if suffix in {".m4a", ".aac"}:
-                    return "audio/mp4"
-                return "video/mp4"
-            if brand in {b"qt  "}:
-                return "video/quicktime"
-            return "video/mp4"
-        if header.startswith(b"\x1A\x45\xDF\xA3"):
-            return "video/webm"
-        return None
+    def _probe_media(self, key):
+        """Resolve source, MIME type and output name for one media reference (None if missing)."""
+        media_name, known_mime, media_output = key
+        src = self.media_folder / media_name
+        if not src.exists():
+            return None
+
+        media_mime = known_mime or detect_mime(src) or mimetypes.guess_type(str(src))[0]
+        output_media_name = media_output or media_name
+        if not Path(output_media_name).suffix:
+            ext = extension_for_mime(media_mime)
+            if ext:
+                output_media_name = f"{output_media_name}.{ext}"
 
-    def _extension_for_mime(self, mime):
-        mime = (mime or "").lower().strip()
-        mapping = {
-            "image/jpeg": "jpg",
-            "image/png": "png",
-            "image/gif": "gif",
-            "image/webp": "webp",
-            "video/mp4": "mp4",
-            "video/quicktime": "mov",
-            "video/webm": "webm",
-            "audio/mpeg": "mp3",
-            "audio/mp4": "m4a",
-            "audio/ogg": "ogg",
-            "audio/wav": "wav",
-            "application/pdf": "pdf",
+        if self.media_store is not None:
+            suffix = Path(output_media_name).suffix
+            digest, stored = self.media_store.add(src, suffix)
+            output_path = self.media_store.relative_path(digest, suffix)
+            dest = self.output_folder / "media" / output_path
+            return {
+                "src": stored,
+                "dest": dest,
+                "dest_key": str(dest),
+                "mime": media_mime,
+                "output_name": output_path,
+                "media_name": Path(output_media_name).name,
+                "sha256": digest,
+            }
+
+        dest = self.output_folder / "media" / output_media_name
+        return {
+            "src": src,
+            "dest": dest,
+            "dest_key": str(dest),
+            "mime": media_mime,
+            "output_name": output_media_name,
         }
-        if mime in mapping:
-            return mapping[mime]
-        guessed = mimetypes.guess_extension(mime) if mime else None
-        if guessed:
-            return guessed.lstrip(".")
-        return None
+
+    def _materialize_media(self, src, dest):
+        """Place one media file into the output folder; return 1 if a file was written."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if self.media_store is not None and dest.exists():
+            # Digest-named targets already present (e.g. from another chat) hold identical content.
+            return 0
+        if self.reuse_existing_media and self._is_current_copy(src, dest):
+            return 0
+        try:
+            if src.resolve() == dest.resolve():
+                return 0
+        except OSError:
+            pass
+        if self.media_mode == "auto":
+            modes = ("reflink", "hardlink", "copy")
+        elif self.media_mode == "copy":
+            modes = ("copy",)
+        else:
+            modes = (self.media_mode, "copy")
+        for mode in modes:
+            try:
+                self._place_media(mode, src, dest)
+                return 1
+            except OSError:
+                if mode == "copy":
+                    raise
+                # Unsupported by the filesystem (cross-device, no CoW, ...): try next, then copy.
+                continue
+        return 0
+
+    @staticmethod
+    def _is_current_copy(src, dest):
+        try:
+            src_stat = src.stat()
+            dest_stat = dest.stat()
+        except OSError:
+            return False
+        return dest_stat.st_size == src_stat.st_size and dest_stat.st_mtime_ns >= src_stat.st_mtime_ns
+
+    def _place_media(self, mode, src, dest):
+        """Create `dest` from `src` via a temp file and an atomic rename.
+
+        Concurrent writers (media threads, split-export processes) never expose a
+        partial file, and an existing symlink at `dest` is replaced, not written through.
+        """
+        handle, temp_name = tempfile.mkstemp(dir=dest.parent, prefix=".bubbly_")
+        os.close(handle)
+        temp = Path(temp_name)
+        try:
+            if mode == "reflink":
+                _reflink_file(src, temp)
+                shutil.copymode(src, temp)
+            elif mode == "hardlink":
+                temp.unlink()
+                os.link(src, temp)
+            elif mode == "symlink":
+                temp.unlink()
+                os.symlink(src.resolve(), temp)
+            else:
+                shutil.copy(src, temp)
+            os.replace(temp, dest)
+        finally:
+            # Left behind on failure, or when rename() was a no-op (temp and dest already the same file).
+            if temp.exists() or temp.is_symlink():
+                temp.unlink()
+
+    # ----------------------
+    # Process message stream
+    # ----------------------
+    def _iter_sorted_messages(self):
+        """Add `ts_ms` to every message and return them in time order (stable for equal times)."""
+        sorter = ExternalSorter(
+            key=_ts_sort_key,
+            memory_budget=int(self.sort_memory_mb * 1024 * 1024) if self.sort_memory_mb else None,
+            temp_dir=self.output_folder,
+        )
+        iterator = iter(self.messages)
+        while True:
+            # Pulling a batch runs the (streaming) parser for these messages.
+            with trace_span("read_batch", "parse"):
+                batch = list(islice(iterator, EXPORT_BATCH_SIZE))
+            if not batch:
+                break
+            with self.metrics.stage("sort", items=len(batch)):
+                for msg in batch:
+                    msg["ts_ms"] = timestamp_ms(msg.get("timestamp"))
+                    sorter.add(msg)
+        return sorter.iter_sorted()
+
+    def _iter_batches(self):
+        iterator = self._iter_sorted_messages()
+        while True:
+            # The first pull sorts (or merges the spilled runs); later pulls read the merge.
+            with self.metrics.stage("sort"):
+                batch = list(islice(iterator, EXPORT_BATCH_SIZE))
+            if not batch:
+                return
+            yield batch
+
+    def _process_messages(self, payload, search_index=None, identity=None, json_name="chat.json"):
+        """Copy media, write the report's JSON file and feed the HTML message payload in one pass.
+
+        Messages are encoded one at a time, so memory stays bounded by one batch
+        instead of growing with the chat. `search_index` (a SearchIndexBuilder) is
+        fed the messages in payload order, `identity` (a _ReportIdentity) every
+        exported message. Returns the number of copied media files.
+        """
+        copied_count = 0
+        json_path = self.output_folder / json_name
+        default_chat = self.metadata.get("chat_name")
+        with open(json_path, "w", encoding="utf-8") as json_handle:
+            json_handle.write("[")
+            first = True
+            for batch in self._iter_batches():
+                copied_bytes = self._copied_bytes
+                with self.metrics.stage("media_copy") as stage:
+                    stage["items"] = self._copy_media(batch)
+                    stage["bytes"] = self._copied_bytes - copied_bytes
+                copied_count += stage["items"]
+                with self.metrics.stage("json_export", items=len(batch)):
+                    for msg in batch:
+                        msg["chat"] = msg.get("chat") or default_chat
+                        self._write_json_entry(json_handle, msg, first)
+                        payload.add(msg)
+                        if identity is not None:
+                            identity.add(msg)
+                        first = False
+                        if self.summary is not None:
+                            self.summary.add(msg)
+                if search_index is not None:
+                    with self.metrics.stage("search_index", items=len(batch)):
+                        for msg in batch:
+                            search_index.add(msg)
+            json_handle.write("]" if first else "\n]")
+        self.metrics.add("json_export", byte_count=json_path.stat().st_size)
+        return copied_count
+
+    def _open_payload(self, output_html_name):
+        if self.message_layout == "chunks":
+            return _ChunkedPayload(self.output_folder, Path(output_html_name).stem, self.chunk_size)
+        if self.payload_compression != "none":
+            return _CompressedPayload(self.output_folder, self.payload_compression)
+        return _InlinePayload(self.output_folder)
 
     # ----------------------
     # Export messages as JSON
     # ----------------------
-    def _export_json(self):
-        json_path = self.output_folder / "chat.json"
-        messages_json = []
-        for msg in self.messages:
-            chat_name = msg.get("chat") or self.metadata.get("chat_name")
-            messages_json.append({
-                "sender": msg["sender"],
-                "content": msg["content"],
-                "timestamp": msg["timestamp"],
-                "media": msg.get("media"),
-                "is_owner": msg.get("is_owner"),
-                "chat": chat_name
-            })
-        with open(json_path, "w", encoding="utf-8") as f:
-            json.dump(messages_json, f, ensure_ascii=False, indent=2)
-        return json_path.name
+    def _write_json_entry(self, handle, msg, first):
+        entry = {
+            "sender": msg["sender"],
+            "content": msg["content"],
+            "timestamp": msg["timestamp"],
+            "media": msg.get("media"),
+            "is_owner": msg.get("is_owner"),
+            "chat": msg.get("chat"),
+        }
+        text = json.dumps(entry, ensure_ascii=False, indent=2).replace("\n", "\n  ")
+        handle.write(("\n  " if first else ",\n  ") + text)
 
     def _copy_logo(self):
         if not self.logo_path:
@@ -188,8 +764,20 @@ class BubblyExporter:
     # ----------------------
     def export_html(self, output_html_name="chat.html"):
         """Generate the final HTML report, including copied media and embedded data."""
-        copied_count = self._copy_media()
-        json_file = self._export_json()
+        search_index = SearchIndexBuilder() if self.search_index else None
+        identity = _ReportIdentity()
+        with self._open_payload(output_html_name) as payload:
+            # One JSON file per report: split-export reports share a folder and may be written concurrently.
+            json_name = f"{Path(output_html_name).stem}.json"
+            copied_count = self._process_messages(payload, search_index, identity, json_name)
+            payload_values = payload.template_values()
+            payload_values["search_index"] = search_index.write_json if search_index is not None else "null"
+            payload_values["report_id"] = json.dumps(identity.report_id)
+            with self.metrics.stage("html_write", items=1) as stage:
+                self._write_html(output_html_name, copied_count, payload_values)
+                stage["bytes"] = (self.output_folder / output_html_name).stat().st_size
+
+    def _write_html(self, output_html_name, copied_count, payload_values):
         logo_file = self._copy_logo()
         generated_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -241,46 +829,17 @@ class BubblyExporter:
             )
 
         # ----------------------
-        # Load templates
-        # ----------------------
-        html_template = self._load_template("chat.html")
-        css_content = self._load_template("style.css")
-        js_content = self._load_template("chat.js")
-
-        # ----------------------
-        # Inline CSS & JS
-        # ----------------------
-        messages_for_html = []
-        for msg in self.messages:
-            chat_name = msg.get("chat") or self.metadata.get("chat_name")
-            enriched = dict(msg)
-            enriched["chat"] = chat_name
-            messages_for_html.append(enriched)
-
-        html_content = html_template.replace(
-            '<link rel="stylesheet" href="style.css">',
-            f"<style>{css_content}</style>"
-        ).replace(
-            '<script src="chat.js"></script>',
-            f"<script>{js_content}</script>"
-        ).replace(
-            "{{header}}", header_html
-        ).replace(
-            "{{signature}}", signature_html
-        ).replace(
-            "{{branding_logo}}", branding_html
-        ).replace(
-            "{{home_button}}", home_button_html
-        ).replace(
-            #"{{messages_json_path}}", json_file
-            "{{messages_json_content}}", json.dumps(messages_for_html, ensure_ascii=False)
-        )
-
-        # ----------------------
-        # Write final HTML
+        # Render compiled template (CSS & JS inlined)
         # ----------------------
+        template = load_report_template(self.templates_folder)
         output_html_path = self.output_folder / output_html_name
         with open(output_html_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+            template.render_to(f, {
+                "header": header_html,
+                "signature": signature_html,
+                "branding_logo": branding_html,
+                "home_button": home_button_html,
+                **payload_values,
+            })
 
         print(f"HTML saved to {output_html_path}")
@@ -1,6 +1,147 @@
 """Base parser interface used by all messenger-specific parser implementations."""
 
+import sys
 from abc import ABC, abstractmethod
+from collections.abc import MutableMapping
+
+# Keys stored in Message slots, in output order; any other key goes to a per-message dict.
+MESSAGE_FIELDS = (
+    "timestamp",
+    "sender",
+    "content",
+    "media",
+    "url",
+    "is_owner",
+    "chat",
+    "media_mime",
+    "media_output",
+    "media_name",
+    "media_sha256",
+    "ts_ms",
+)
+_FIELD_SET = frozenset(MESSAGE_FIELDS)
+# Values that repeat on nearly every message; interning keeps one copy per distinct string.
+_INTERNED_FIELDS = frozenset(("sender", "chat", "media_mime"))
+_MISSING = object()
+
+
+class Message(MutableMapping):
+    """
+    Normalized chat message.
+    A slotted record with the mapping interface of a plain dict, so consumers
+    keep using msg["key"], msg.get(), `in` and dict(msg). Keys that were never
+    set are absent, exactly like a missing dict key.
+    """
+    __slots__ = MESSAGE_FIELDS + ("_extra",)
+
+    def __init__(self, timestamp, sender, content, media=None, url=None, is_owner=False, chat=None, **fields):
+        # The common keys are assigned directly; this runs once per parsed message.
+        self._extra = None
+        self.timestamp = timestamp
+        self.sender = sys.intern(sender) if type(sender) is str else sender
+        self.content = content
+        self.media = media
+        self.url = url
+        self.is_owner = is_owner
+        self.chat = sys.intern(chat) if type(chat) is str else chat
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_mapping(cls, data):
+        """Return `data` as a Message (unchanged if it already is one); keys missing in `data` stay absent."""
+        if isinstance(data, cls):
+            return data
+        msg = cls.__new__(cls)
+        msg._extra = None
+        for key, value in data.items():
+            msg[key] = value
+        return msg
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if key in _INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+            return
+        if self._extra is None:
+            self._extra = {}
+        self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            try:
+                delattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+            return
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key)
+        return self._extra is not None and key in self._extra
+
+    def __iter__(self):
+        for key in MESSAGE_FIELDS:
+            if hasattr(self, key):
+                yield key
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self):
+        count = sum(1 for key in MESSAGE_FIELDS if hasattr(self, key))
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __bool__(self):
+        # Parsers test messages for truthiness; constructed messages always hold a timestamp.
+        return hasattr(self, "timestamp") or len(self) > 0
+
+    def get(self, key, default=None):
+        """Return the value for `key`, or `default` if it is absent."""
+        if key in _FIELD_SET:
+            value = getattr(self, key, _MISSING)
+            return default if value is _MISSING else value
+        if self._extra is not None:
+            return self._extra.get(key, default)
+        return default
+
+    def copy(self):
+        """Return a shallow copy."""
+        return Message.from_mapping(self.to_dict())
+
+    def to_dict(self):
+        """Return the message as a plain dict in output key order."""
+        data = {}
+        for key in MESSAGE_FIELDS:
+            value = getattr(self, key, _MISSING)
+            if value is not _MISSING:
+                data[key] = value
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def __repr__(self):
+        return f"Message({self.to_dict()!r})"
+
+
+def message_json_default(obj):
+    """`default` hook for json encoders: encode Message objects as their dict form."""
+    if isinstance(obj, Message):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
 
 class BaseParser(ABC):
     """
@@ -8,12 +149,26 @@ class BaseParser(ABC):
     Parsers can accept extra options via **kwargs.
     """
     @abstractmethod
-    def parse(self, input_path, **kwargs):
+    def iter_messages(self, input_path, *args, metadata=None, **kwargs):
         """
-        Parse the chat export.
+        Stream the chat export.
+        Input loading/validation happens when called; normalized messages are
+        produced lazily by the returned iterator.
         Returns:
-        - messages: list of dicts {id, sender, timestamp, content, media, url}
-        - metadata: dict {chat_name, user, source, ...}
+        - iterator of Message {sender, timestamp, content, media, url, is_owner, chat}
 
+        metadata: optional dict that is filled in place {chat_name, user, source, ...}.
+        Fields derived from the messages themselves are final once the iterator is exhausted.
         kwargs: parser-specific options
         """
+
+    def parse(self, input_path, *args, **kwargs):
+        """
+        Parse the chat export into memory (compatibility wrapper around iter_messages).
+        Returns:
+        - messages: list of Message {sender, timestamp, content, media, url, is_owner, chat}
+        - metadata: dict {chat_name, user, source, ...}
+        """
+        metadata = {}
+        messages = list(self.iter_messages(input_path, *args, metadata=metadata, **kwargs))
+        return messages, metadata
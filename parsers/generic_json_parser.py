@@ -7,12 +7,15 @@ Description: Creates Bubbly JSON from a generic JSON schema.
 """
 
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Iterator, Tuple, Optional, Any
 import json
 import re
 
+from parsers.base_parser import BaseParser, Message
+from utils.tracing import trace_span
 
-class GenericJsonParser:
+
+class GenericJsonParser(BaseParser):
     """
     Parser for generic JSON chat exports.
     """
@@ -23,33 +26,51 @@ class GenericJsonParser:
         "account_name": "Optional. Owner display name for is_owner detection.",
     }
 
-    def parse(
+    def iter_messages(
         self,
         input_path: Path,
         media_folder: Path,
         account_name: Optional[str] = None,
         messages_key: Optional[str] = None,
         metadata_key: Optional[str] = None,
+        metadata: Optional[Dict] = None,
         **kwargs
-    ) -> Tuple[List[Dict], Dict]:
-        """Parse one generic JSON export into normalized messages and metadata."""
+    ) -> Iterator[Dict]:
+        """Stream normalized messages from one generic JSON export."""
         input_path = Path(input_path)
         media_folder = Path(media_folder)
 
         json_path = self._resolve_json_path(input_path, messages_key, kwargs)
-        with json_path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
+        with trace_span("decode_file", "parse", file=json_path.name):
+            with json_path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
 
         messages_raw, metadata_raw = self._extract_payload(
             data, messages_key=messages_key, metadata_key=metadata_key
         )
 
-        messages: List[Dict] = []
         chat_name = (
             metadata_raw.get("chat_name")
             or kwargs.get("chat_name")
             or (json_path.stem if json_path.is_file() else None)
         )
+        if metadata is not None:
+            metadata.update({
+                "user": kwargs.get("user"),
+                "case": kwargs.get("case"),
+                "chat_name": chat_name,
+                "source": metadata_raw.get("source") or "Generic JSON",
+                "platform": metadata_raw.get("platform") or "generic",
+            })
+
+        return self._iter_normalized(messages_raw, chat_name, account_name)
+
+    def _iter_normalized(
+        self,
+        messages_raw: List[Any],
+        chat_name: Optional[str],
+        account_name: Optional[str],
+    ) -> Iterator[Dict]:
         for msg in messages_raw:
             normalized = self._normalize_message(
                 msg,
@@ -57,17 +78,7 @@ class GenericJsonParser:
                 account_name=account_name,
             )
             if normalized:
-                messages.append(normalized)
-
-        metadata = {
-            "user": kwargs.get("user"),
-            "case": kwargs.get("case"),
-            "chat_name": chat_name,
-            "source": metadata_raw.get("source") or "Generic JSON",
-            "platform": metadata_raw.get("platform") or "generic",
-        }
-
-        return messages, metadata
+                yield normalized
 
     def resolve_json_paths(
         self,
@@ -187,15 +198,15 @@ class GenericJsonParser:
         if account_name and bool(is_owner):
             sender = account_name
 
-        return {
-            "timestamp": timestamp,
-            "sender": sender,
-            "content": content,
-            "media": media,
-            "url": url,
-            "is_owner": bool(is_owner),
-            "chat": msg.get("chat") or msg.get("chat_name") or chat_name,
-        }
+        return Message(
+            timestamp=timestamp,
+            sender=sender,
+            content=content,
+            media=media,
+            url=url,
+            is_owner=bool(is_owner),
+            chat=msg.get("chat") or msg.get("chat_name") or chat_name,
+        )
 
     def _normalize_timestamp(self, value: Any) -> str:
         if not isinstance(value, str):
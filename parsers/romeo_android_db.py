@@ -8,10 +8,13 @@ import re
 import sqlite3
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, Optional
 
+from parsers.base_parser import BaseParser, Message
+from utils.tracing import trace_span
 
-class RomeoAndroidDbParser:
+
+class RomeoAndroidDbParser(BaseParser):
     """Parser for Romeo Android SQLite databases."""
 
     PARSER_ARGS = {
@@ -48,43 +51,47 @@ class RomeoAndroidDbParser:
     _STATUS_RECEIVED = "received"
     _ACCOUNT_ID_PATTERN = re.compile(r"^planetromeo-room\.db\.(\d+)$")
 
-    def parse(
+    def iter_messages(
         self,
         input_path: Path,
         media_folder: Path,
         account_name: str = "",
+        metadata: Optional[Dict] = None,
         **kwargs,
-    ) -> Tuple[List[Dict], Dict]:
-        """Parse Romeo DB into normalized messages and metadata."""
+    ) -> Iterator[Dict]:
+        """Stream normalized messages from a Romeo DB."""
         del media_folder  # Romeo parser only uses DB metadata; files are not expected.
         db_path = self._resolve_db_path(Path(input_path))
         inferred_account_id = self._extract_account_id_from_db_name(db_path)
         owner_name = str(account_name or "").strip() or inferred_account_id or "Me"
-        query = self._DEFAULT_QUERY
 
-        messages: List[Dict] = []
-        with sqlite3.connect(str(db_path)) as conn:
+        if metadata is not None:
+            metadata.update({
+                "user": kwargs.get("user"),
+                "case": kwargs.get("case"),
+                "chat_name": "Romeo Chats",
+                "source": "Romeo",
+                "platform": "android",
+                "romeo_account_id": inferred_account_id,
+            })
+        return self._iter_rows(db_path, owner_name)
+
+    def _iter_rows(self, db_path: Path, owner_name: str) -> Iterator[Dict]:
+        conn = sqlite3.connect(str(db_path))
+        try:
             conn.row_factory = sqlite3.Row
-            rows = conn.execute(query).fetchall()
-
-        for row in rows:
-            msg = self._normalize_row(
-                row,
-                account_name=owner_name,
-                default_chat=None,
-            )
-            if msg:
-                messages.append(msg)
-
-        metadata = {
-            "user": kwargs.get("user"),
-            "case": kwargs.get("case"),
-            "chat_name": "Romeo Chats",
-            "source": "Romeo",
-            "platform": "android",
-            "romeo_account_id": inferred_account_id,
-        }
-        return messages, metadata
+            # The span stays open while rows stream, so it covers decoding the whole database.
+            with trace_span("decode_file", "parse", file=db_path.name):
+                for row in conn.execute(self._DEFAULT_QUERY):
+                    msg = self._normalize_row(
+                        row,
+                        account_name=owner_name,
+                        default_chat=None,
+                    )
+                    if msg:
+                        yield msg
+        finally:
+            conn.close()
 
     def _resolve_db_path(self, input_path: Path) -> Path:
         if input_path.is_file():
@@ -162,15 +169,15 @@ class RomeoAndroidDbParser:
         if media and not content:
             content = "[Image]"
 
-        normalized = {
-            "timestamp": timestamp,
-            "sender": sender,
-            "content": content,
-            "media": media,
-            "url": self._extract_url(content),
-            "is_owner": is_owner,
-            "chat": chat,
-        }
+        normalized = Message(
+            timestamp=timestamp,
+            sender=sender,
+            content=content,
+            media=media,
+            url=self._extract_url(content),
+            is_owner=is_owner,
+            chat=chat,
+        )
         if media and str(media).endswith((".jpg", ".jpeg", ".png", ".gif", ".webp")):
             normalized["media_mime"] = "image/jpeg"
         return normalized
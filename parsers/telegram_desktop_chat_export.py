@@ -7,13 +7,16 @@ Description: Creates Bubbly JSON from Telegram Desktop exports.
 """
 
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional, Any
+from typing import List, Dict, Iterator, Optional, Any
 from datetime import datetime, timezone
 import json
 import re
 
+from parsers.base_parser import BaseParser, Message
+from utils.tracing import trace_span
 
-class TelegramDesktopChatExportParser:
+
+class TelegramDesktopChatExportParser(BaseParser):
     """
     Parser for Telegram Desktop chat exports (machine-readable JSON).
     """
@@ -21,26 +24,45 @@ class TelegramDesktopChatExportParser:
         "tg_account_name": "Optional. Account display name for is_owner detection.",
     }
 
-    def parse(
+    def iter_messages(
         self,
         input_folder: Path,
         media_folder: Path,
         tg_account_name: Optional[str] = None,
+        metadata: Optional[Dict] = None,
         **kwargs
-    ) -> Tuple[List[Dict], Dict]:
-        """Parse Telegram Desktop JSON export files into Bubbly message format."""
+    ) -> Iterator[Dict]:
+        """Stream Telegram Desktop JSON export messages in Bubbly message format."""
         input_folder = Path(input_folder)
 
         json_path = self._find_result_json(input_folder)
-        with json_path.open("r", encoding="utf-8") as handle:
-            data = json.load(handle)
+        with trace_span("decode_file", "parse", file=json_path.name):
+            with json_path.open("r", encoding="utf-8") as handle:
+                data = json.load(handle)
 
         raw_messages = data.get("messages", [])
         if not isinstance(raw_messages, list):
             raise ValueError("Invalid Telegram export: 'messages' is not a list")
 
-        messages: List[Dict] = []
         chat_name = data.get("name")
+        if metadata is not None:
+            metadata.update({
+                "user": kwargs.get("user"),
+                "case": kwargs.get("case"),
+                "chat_name": chat_name,
+                "source": "Telegram",
+                "tg_account_name": tg_account_name,
+                "platform": "desktop",
+            })
+
+        return self._iter_normalized(raw_messages, chat_name, tg_account_name)
+
+    def _iter_normalized(
+        self,
+        raw_messages: List[Any],
+        chat_name: Optional[str],
+        tg_account_name: Optional[str],
+    ) -> Iterator[Dict]:
         for msg in raw_messages:
             if not isinstance(msg, dict):
                 continue
@@ -54,26 +76,15 @@ class TelegramDesktopChatExportParser:
             media = self._extract_media(msg)
             url = self._extract_url(content)
 
-            messages.append({
-                "timestamp": timestamp,
-                "sender": sender,
-                "content": content,
-                "media": media,
-                "url": url,
-                "is_owner": bool(tg_account_name and sender == tg_account_name),
-                "chat": chat_name,
-            })
-
-        metadata = {
-            "user": kwargs.get("user"),
-            "case": kwargs.get("case"),
-            "chat_name": chat_name,
-            "source": "Telegram",
-            "tg_account_name": tg_account_name,
-            "platform": "desktop",
-        }
-
-        return messages, metadata
+            yield Message(
+                timestamp=timestamp,
+                sender=sender,
+                content=content,
+                media=media,
+                url=url,
+                is_owner=bool(tg_account_name and sender == tg_account_name),
+                chat=chat_name,
+            )
 
     def _find_result_json(self, input_path: Path) -> Path:
         if input_path.is_file():
@@ -10,14 +10,19 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterator, List, Optional, Any
 import csv
 import json
 import mimetypes
 import re
 
+from parsers.base_parser import BaseParser, Message
+from utils.external_sort import ExternalSorter
+from utils.mime_detection import detect_mime, extension_for_mime
+from utils.tracing import trace_span
 
-class ThreemaMessengerBackupParser:
+
+class ThreemaMessengerBackupParser(BaseParser):
     """
     Parser for Threema backups.
     """
@@ -26,14 +31,15 @@ class ThreemaMessengerBackupParser:
         "threema_account_name": "Optional. Display name used for outbound messages.",
     }
 
-    def parse(
+    def iter_messages(
         self,
         input_folder: Path,
         media_folder: Path,
         threema_account_name: Optional[str] = None,
+        metadata: Optional[Dict] = None,
         **kwargs,
-    ) -> Tuple[List[Dict], Dict]:
-        """Parse a Threema CSV backup folder into normalized messages and metadata."""
+    ) -> Iterator[Dict]:
+        """Stream normalized messages from a Threema CSV backup folder."""
         input_folder = Path(input_folder)
         if input_folder.is_file():
             input_folder = input_folder.parent
@@ -45,35 +51,44 @@ class ThreemaMessengerBackupParser:
                 "'contacts.csv' and at least one 'message_*.csv' file."
             )
 
-        messages = self._parse_csv_backup(
+        # Chat files are merged into one timeline; the sort spills to disk beyond the memory budget.
+        # The launcher passes its --sort-memory-mb budget and a run folder next to the output.
+        sort_memory_mb = kwargs.get("sort_memory_mb")
+        sort_temp_dir = kwargs.get("sort_temp_dir")
+        if sort_temp_dir is not None:
+            Path(sort_temp_dir).mkdir(parents=True, exist_ok=True)
+        sorter = ExternalSorter(
+            memory_budget=int(float(sort_memory_mb) * 1024 * 1024) if sort_memory_mb else None,
+            temp_dir=sort_temp_dir,
+        )
+        unique_chats = set()
+        for message in self._iter_csv_backup(
             input_folder=input_folder,
             media_folder=media_folder,
             account_name=threema_account_name or "Me",
-        )
+        ):
+            chat = str(message.get("chat") or "").strip()
+            if chat:
+                unique_chats.add(chat)
+            sorter.add(message)
         default_chat_name = "Threema Backup"
 
-        unique_chats = sorted(
-            {
-                str(entry.get("chat") or "").strip()
-                for entry in messages
-                if str(entry.get("chat") or "").strip()
-            }
-        )
         if len(unique_chats) == 1:
-            header_chat_name = unique_chats[0]
+            header_chat_name = next(iter(unique_chats))
         else:
             header_chat_name = default_chat_name
 
-        metadata = {
-            "user": kwargs.get("user"),
-            "case": kwargs.get("case"),
-            "chat_name": header_chat_name,
-            "source": "Threema",
-            "platform": "mobile",
-            "threema_account_name": threema_account_name,
-        }
+        if metadata is not None:
+            metadata.update({
+                "user": kwargs.get("user"),
+                "case": kwargs.get("case"),
+                "chat_name": header_chat_name,
+                "source": "Threema",
+                "platform": "mobile",
+                "threema_account_name": threema_account_name,
+            })
 
-        return messages, metadata
+        return sorter.iter_sorted()
 
     # ----------------------
     # CSV backup parser
@@ -81,45 +96,37 @@ class ThreemaMessengerBackupParser:
     def _has_csv_backup_structure(self, root: Path) -> bool:
         return (root / "contacts.csv").is_file() and any(root.glob("message_*.csv"))
 
-    def _parse_csv_backup(self, input_folder: Path, media_folder: Path, account_name: str) -> List[Dict]:
+    def _iter_csv_backup(self, input_folder: Path, media_folder: Path, account_name: str) -> Iterator[Dict]:
         contacts = self._load_contacts(input_folder / "contacts.csv")
         groups = self._load_groups(input_folder / "groups.csv")
 
-        all_messages: List[Dict] = []
         for chat_file in sorted(input_folder.glob("message_*.csv")):
             contact_id = chat_file.stem.split("message_", 1)[1]
             contact = contacts.get(contact_id, {})
             chat_label = self._contact_display(contact, fallback=contact_id)
-            all_messages.extend(
-                self._parse_chat_csv(
-                    chat_file=chat_file,
-                    chat_name=chat_label,
-                    peer_name=chat_label,
-                    account_name=account_name,
-                    media_folder=media_folder,
-                    contact_index=contacts,
-                    is_group=False,
-                )
+            yield from self._parse_chat_csv(
+                chat_file=chat_file,
+                chat_name=chat_label,
+                peer_name=chat_label,
+                account_name=account_name,
+                media_folder=media_folder,
+                contact_index=contacts,
+                is_group=False,
             )
 
         for group_file in sorted(input_folder.glob("group_message_*.csv")):
             group_id = group_file.stem.split("group_message_", 1)[1]
             group_name = groups.get(group_id, {}).get("groupname") or f"Group {group_id}"
-            all_messages.extend(
-                self._parse_chat_csv(
-                    chat_file=group_file,
-                    chat_name=group_name,
-                    peer_name=None,
-                    account_name=account_name,
-                    media_folder=media_folder,
-                    contact_index=contacts,
-                    is_group=True,
-                )
+            yield from self._parse_chat_csv(
+                chat_file=group_file,
+                chat_name=group_name,
+                peer_name=None,
+                account_name=account_name,
+                media_folder=media_folder,
+                contact_index=contacts,
+                is_group=True,
             )
 
-        all_messages.sort(key=lambda msg: msg.get("timestamp") or "")
-        return all_messages
-
     def _load_contacts(self, path: Path) -> Dict[str, Dict[str, str]]:
         mapping: Dict[str, Dict[str, str]] = {}
         if not path.is_file():
@@ -154,9 +161,7 @@ class ThreemaMessengerBackupParser:
         media_folder: Path,
         contact_index: Dict[str, Dict[str, str]],
         is_group: bool,
-    ) -> List[Dict]:
-        parsed: List[Dict] = []
-
+    ) -> Iterator[Dict]:
         for row in self._read_csv_rows(chat_file):
             timestamp = self._timestamp_from_row(row)
             msg_type = (row.get("type") or "").strip().upper()
@@ -185,22 +190,20 @@ class ThreemaMessengerBackupParser:
             if not content and media:
                 content = f"[{msg_type.lower() if msg_type else 'media'}]"
 
-            message = {
-                "timestamp": timestamp,
-                "sender": sender,
-                "content": content,
-                "media": media,
-                "url": self._extract_url(content),
-                "is_owner": is_outbox,
-                "chat": chat_name,
-            }
+            message = Message(
+                timestamp=timestamp,
+                sender=sender,
+                content=content,
+                media=media,
+                url=self._extract_url(content),
+                is_owner=is_outbox,
+                chat=chat_name,
+            )
             if media_info.get("media_mime"):
                 message["media_mime"] = media_info["media_mime"]
             if media_info.get("media_output"):
                 message["media_output"] = media_info["media_output"]
-            parsed.append(message)
-
-        return parsed
+            yield message
 
     def _resolve_sender(
         self,
@@ -273,13 +276,13 @@ class ThreemaMessengerBackupParser:
             return {"media": f"message_media_{uid}", "media_mime": None, "media_output": None}
 
         media_mime = (
-            self._detect_mime_from_magic(source_path)
+            detect_mime(source_path, audio_hint=msg_type in {"VOICEMESSAGE", "VOICE"})
             or body_meta.get("mime")
             or mimetypes.guess_type(source_name)[0]
         )
         media_output = source_name
         if not Path(source_name).suffix and media_mime:
-            ext = self._extension_for_mime(media_mime)
+            ext = extension_for_mime(media_mime)
             if ext:
                 media_output = f"{source_name}.{ext}"
 
@@ -307,66 +310,6 @@ class ThreemaMessengerBackupParser:
                 break
         return result
 
-    def _detect_mime_from_magic(self, path: Path) -> Optional[str]:
-        try:
-            header = path.read_bytes()[:64]
-        except Exception:
-            return None
-        if not header:
-            return None
-
-        if header.startswith(b"\xFF\xD8\xFF"):
-            return "image/jpeg"
-        if header.startswith(b"\x89PNG\r\n\x1A\n"):
-            return "image/png"
-        if header.startswith((b"GIF87a", b"GIF89a")):
-            return "image/gif"
-        if header.startswith(b"RIFF") and len(header) >= 12 and header[8:12] == b"WEBP":
-            return "image/webp"
-        if header.startswith(b"%PDF-"):
-            return "application/pdf"
-        if header.startswith(b"OggS"):
-            return "audio/ogg"
-        if header.startswith((b"ID3",)):
-            return "audio/mpeg"
-        if len(header) >= 2 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0:
-            return "audio/mpeg"
-        if header.startswith(b"RIFF") and len(header) >= 12 and header[8:12] == b"WAVE":
-            return "audio/wav"
-        if len(header) >= 12 and header[4:8] == b"ftyp":
-            brand = header[8:12]
-            if brand in {b"M4A ", b"isom", b"mp41", b"mp42"}:
-                return "audio/mp4"
-            if brand in {b"qt  "}:
-                return "video/quicktime"
-            return "video/mp4"
-        if header.startswith(b"\x1A\x45\xDF\xA3"):
-            return "video/webm"
-        return None
-
-    def _extension_for_mime(self, mime: str) -> Optional[str]:
-        mime = (mime or "").lower().strip()
-        mapping = {
-            "image/jpeg": "jpg",
-            "image/png": "png",
-            "image/gif": "gif",
-            "image/webp": "webp",
-            "video/mp4": "mp4",
-            "video/quicktime": "mov",
-            "video/webm": "webm",
-            "audio/mpeg": "mp3",
-            "audio/mp4": "m4a",
-            "audio/ogg": "ogg",
-            "audio/wav": "wav",
-            "application/pdf": "pdf",
-        }
-        if mime in mapping:
-            return mapping[mime]
-        guessed = mimetypes.guess_extension(mime) if mime else None
-        if guessed:
-            return guessed.lstrip(".")
-        return None
-
     def _timestamp_from_row(self, row: Dict[str, str]) -> str:
         for key in ("posted_at", "created_at", "modified_at"):
             value = (row.get(key) or "").strip()
@@ -405,9 +348,10 @@ class ThreemaMessengerBackupParser:
         return fallback
 
     def _read_csv_rows(self, path: Path) -> List[Dict[str, str]]:
-        with path.open("r", encoding="utf-8", newline="") as handle:
-            reader = csv.DictReader(handle)
-            return [dict(row) for row in reader if row is not None]
+        with trace_span("decode_file", "parse", file=path.name):
+            with path.open("r", encoding="utf-8", newline="") as handle:
+                reader = csv.DictReader(handle)
+                return [dict(row) for row in reader if row is not None]
 
     # ----------------------
     # Generic helpers
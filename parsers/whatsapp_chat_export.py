@@ -7,12 +7,16 @@ Description: Creates Bubbly JSON from WhatsApp iOS/Android chat exports.
 """
 
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import Dict, Iterable, Iterator, Optional
 from datetime import datetime
 import re
 import unicodedata
 
-class WhatsAppChatExportParser:
+from parsers.base_parser import BaseParser, Message
+from utils.tracing import trace_span
+
+
+class WhatsAppChatExportParser(BaseParser):
     """
     Parser for WhatsApp chat exports (iOS + Android)
     """
@@ -22,19 +26,20 @@ class WhatsAppChatExportParser:
         "wa_account_number": "Optional. Account phone number (string).",
         "chat_name": "Optional. Overrides chat name in report header.",
     }
-    def parse(
+    def iter_messages(
         self,
         input_folder: Path,
         platform: str,
         wa_account_name: str = "",
         wa_account_number: str = "",
+        metadata: Optional[Dict] = None,
         **kwargs
-    ) -> Tuple[List[Dict], Dict]:
+    ) -> Iterator[Dict]:
         """
-        Generic parse entry point for BubblyLauncher
+        Streaming entry point for BubblyLauncher
         Returns:
-            messages: list of dicts (sender, content, timestamp, media, url, is_owner)
-            metadata: dict for BubblyExporter header
+            iterator of message dicts (sender, content, timestamp, media, url, is_owner)
+            metadata (filled in place): dict for BubblyExporter header
         """
         input_folder = Path(input_folder)
 
@@ -45,36 +50,40 @@ class WhatsAppChatExportParser:
         else:
             raise ValueError(f"Unsupported platform: {platform}")
 
-        chat_name = kwargs.get("chat_name")
+        # Build metadata for header
+        if metadata is not None:
+            metadata.update({
+                "user": kwargs.get("user"),
+                "case": kwargs.get("case"),
+                "chat_name": kwargs.get("chat_name"),
+                "source": "WhatsApp",
+                "wa_account_name": wa_account_name,
+                "wa_account_number": wa_account_number,
+                "platform": platform
+            })
+
+        return self._iter_with_owner(messages, wa_account_name, kwargs.get("chat_name"))
+
+    def _iter_with_owner(self, messages: Iterable[Dict], wa_account_name: str, chat_name: Optional[str]) -> Iterator[Dict]:
         # Determine is_owner for each message
         for msg in messages:
             msg["is_owner"] = msg["sender"] == wa_account_name
             msg["chat"] = chat_name
+            yield msg
 
-        # Build metadata for header
-        metadata = {
-            "user": kwargs.get("user"),
-            "case": kwargs.get("case"),
-            "chat_name": kwargs.get("chat_name"),
-            "source": "WhatsApp",
-            "wa_account_name": wa_account_name,
-            "wa_account_number": wa_account_number,
-            "platform": platform
-        }
-
-        return messages, metadata
-
-
-    def _parse_ios(self, input_folder: Path) -> List[Dict]:
+    def _parse_ios(self, input_folder: Path) -> Iterator[Dict]:
         '''
         Parse data from iOS Chat export
         '''
         txt_file = self._resolve_txt_file(input_folder)
+        return self._iter_ios(txt_file)
 
-        with open(txt_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+    def _iter_ios(self, txt_file: Path) -> Iterator[Dict]:
+        # The span stays open while messages stream, so it covers reading the whole file.
+        with trace_span("decode_file", "parse", file=txt_file.name), open(txt_file, "r", encoding="utf-8") as f:
+            yield from self._iter_ios_lines(f)
 
-        messages: List[Dict] = []
+    def _iter_ios_lines(self, lines: Iterable[str]) -> Iterator[Dict]:
         current_msg: Optional[Dict] = None
 
         for line in lines:
@@ -85,7 +94,7 @@ class WhatsAppChatExportParser:
 
             if line.startswith("["):  # New message
                 if current_msg:
-                    messages.append(current_msg)
+                    yield current_msg
 
                 # Extract timestamp
                 try:
@@ -107,13 +116,13 @@ class WhatsAppChatExportParser:
 
                 media_file, content = self._extract_media_file_ios(content)
 
-                current_msg = {
-                    "timestamp": self._normalize_timestamp_ios(timestamp),
-                    "sender": sender,
-                    "content": content,
-                    "media": media_file,
-                    "url": None
-                }
+                current_msg = Message(
+                    timestamp=self._normalize_timestamp_ios(timestamp),
+                    sender=sender,
+                    content=content,
+                    media=media_file,
+                    url=None,
+                )
             else:  # Continuation
                 if current_msg is not None:
                     existing_content = str(current_msg.get("content") or "")
@@ -123,21 +132,20 @@ class WhatsAppChatExportParser:
                     current_msg["content"] = content
 
         if current_msg:
-            messages.append(current_msg)
-
-        return messages
+            yield current_msg
 
     # ----------------------
     # Android parser
     # ----------------------
-    def _parse_android(self, input_folder: Path) -> List[Dict]:
+    def _parse_android(self, input_folder: Path) -> Iterator[Dict]:
         txt_file = self._resolve_txt_file(input_folder)
+        return self._iter_android(txt_file)
 
-        messages = []
+    def _iter_android(self, txt_file: Path) -> Iterator[Dict]:
         current_msg = {}
         timestamp_pattern = re.compile(r"^\d{2}/\d{2}/\d{4}, \d{2}:\d{2} - ")
 
-        with open(txt_file, encoding="utf-8") as f:
+        with trace_span("decode_file", "parse", file=txt_file.name), open(txt_file, encoding="utf-8") as f:
             for line in f:
                 line = line.rstrip("\n")
                 if timestamp_pattern.match(line):
@@ -147,7 +155,7 @@ class WhatsAppChatExportParser:
                         current_msg["media"] = media_file
                         current_msg["content"] = text
                         current_msg["url"] = self._extract_url(current_msg["content"])
-                        messages.append(current_msg)
+                        yield current_msg
 
                     # Start new message
                     split_index = line.find(" - ")
@@ -158,13 +166,13 @@ class WhatsAppChatExportParser:
                     else:
                         sender, content = rest, ""
 
-                    current_msg = {
-                        "timestamp": self._normalize_timestamp_android(timestamp),
-                        "sender": sender,
-                        "content": content,
-                        "media": None,
-                        "url": None
-                    }
+                    current_msg = Message(
+                        timestamp=self._normalize_timestamp_android(timestamp),
+                        sender=sender,
+                        content=content,
+                        media=None,
+                        url=None,
+                    )
                 else:
                     if current_msg:
                         current_msg["content"] += "\n" + line
@@ -174,9 +182,7 @@ class WhatsAppChatExportParser:
             current_msg["media"] = media_file
             current_msg["content"] = text
             current_msg["url"] = self._extract_url(current_msg["content"])
-            messages.append(current_msg)
-
-        return messages
+            yield current_msg
 
     def _resolve_txt_file(self, input_path: Path) -> Path:
         if input_path.is_file():
@@ -11,25 +11,29 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
 import base64
 import json
 
+from parsers.base_parser import BaseParser, Message
+from utils.tracing import trace_span
 
-class WireMessengerBackupParser:
+
+class WireMessengerBackupParser(BaseParser):
     """
     Parser for Wire Messenger unencrypted backups (.binpb protobuf files).
     """
     PARSER_ARGS = {}
 
-    def parse(
+    def iter_messages(
         self,
         input_folder: Path,
         media_folder: Path,
+        metadata: Optional[Dict] = None,
         **kwargs
-    ) -> Tuple[List[Dict], Dict]:
-        """Parse Wire backup protobuf files into normalized chat messages."""
+    ) -> Iterator[Dict]:
+        """Stream Wire backup protobuf messages as normalized chat messages."""
         input_folder = Path(input_folder)
         if input_folder.is_file():
             input_folder = input_folder.parent
@@ -44,7 +48,29 @@ class WireMessengerBackupParser:
         owner_name = user_map.get(account_id) if account_id else None
         conv_map = self._build_conversation_map(conversations)
 
-        parsed_messages: List[Dict] = []
+        if metadata is None:
+            metadata = {}
+        metadata.update({
+            "user": kwargs.get("user"),
+            "case": kwargs.get("case"),
+            "chat_name": "Wire Backup",
+            "source": "Wire Messenger",
+            "platform": "desktop",
+            "wire_account_name": owner_name,
+        })
+
+        return self._iter_normalized(messages, media_folder, account_id, user_map, conv_map, metadata)
+
+    def _iter_normalized(
+        self,
+        messages: List[Dict[str, Any]],
+        media_folder: Path,
+        account_id: str,
+        user_map: Dict[str, str],
+        conv_map: Dict[str, str],
+        metadata: Dict,
+    ) -> Iterator[Dict]:
+        unique_chats = set()
         for msg in messages:
             sender_id = self._normalize_id(msg.get("3"))
             conversation_id = self._normalize_id(msg.get("5"))
@@ -59,38 +85,20 @@ class WireMessengerBackupParser:
             if not content and media:
                 content = "[media]"
 
-            parsed_messages.append({
-                "timestamp": timestamp,
-                "sender": user_map.get(sender_id, sender_id or "Unknown"),
-                "content": content,
-                "media": media,
-                "url": None,
-                "is_owner": bool(account_id and sender_id == account_id),
-                "chat": chat_name,
-            })
-
-        unique_chats = sorted(
-            {
-                str(entry.get("chat") or "").strip()
-                for entry in parsed_messages
-                if str(entry.get("chat") or "").strip()
-            }
-        )
+            unique_chats.add(chat_name.strip())
+            yield Message(
+                timestamp=timestamp,
+                sender=user_map.get(sender_id, sender_id or "Unknown"),
+                content=content,
+                media=media,
+                url=None,
+                is_owner=bool(account_id and sender_id == account_id),
+                chat=chat_name,
+            )
+
+        unique_chats.discard("")
         if len(unique_chats) == 1:
-            header_chat_name = unique_chats[0]
-        else:
-            header_chat_name = "Wire Backup"
-
-        metadata = {
-            "user": kwargs.get("user"),
-            "case": kwargs.get("case"),
-            "chat_name": header_chat_name,
-            "source": "Wire Messenger",
-            "platform": "desktop",
-            "wire_account_name": owner_name,
-        }
-
-        return parsed_messages, metadata
+            metadata["chat_name"] = next(iter(unique_chats))
 
     # ----------------------
     # Loading helpers
@@ -110,11 +118,12 @@ class WireMessengerBackupParser:
         return objects
 
     def _load_binpb_or_json(self, path: Path) -> Any:
-        if path.suffix.lower() == ".json":
-            with path.open("r", encoding="utf-8") as handle:
-                return json.load(handle)
-        data = path.read_bytes()
-        return decode_protobuf_to_dict(data)
+        with trace_span("decode_file", "parse", file=path.name):
+            if path.suffix.lower() == ".json":
+                with path.open("r", encoding="utf-8") as handle:
+                    return json.load(handle)
+            data = path.read_bytes()
+            return decode_protobuf_to_dict(data)
 
     def _find_account_id(self, root: Path) -> str:
         for pattern in ("messages_*.binpb", "conversations_*.binpb", "users_*.binpb"):
@@ -3,7 +3,13 @@ document.addEventListener("DOMContentLoaded", () => {
     // ----------------------
     // Configuration
     // ----------------------
-    const MESSAGES_PER_BATCH = 20;
+    // Rows rendered above and below the visible part of the list.
+    const ROW_BUFFER = 10;
+    // Height assumed for rows that have not been rendered yet, until real rows are measured.
+    const ESTIMATED_ROW_HEIGHT = 90;
+    // Tallest spacer we create; browsers cap element heights (about 17.9M px in Firefox,
+    // 33.5M px in Chrome). Longer lists map the scroll position onto rows with a scale factor.
+    const MAX_SPACER_HEIGHT = 15000000;
 
     // ----------------------
     // Elements
@@ -17,8 +23,87 @@ document.addEventListener("DOMContentLoaded", () => {
     const importAnnotationsInput = document.getElementById("importAnnotationsInput");
     const annotationFeedback = document.getElementById("annotationFeedback");
 
-    let filteredMessages = messages.slice(); // initially all messages
-    let currentIndex = 0;
+    // ----------------------
+    // Message columns
+    // ----------------------
+    // Messages arrive as dictionary-encoded column blocks (see _ColumnBlock in exporter.py):
+    // string tables for senders, chats and MIME types, integer ids into them, and plain
+    // columns for the other fields. The inline payload is one block; chunked and compressed
+    // exports add theirs while loading. Message objects are only built for rendered rows.
+    const tables = { sender: [], chat: [], mime: [] };
+    const columns = { sender: [], chat: [], mime: [], owner: [], timestamp: [], ts_ms: [], content: [], media: [] };
+    const extraFields = new Map(); // message index -> fields without a column
+    const ownerSenderIds = new Set();
+
+    function totalMessageCount() {
+        return columns.content.length;
+    }
+
+    function appendMessageBlock(block) {
+        const start = totalMessageCount();
+        Object.keys(tables).forEach(name => {
+            (block.tables[name] || []).forEach(value => tables[name].push(value));
+        });
+        Object.keys(columns).forEach(name => {
+            const column = columns[name];
+            block.columns[name].forEach(value => column.push(value));
+        });
+        Object.entries(block.extra || {}).forEach(([index, fields]) => {
+            extraFields.set(start + Number(index), fields);
+        });
+        for (let i = start; i < totalMessageCount(); i++) {
+            if (columns.owner[i]) ownerSenderIds.add(columns.sender[i]);
+        }
+        return start;
+    }
+
+    if (typeof messageData !== "undefined" && messageData) {
+        appendMessageBlock(messageData);
+    }
+
+    function allMessageIndices() {
+        const indices = new Int32Array(totalMessageCount());
+        for (let i = 0; i < indices.length; i++) {
+            indices[i] = i;
+        }
+        return indices;
+    }
+
+    // Key of a message for tag assignments, read from the columns.
+    function messageKeyAt(index) {
+        return [
+            tables.chat[columns.chat[index]] || "",
+            columns.timestamp[index] || "",
+            tables.sender[columns.sender[index]] || "",
+            columns.content[index] || "",
+            columns.media[index] || ""
+        ].join("||");
+    }
+
+    function messageAt(index) {
+        return {
+            ...(extraFields.get(index) || {}),
+            sender: tables.sender[columns.sender[index]],
+            chat: tables.chat[columns.chat[index]],
+            media_mime: tables.mime[columns.mime[index]],
+            is_owner: columns.owner[index] === 1,
+            timestamp: columns.timestamp[index],
+            ts_ms: columns.ts_ms[index],
+            content: columns.content[index],
+            media: columns.media[index],
+            __msgKey: messageKeyAt(index)
+        };
+    }
+
+    let filteredIndices = allMessageIndices(); // indices of the shown messages, initially all
+
+    // Chunked exports start with an empty list and load data/<report>/chunk_NNNN.js files;
+    // compressed exports start empty too and inflate the embedded base64 payload.
+    const chunkInfo = typeof messageChunks !== "undefined" ? messageChunks : null;
+    const compressedInfo = typeof messagesCompressed !== "undefined" ? messagesCompressed : null;
+    const expectedTotal = (chunkInfo || compressedInfo || {}).total;
+    let allMessagesLoaded = !chunkInfo && !compressedInfo;
+    let loadError = "";
 
     // Toogle header visibility
     toggleBtn.addEventListener("click", () => {
@@ -66,39 +151,15 @@ document.addEventListener("DOMContentLoaded", () => {
     };
     const tagAssignments = new Map();
 
-    const uniqueChats = [...new Set(messages.map(msg => msg.chat || "Chat"))]
-        .sort((a, b) => a.localeCompare(b, undefined, { sensitivity: "base" }));
+    let uniqueChats = collectUniqueChats();
 
-    function normalizeTagName(value) {
-        return (value || "").trim().replace(/\s+/g, " ");
-    }
-
-    function getMessageKey(msg) {
-        return [
-            msg.chat || "",
-            msg.timestamp || "",
-            msg.sender || "",
-            msg.content || "",
-            msg.media || ""
-        ].join("||");
+    function collectUniqueChats() {
+        return [...new Set(tables.chat.map(chat => chat || "Chat"))]
+            .sort((a, b) => a.localeCompare(b, undefined, { sensitivity: "base" }));
     }
 
-    function simpleHash(text) {
-        let hash = 0;
-        const value = String(text || "");
-        for (let i = 0; i < value.length; i++) {
-            hash = ((hash << 5) - hash) + value.charCodeAt(i);
-            hash |= 0;
-        }
-        return Math.abs(hash).toString(16);
-    }
-
-    function buildReportId() {
-        const count = messages.length;
-        const first = messages[0] ? getMessageKey(messages[0]) : "";
-        const last = messages[count - 1] ? getMessageKey(messages[count - 1]) : "";
-        const chatSeed = [...new Set(messages.map(msg => msg.chat || "Chat"))].sort().join("|");
-        return `report-${simpleHash(`${count}|${first}|${last}|${chatSeed}`)}`;
+    function normalizeTagName(value) {
+        return (value || "").trim().replace(/\s+/g, " ");
     }
 
     function showAnnotationFeedback(text) {
@@ -111,10 +172,12 @@ document.addEventListener("DOMContentLoaded", () => {
         }, 2200);
     }
 
-    const REPORT_ID = buildReportId();
+    // Computed by the exporter from all messages, independent of their order (see _ReportIdentity).
+    const REPORT_ID = reportId;
     const TAG_STORAGE_KEY = `bubbly_tags_v1:${REPORT_ID}`;
 
     function saveTagState() {
+        if (!allMessagesLoaded) return;
         const payload = {
             version: 1,
             report_id: REPORT_ID,
@@ -146,6 +209,7 @@ document.addEventListener("DOMContentLoaded", () => {
                         tagAssignments.set(key, normalized);
                     }
                 });
+                markTagsChanged();
             }
         } catch (_) {
             // Ignore invalid storage content.
@@ -160,6 +224,7 @@ document.addEventListener("DOMContentLoaded", () => {
             throw new Error("Annotation file belongs to another report.");
         }
         tagAssignments.clear();
+        markTagsChanged();
         if (parsed.assignments && typeof parsed.assignments === "object") {
             Object.entries(parsed.assignments).forEach(([key, tags]) => {
                 if (!Array.isArray(tags)) return;
@@ -307,21 +372,25 @@ document.addEventListener("DOMContentLoaded", () => {
         };
     }
 
-    const chatOptions = uniqueChats.map(chat => ({
-        value: chat,
-        label: chat
-    }));
-    const chatSelect = buildMultiSelect(chatFilter, chatOptions, "All chats", true);
-
-    // Get unique senders
-    const ownerNames = new Set(messages.filter(msg => msg.is_owner).map(msg => msg.sender));
-    const uniqueSenders = [...new Set(messages.map(msg => msg.sender))]
-        .sort((a, b) => a.localeCompare(b, undefined, { sensitivity: "base" }));
-    const senderOptions = uniqueSenders.map(sender => ({
-        value: sender,
-        label: ownerNames.has(sender) ? `${sender} (Owner)` : sender
-    }));
-    const senderSelect = buildMultiSelect(senderFilter, senderOptions, "All senders", false, true);
+    function buildChatOptions() {
+        return uniqueChats.map(chat => ({
+            value: chat,
+            label: chat
+        }));
+    }
+    const chatSelect = buildMultiSelect(chatFilter, buildChatOptions(), "All chats", true);
+
+    // Senders are selected by their id in the sender table
+    function buildSenderOptions() {
+        return tables.sender
+            .map((sender, id) => id)
+            .sort((a, b) => tables.sender[a].localeCompare(tables.sender[b], undefined, { sensitivity: "base" }))
+            .map(id => ({
+                value: id,
+                label: ownerSenderIds.has(id) ? `${tables.sender[id]} (Owner)` : tables.sender[id]
+            }));
+    }
+    const senderSelect = buildMultiSelect(senderFilter, buildSenderOptions(), "All senders", false, true);
 
     const mediaOptions = [
         { value: "image", label: "Image" },
@@ -332,67 +401,371 @@ document.addEventListener("DOMContentLoaded", () => {
         { value: "other", label: "Other" }
     ];
     const mediaSelect = buildMultiSelect(mediaFilter, mediaOptions, "All media");
+    // The filter engine gets media categories as their position in mediaOptions.
+    const mediaCategoryCodes = new Map(mediaOptions.map((opt, code) => [opt.value, code]));
 
-    messages.forEach(msg => {
-        msg.__msgKey = getMessageKey(msg);
-    });
-    loadTagState();
-    const tagOptions = [...DEFAULT_TAGS]
-        .sort((a, b) => a.localeCompare(b, undefined, { sensitivity: "base" }))
-        .map(tag => ({ value: tag, label: tag, color: TAG_COLOR_MAP[tag] || "#6b7280" }));
-    const tagSelect = buildMultiSelect(tagFilter, tagOptions, "All tags", false, true);
+    // ----------------------
+    // Filter engine (Web Worker)
+    // ----------------------
+    // Filtering and search run in a worker built from the source of this function, loaded
+    // through a Blob URL so it also works for reports opened from file://. The worker keeps
+    // the searchable columns of every message (chats, senders and media categories as integer
+    // ids) and answers each query with the indices of the matching messages, in export (time)
+    // order. It scans in slices and drops a query as soon as a newer one arrives. The function
+    // must stay self-contained: it runs in the worker's global scope, or in the page when
+    // workers are unavailable.
+    //
+    // Reports carry a word index built at export (utils/search_index.py): sorted terms with
+    // varint-encoded posting lists. Search keeps substring semantics: every word of the query
+    // lies inside some word of a matching message, so a search only checks the messages that
+    // have, for each query word, an indexed word containing it ("voice" finds "invoice" and
+    // "voicemail"). The index only rules messages out; the candidates are checked as before.
+    function filterEngineMain(scope) {
+        const SLICE_SIZE = 20000;
+        const TOKEN_PATTERN = /[\p{L}\p{N}_]+/gu;
+        const chats = [];
+        const senders = [];
+        let sendersLower = [];
+        const mediaTypes = [];
+        const times = [];
+        const contents = [];
+        let tagsByIndex = new Map();
+        let latestQueryId = 0;
+        let wordIndex = null;
+
+        function loadWordIndex(data) {
+            const binary = atob(data.postings);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) {
+                bytes[i] = binary.charCodeAt(i);
+            }
+            const offsets = new Uint32Array(data.terms.length + 1);
+            data.lengths.forEach((length, i) => {
+                offsets[i + 1] = offsets[i] + length;
+            });
+            wordIndex = { terms: data.terms, offsets, bytes, count: data.count, maxTokenLength: data.max_token_length };
+        }
 
-    function parseTimestamp(timestamp) {
-        if (!timestamp) return null;
-        const text = timestamp.trim();
+        function decodePostings(term, visit) {
+            const bytes = wordIndex.bytes;
+            let current = -1;
+            let gap = 0;
+            let shift = 0;
+            for (let p = wordIndex.offsets[term]; p < wordIndex.offsets[term + 1]; p++) {
+                const byte = bytes[p];
+                gap += (byte & 0x7f) * 2 ** shift;
+                if (byte & 0x80) {
+                    shift += 7;
+                    continue;
+                }
+                current += gap;
+                visit(current);
+                gap = 0;
+                shift = 0;
+            }
+        }
 
-        // Android: "DD/MM/YYYY, HH:MM"
-        let match = text.match(/^(\d{2})\/(\d{2})\/(\d{4}), (\d{2}):(\d{2})$/);
-        if (match) {
-            const [, dd, mm, yyyy, hh, min] = match;
-            return new Date(Number(yyyy), Number(mm) - 1, Number(dd), Number(hh), Number(min)).getTime();
+        // Sorted numbers of the messages that have one of the given terms.
+        function termPostings(termIds) {
+            const list = [];
+            if (termIds.length === 1) {
+                decodePostings(termIds[0], number => list.push(number));
+                return list;
+            }
+            const marks = new Uint8Array(wordIndex.count);
+            termIds.forEach(term => decodePostings(term, number => {
+                marks[number] = 1;
+            }));
+            for (let number = 0; number < marks.length; number++) {
+                if (marks[number]) list.push(number);
+            }
+            return list;
         }
 
-        // iOS: "DD.MM.YYYY, HH:MM"
-        match = text.match(/^(\d{2})\.(\d{2})\.(\d{4}), (\d{2}):(\d{2})$/);
-        if (match) {
-            const [, dd, mm, yyyy, hh, min] = match;
-            return new Date(Number(yyyy), Number(mm) - 1, Number(dd), Number(hh), Number(min)).getTime();
+        function intersectSorted(left, right) {
+            const result = [];
+            let i = 0;
+            let j = 0;
+            while (i < left.length && j < right.length) {
+                if (left[i] < right[j]) {
+                    i++;
+                } else if (left[i] > right[j]) {
+                    j++;
+                } else {
+                    result.push(left[i]);
+                    i++;
+                    j++;
+                }
+            }
+            return result;
         }
 
-        // ISO 8601 without timezone: "YYYY-MM-DDTHH:MM:SS"
-        match = text.match(/^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})$/);
-        if (match) {
-            const [, yyyy, mm, dd, hh, min, sec] = match;
-            return new Date(
-                Number(yyyy),
-                Number(mm) - 1,
-                Number(dd),
-                Number(hh),
-                Number(min),
-                Number(sec || 0)
-            ).getTime();
+        function unionSorted(left, right) {
+            const result = [];
+            let i = 0;
+            let j = 0;
+            while (i < left.length || j < right.length) {
+                if (j >= right.length || (i < left.length && left[i] < right[j])) {
+                    result.push(left[i++]);
+                } else if (i >= left.length || right[j] < left[i]) {
+                    result.push(right[j++]);
+                } else {
+                    result.push(left[i]);
+                    i++;
+                    j++;
+                }
+            }
+            return result;
         }
 
-        // ISO 8601 with timezone: "YYYY-MM-DDTHH:MM:SSZ" or "+/-HH:MM"
-        match = text.match(/^(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})(Z|[+-]\d{2}:\d{2})$/);
-        if (match) {
-            const parsed = Date.parse(text);
-            return Number.isNaN(parsed) ? null : parsed;
+        // Sorted candidate messages for a search text, or null when the word index does not narrow it.
+        function searchCandidates(text) {
+            if (!wordIndex) return null;
+            const words = text.match(TOKEN_PATTERN);
+            if (!words) return null;
+            const tokens = [...new Set(words)];
+            const termIds = tokens.map(() => []);
+            const terms = wordIndex.terms;
+            for (let term = 0; term < terms.length; term++) {
+                const value = terms[term];
+                // Indexed words are cut at maxTokenLength; the rest of a long word may hold any token.
+                const truncated = value.length >= wordIndex.maxTokenLength;
+                for (let k = 0; k < tokens.length; k++) {
+                    if (truncated || value.includes(tokens[k])) termIds[k].push(term);
+                }
+            }
+            const lists = [];
+            const offsets = wordIndex.offsets;
+            for (const ids of termIds) {
+                let size = 0;
+                ids.forEach(term => {
+                    size += offsets[term + 1] - offsets[term];
+                });
+                // A token found in most postings hardly narrows the search; leave it to the scan.
+                if (size * 2 > wordIndex.bytes.length) continue;
+                lists.push(termPostings(ids));
+            }
+            if (lists.length === 0) return null;
+            lists.sort((a, b) => a.length - b.length);
+            let candidates = lists[0];
+            for (let k = 1; k < lists.length && candidates.length > 0; k++) {
+                candidates = intersectSorted(candidates, lists[k]);
+            }
+            // Tags are not in the index; the few tagged messages are checked directly.
+            const tagged = [];
+            tagsByIndex.forEach((tags, index) => {
+                if (tags.some(tag => tag.toLowerCase().includes(text))) tagged.push(index);
+            });
+            return tagged.length > 0 ? unionSorted(candidates, tagged.sort((a, b) => a - b)) : candidates;
+        }
+
+        function runQuery(query) {
+            const chatSet = query.chats !== null ? new Set(query.chats) : null;
+            const senderSet = query.senders.length > 0 ? new Set(query.senders) : null;
+            const mediaSet = query.mediaTypes.length > 0 ? new Set(query.mediaTypes) : null;
+            const tagSet = query.tags.length > 0 ? new Set(query.tags) : null;
+            const hasRange = query.rangeStart !== null || query.rangeEnd !== null;
+            const text = query.text;
+            // Index candidates still go through matchesAt, which checks the exact text.
+            const candidates = text ? searchCandidates(text) : null;
+            const senderMatches = text ? sendersLower.map(sender => sender.includes(text)) : null;
+            const matches = [];
+            let position = 0;
+
+            function matchesAt(i) {
+                if (chatSet && !chatSet.has(chats[i])) return false;
+                if (senderSet && !senderSet.has(senders[i])) return false;
+                if (mediaSet && !mediaSet.has(mediaTypes[i])) return false;
+                const tags = tagsByIndex.get(i);
+                if (tagSet && !(tags && tags.some(tag => tagSet.has(tag)))) return false;
+                if (hasRange) {
+                    const ts = times[i];
+                    if (ts === null) return false;
+                    if (query.rangeStart !== null && ts < query.rangeStart) return false;
+                    if (query.rangeEnd !== null && ts > query.rangeEnd) return false;
+                }
+                if (text) {
+                    return contents[i].includes(text) ||
+                        senderMatches[senders[i]] ||
+                        (tags !== undefined && tags.some(tag => tag.toLowerCase().includes(text)));
+                }
+                return true;
+            }
+
+            function scanSlice() {
+                if (query.id !== latestQueryId) return; // superseded by a newer query
+                const total = candidates ? candidates.length : chats.length;
+                const end = Math.min(position + SLICE_SIZE, total);
+                for (; position < end; position++) {
+                    const index = candidates ? candidates[position] : position;
+                    // Chunked reports may not have loaded every indexed message yet.
+                    if (index < chats.length && matchesAt(index)) matches.push(index);
+                }
+                if (position < total) {
+                    // Yield, so a newer query can arrive and cancel this one.
+                    setTimeout(scanSlice, 0);
+                    return;
+                }
+                const indices = Int32Array.from(matches);
+                scope.postMessage({ type: "result", id: query.id, indices }, [indices.buffer]);
+            }
+            scanSlice();
+        }
+
+        scope.onmessage = (event) => {
+            const data = event.data;
+            if (data.type === "add") {
+                sendersLower = data.senderTable.map(sender => String(sender || "").toLowerCase());
+                for (let i = 0; i < data.content.length; i++) {
+                    chats.push(data.chat[i]);
+                    senders.push(data.sender[i]);
+                    mediaTypes.push(data.media[i]);
+                    times.push(data.ts[i]);
+                    contents.push(String(data.content[i] || "").toLowerCase());
+                }
+            } else if (data.type === "index") {
+                loadWordIndex(data.index);
+            } else if (data.type === "tags") {
+                tagsByIndex = new Map(data.entries);
+            } else if (data.type === "query") {
+                latestQueryId = data.query.id;
+                runQuery(data.query);
+            }
+        };
+    }
+
+    // Same message protocol as the worker, served in the page (asynchronously, like a worker).
+    function createInlineFilterEngine() {
+        const engine = { onmessage: null, terminate() {} };
+        const scope = {
+            postMessage(data) {
+                window.setTimeout(() => engine.onmessage && engine.onmessage({ data }), 0);
+            }
+        };
+        filterEngineMain(scope);
+        engine.postMessage = (data) => {
+            window.setTimeout(() => scope.onmessage({ data }), 0);
+        };
+        return engine;
+    }
+
+    function createFilterEngine() {
+        if (typeof Worker === "undefined" || typeof Blob === "undefined" || typeof URL === "undefined") {
+            return createInlineFilterEngine();
+        }
+        try {
+            const source = `(${filterEngineMain.toString()})(self);`;
+            const worker = new Worker(URL.createObjectURL(new Blob([source], { type: "text/javascript" })));
+            worker.onerror = () => {
+                // Blocked or failing worker: continue with the in-page engine.
+                if (filterEngine !== worker) return;
+                worker.terminate();
+                connectFilterEngine(createInlineFilterEngine());
+                applyFilters(true);
+            };
+            return worker;
+        } catch (_) {
+            return createInlineFilterEngine();
+        }
+    }
+
+    let filterEngine = null;
+    let latestQueryId = 0;
+    let latestQueryKeepsPosition = false;
+    let filterPending = false;
+    // Message indices per message key, built when tags are first sent: tag assignments are
+    // keyed, the engine works on indices.
+    let indicesByKey = null;
+    let engineTagsStale = true;
+
+    function mediaCategoryAt(index) {
+        const category = getMediaCategory({ media: columns.media[index], media_mime: tables.mime[columns.mime[index]] });
+        return category === null ? -1 : mediaCategoryCodes.get(category);
+    }
+
+    function engineBlock(start) {
+        const count = totalMessageCount();
+        const media = new Int8Array(count - start);
+        for (let i = start; i < count; i++) {
+            media[i - start] = mediaCategoryAt(i);
+        }
+        return {
+            type: "add",
+            senderTable: tables.sender,
+            chat: columns.chat.slice(start),
+            sender: columns.sender.slice(start),
+            media,
+            ts: columns.ts_ms.slice(start),
+            content: columns.content.slice(start)
+        };
+    }
+
+    function connectFilterEngine(engine) {
+        filterEngine = engine;
+        filterEngine.onmessage = handleFilterResult;
+        filterEngine.postMessage(engineBlock(0));
+        if (typeof searchIndex !== "undefined" && searchIndex) {
+            filterEngine.postMessage({ type: "index", index: searchIndex });
         }
+        engineTagsStale = true;
+    }
+
+    function markTagsChanged() {
+        engineTagsStale = true;
+    }
 
-        return null;
+    function addToKeyIndex(start) {
+        for (let i = start; i < totalMessageCount(); i++) {
+            const key = messageKeyAt(i);
+            const indices = indicesByKey.get(key);
+            if (indices) {
+                indices.push(i);
+            } else {
+                indicesByKey.set(key, [i]);
+            }
+        }
     }
 
-    function sortMessagesByTimestamp(inputMessages) {
-        return inputMessages.slice().sort((a, b) => {
-            const ta = parseTimestamp(a.timestamp);
-            const tb = parseTimestamp(b.timestamp);
-            if (ta === null && tb === null) return 0;
-            if (ta === null) return 1;
-            if (tb === null) return -1;
-            return ta - tb;
+    function sendTagsToEngine() {
+        const entries = [];
+        if (tagAssignments.size > 0 && indicesByKey === null) {
+            indicesByKey = new Map();
+            addToKeyIndex(0);
+        }
+        tagAssignments.forEach((tags, key) => {
+            (indicesByKey.get(key) || []).forEach(index => entries.push([index, tags]));
         });
+        filterEngine.postMessage({ type: "tags", entries });
+        engineTagsStale = false;
+    }
+
+    function handleFilterResult(event) {
+        const data = event.data;
+        if (data.type !== "result" || data.id !== latestQueryId) return; // stale query
+        filterPending = false;
+        resetAndRender(data.indices, latestQueryKeepsPosition);
+    }
+
+    connectFilterEngine(createFilterEngine());
+    if (allMessagesLoaded) {
+        loadTagState();
+    }
+    const tagOptions = [...DEFAULT_TAGS]
+        .sort((a, b) => a.localeCompare(b, undefined, { sensitivity: "base" }))
+        .map(tag => ({ value: tag, label: tag, color: TAG_COLOR_MAP[tag] || "#6b7280" }));
+    const tagSelect = buildMultiSelect(tagFilter, tagOptions, "All tags", false, true);
+
+    // Messages arrive sorted by time and carry `ts_ms`, the wall-clock time of their timestamp
+    // (as displayed, any UTC offset dropped) counted as if it were UTC. Filter bounds are
+    // converted the same way, so no parsing is needed here.
+    function wallClockMs(date) {
+        return date.getTime() - date.getTimezoneOffset() * 60 * 1000;
+    }
+
+    function inputWallClockMs(value) {
+        if (!value) return null;
+        const parsed = Date.parse(`${value}Z`);
+        return Number.isNaN(parsed) ? null : parsed;
     }
 
     function getMediaCategory(msg) {
@@ -459,83 +832,54 @@ document.addEventListener("DOMContentLoaded", () => {
         } else {
             tagAssignments.set(msgKey, Array.from(current).sort((a, b) => a.localeCompare(b)));
         }
+        markTagsChanged();
         saveTagState();
     }
 
-    function applyFilters() {
-    let filtered = messages.slice();
-
-    // Filter by chat
-    const chatValues = chatSelect.getSelected();
-    if (chatValues.length > 0) {
-        const chat = chatValues[0];
-        filtered = filtered.filter(msg => (msg.chat || "Chat") === chat);
-    }
-
-    // Filter by sender (multi-select)
-    const senderValues = senderSelect.getSelected();
-    if (senderValues.length > 0) {
-        filtered = filtered.filter(msg => senderValues.includes(msg.sender));
-    }
-
-    // Filter by media type (multi-select)
-    const mediaTypes = mediaSelect.getSelected();
-    if (mediaTypes.length > 0) {
-        filtered = filtered.filter(msg => {
-            if (!msg.media) return false;
-            const category = getMediaCategory(msg);
-            return category ? mediaTypes.includes(category) : false;
-        });
-    }
-
-    // Filter by tags (multi-select, any selected tag matches)
-    const selectedTags = tagSelect.getSelected();
-    if (selectedTags.length > 0) {
-        filtered = filtered.filter(msg => {
-            const msgTags = getMessageTags(msg);
-            return selectedTags.some(tag => msgTags.includes(tag));
-        });
-    }
+    function applyFilters(keepPosition) {
+        // The chat filter selects a label; several table entries can share it (e.g. "" and "Chat").
+        const chatValues = chatSelect.getSelected();
+        const chatIds = chatValues.length > 0
+            ? tables.chat.map((chat, id) => ((chat || "Chat") === chatValues[0] ? id : -1)).filter(id => id >= 0)
+            : null;
+
+        // Time range
+        const preset = timePreset.value;
+        const now = wallClockMs(new Date());
+        let rangeStart = null;
+        let rangeEnd = null;
+        if (preset === "last24h") {
+            rangeStart = now - 24 * 60 * 60 * 1000;
+            rangeEnd = now;
+        } else if (preset === "last30d") {
+            rangeStart = now - 30 * 24 * 60 * 60 * 1000;
+            rangeEnd = now;
+        } else if (preset === "custom") {
+            rangeStart = inputWallClockMs(timeFrom.value);
+            rangeEnd = inputWallClockMs(timeTo.value);
+        }
 
-    // Filter by time
-    const preset = timePreset.value;
-    const now = Date.now();
-    let rangeStart = null;
-    let rangeEnd = null;
-    if (preset === "last24h") {
-        rangeStart = now - 24 * 60 * 60 * 1000;
-        rangeEnd = now;
-    } else if (preset === "last30d") {
-        rangeStart = now - 30 * 24 * 60 * 60 * 1000;
-        rangeEnd = now;
-    } else if (preset === "custom") {
-        const fromValue = timeFrom.value ? new Date(timeFrom.value).getTime() : null;
-        const toValue = timeTo.value ? new Date(timeTo.value).getTime() : null;
-        rangeStart = fromValue;
-        rangeEnd = toValue;
-    }
-
-    if (rangeStart !== null || rangeEnd !== null) {
-        filtered = filtered.filter(msg => {
-            const ts = parseTimestamp(msg.timestamp);
-            if (ts === null) return false;
-            if (rangeStart !== null && ts < rangeStart) return false;
-            if (rangeEnd !== null && ts > rangeEnd) return false;
-            return true;
+        if (engineTagsStale) {
+            sendTagsToEngine();
+        }
+        latestQueryId++;
+        // Event listeners pass an Event here; only an explicit `true` keeps the scroll position.
+        latestQueryKeepsPosition = keepPosition === true;
+        filterPending = true;
+        filterEngine.postMessage({
+            type: "query",
+            query: {
+                id: latestQueryId,
+                chats: chatIds,
+                senders: senderSelect.getSelected(),
+                mediaTypes: mediaSelect.getSelected().map(category => mediaCategoryCodes.get(category)),
+                tags: tagSelect.getSelected(),
+                rangeStart,
+                rangeEnd,
+                text: searchInput.value.toLowerCase()
+            }
         });
-    }
-
-    // Apply search too
-    const query = searchInput.value.toLowerCase();
-    if (query) {
-        filtered = filtered.filter(msg =>
-            msg.content.toLowerCase().includes(query) ||
-            msg.sender.toLowerCase().includes(query) ||
-            getMessageTags(msg).some(tag => tag.toLowerCase().includes(query))
-        );
-    }
-
-        resetAndRender(sortMessagesByTimestamp(filtered));
+        updateMessageCount();
     }
 
     searchInput.addEventListener("input", applyFilters);
@@ -604,13 +948,16 @@ document.addEventListener("DOMContentLoaded", () => {
         const isMissing = mediaFile.startsWith("missing:");
         const displayName = isMissing ? mediaFile.replace(/^missing:/, "") : mediaFile;
         const missingNote = isMissing ? `<div class="media-missing">Missing media file</div>` : "";
+        // Content-addressed exports store files by digest; show the original name instead.
+        const label = msg.media_name || displayName;
+        const hashTitle = msg.media_sha256 ? ` title="SHA-256: ${msg.media_sha256}"` : "";
 
         if (mediaType === "image") {
             // clickable image preview
             return `
             <div class="media">
-                <a href="media/${displayName}" target="_blank">
-                    <img src="media/${displayName}" alt="${displayName}">
+                <a href="media/${displayName}" target="_blank"${hashTitle}>
+                    <img src="media/${displayName}" alt="${label}">
                 </a>
                 ${missingNote}
             </div>`;
@@ -634,57 +981,41 @@ document.addEventListener("DOMContentLoaded", () => {
             </div>`;
         } 
         else if (mediaType === "document") {
-            return `<div class="media"><a href="media/${displayName}" target="_blank">${displayName}</a>${missingNote}</div>`;
+            return `<div class="media"><a href="media/${displayName}" target="_blank"${hashTitle}>${label}</a>${missingNote}</div>`;
         } 
         else {
-            return `<div class="media"><a href="media/${displayName}" target="_blank">${displayName}</a>${missingNote}</div>`;
+            return `<div class="media"><a href="media/${displayName}" target="_blank"${hashTitle}>${label}</a>${missingNote}</div>`;
         }
     }
 
     // ----------------------
-    // Render a batch of messages
+    // Render one message bubble
     // ----------------------
-    function renderNextBatch() {
-        if (currentIndex >= filteredMessages.length) return;
-
-        const endIndex = Math.min(currentIndex + MESSAGES_PER_BATCH, filteredMessages.length);
-
+    function renderBubble(msg) {
         const showChatTag = uniqueChats.length > 1;
-        for (let i = currentIndex; i < endIndex; i++) {
-            const msg = filteredMessages[i];
-            const msgDiv = document.createElement("div");
-            msgDiv.classList.add("bubble");
-
-
-            let displayName = msg.sender;
-            if (msg.is_owner) {
-                displayName += " (Owner)";
-            }
-            // Bubble position
-            if (msg.is_owner) {
-                msgDiv.classList.add("right", "owner");
-            } else {
-                msgDiv.classList.add("left", "other");
-            }
-
-
-
-
-            // Message HTML
-            const chatTag = showChatTag ? `<div class="chat-tag">${msg.chat || "Chat"}</div>` : "";
-            const encodedKey = encodeURIComponent(msg.__msgKey || "");
-            const currentTags = getMessageTags(msg);
-            const tagsHtml = currentTags.length > 0
-                ? `<div class="message-tags">${currentTags.map(tag => `<span class="message-tag" style="background:${getTagColor(tag)};color:#fff;">${escapeHtml(tag)}</span>`).join("")}</div>`
-                : "";
-            const tagOptionsHtml = [...DEFAULT_TAGS]
-                .sort((a, b) => a.localeCompare(b, undefined, { sensitivity: "base" }))
-                .map(tag => {
-                    const checked = currentTags.includes(tag) ? "checked" : "";
-                    return `<label class="tag-option"><input type="checkbox" class="tag-checkbox" data-msg-key="${encodedKey}" data-tag="${escapeHtml(tag)}" ${checked}> <span class="tag-color-dot" style="background:${getTagColor(tag)};"></span><span>${escapeHtml(tag)}</span></label>`;
-                })
-                .join("");
-            msgDiv.innerHTML = `
+        let displayName = msg.sender;
+        if (msg.is_owner) {
+            displayName += " (Owner)";
+        }
+        // Bubble position
+        const positionClasses = msg.is_owner ? "right owner" : "left other";
+
+        // Message HTML
+        const chatTag = showChatTag ? `<div class="chat-tag">${msg.chat || "Chat"}</div>` : "";
+        const encodedKey = encodeURIComponent(msg.__msgKey || "");
+        const currentTags = getMessageTags(msg);
+        const tagsHtml = currentTags.length > 0
+            ? `<div class="message-tags">${currentTags.map(tag => `<span class="message-tag" style="background:${getTagColor(tag)};color:#fff;">${escapeHtml(tag)}</span>`).join("")}</div>`
+            : "";
+        const tagOptionsHtml = [...DEFAULT_TAGS]
+            .sort((a, b) => a.localeCompare(b, undefined, { sensitivity: "base" }))
+            .map(tag => {
+                const checked = currentTags.includes(tag) ? "checked" : "";
+                return `<label class="tag-option"><input type="checkbox" class="tag-checkbox" data-msg-key="${encodedKey}" data-tag="${escapeHtml(tag)}" ${checked}> <span class="tag-color-dot" style="background:${getTagColor(tag)};"></span><span>${escapeHtml(tag)}</span></label>`;
+            })
+            .join("");
+        return `
+            <div class="bubble ${positionClasses}">
                 ${chatTag}
                 <p><strong>${displayName}</strong></p>
                 <p>${msg.content.replace(/\n/g, "<br>")}</p>
@@ -697,12 +1028,218 @@ document.addEventListener("DOMContentLoaded", () => {
                         ${tagOptionsHtml || '<div class="tag-option">No tags available</div>'}
                     </div>
                 </div>
-            `;
+            </div>
+        `;
+    }
+
+    // ----------------------
+    // Virtualized message list
+    // ----------------------
+    // Only the rows in and around the visible area exist in the DOM. They are absolutely
+    // positioned inside a spacer as tall as the whole list; row offsets come from a Fenwick
+    // tree over the row heights, so finding the first visible row of a million-row list
+    // takes about 20 steps. Rows leaving the window are recycled for the ones entering it.
+    // Above MAX_SPACER_HEIGHT the spacer stops growing: the scroll position is scaled to a
+    // content offset, and the rendered rows are placed relative to the visible area.
+    const spacer = document.createElement("div");
+    spacer.className = "chat-spacer";
+    container.appendChild(spacer);
+
+    const renderedRows = new Map(); // index in filteredIndices -> row element
+    const rowPool = [];
+    let rowCount = 0;
+    let rowHeights = new Float64Array(0);
+    let heightTree = new Float64Array(1);
+    let heightTreeTopBit = 0;
+    // Measured heights by message index; valid for one list width.
+    let rowHeightByMessage = [];
+    let measuredWidth = 0;
+    let measuredHeightSum = 0;
+    let measuredHeightCount = 0;
+    let renderScheduled = false;
+
+    const rowObserver = typeof ResizeObserver !== "undefined"
+        ? new ResizeObserver(() => scheduleRender())
+        : null;
+
+    function estimatedRowHeight() {
+        return measuredHeightCount > 0 ? measuredHeightSum / measuredHeightCount : ESTIMATED_ROW_HEIGHT;
+    }
+
+    function buildHeightIndex() {
+        rowCount = filteredIndices.length;
+        rowHeights = new Float64Array(rowCount);
+        heightTree = new Float64Array(rowCount + 1);
+        const estimate = estimatedRowHeight();
+        for (let i = 0; i < rowCount; i++) {
+            rowHeights[i] = rowHeightByMessage[filteredIndices[i]] || estimate;
+            const node = i + 1;
+            heightTree[node] += rowHeights[i];
+            const parent = node + (node & -node);
+            if (parent <= rowCount) {
+                heightTree[parent] += heightTree[node];
+            }
+        }
+        heightTreeTopBit = 1;
+        while (heightTreeTopBit * 2 <= rowCount) {
+            heightTreeTopBit *= 2;
+        }
+    }
+
+    function setRowHeight(index, height) {
+        const delta = height - rowHeights[index];
+        if (delta === 0) return false;
+        rowHeights[index] = height;
+        for (let node = index + 1; node <= rowCount; node += node & -node) {
+            heightTree[node] += delta;
+        }
+        return true;
+    }
+
+    // Total height of the rows before `index`.
+    function rowOffset(index) {
+        let sum = 0;
+        for (let node = index; node > 0; node -= node & -node) {
+            sum += heightTree[node];
+        }
+        return sum;
+    }
+
+    // Index of the row that contains the vertical position `offset`.
+    function rowAtOffset(offset) {
+        let index = 0;
+        let remaining = offset;
+        for (let step = heightTreeTopBit; step > 0; step >>= 1) {
+            const next = index + step;
+            if (next <= rowCount && heightTree[next] <= remaining) {
+                index = next;
+                remaining -= heightTree[next];
+            }
+        }
+        return Math.min(index, rowCount - 1);
+    }
+
+    function acquireRow() {
+        let row = rowPool.pop();
+        if (!row) {
+            row = document.createElement("div");
+            row.className = "message-row";
+            if (rowObserver) rowObserver.observe(row);
+        }
+        spacer.appendChild(row);
+        return row;
+    }
+
+    function releaseRow(row) {
+        row.remove();
+        // Dropping the content also stops and frees media elements of the row.
+        row.innerHTML = "";
+        rowPool.push(row);
+    }
+
+    function releaseAllRows() {
+        renderedRows.forEach(releaseRow);
+        renderedRows.clear();
+    }
+
+    function resetMeasuredHeights() {
+        rowHeightByMessage = [];
+        measuredHeightSum = 0;
+        measuredHeightCount = 0;
+        buildHeightIndex();
+    }
+
+    // Read the heights of the rendered rows; return true if any differed from the index.
+    function measureRenderedRows() {
+        let changed = false;
+        renderedRows.forEach((row, index) => {
+            const height = row.offsetHeight;
+            if (!height) return;
+            const messageIndex = filteredIndices[index];
+            const previous = rowHeightByMessage[messageIndex];
+            if (previous) {
+                measuredHeightSum += height - previous;
+            } else {
+                measuredHeightSum += height;
+                measuredHeightCount++;
+            }
+            rowHeightByMessage[messageIndex] = height;
+            if (setRowHeight(index, height)) {
+                changed = true;
+            }
+        });
+        return changed;
+    }
+
+    // Content pixels per spacer pixel of scrolling; 1 unless the spacer is capped.
+    function scrollScale(contentHeight, spacerHeight, viewportHeight) {
+        if (contentHeight <= spacerHeight || spacerHeight <= viewportHeight) return 1;
+        return (contentHeight - viewportHeight) / (spacerHeight - viewportHeight);
+    }
+
+    function scheduleRender() {
+        if (renderScheduled) return;
+        renderScheduled = true;
+        (window.requestAnimationFrame || (callback => window.setTimeout(callback, 16)))(renderVisibleRows);
+    }
 
-            container.appendChild(msgDiv);
+    function renderVisibleRows() {
+        renderScheduled = false;
+        const width = spacer.clientWidth;
+        if (width && width !== measuredWidth) {
+            if (measuredWidth) {
+                resetMeasuredHeights();
+            }
+            measuredWidth = width;
         }
+        // Measured rows rarely match the estimate; a few passes settle the window.
+        for (let pass = 0; pass < 3; pass++) {
+            const contentHeight = rowOffset(rowCount);
+            const spacerHeight = Math.min(contentHeight, MAX_SPACER_HEIGHT);
+            spacer.style.height = `${spacerHeight}px`;
+            if (rowCount === 0) {
+                releaseAllRows();
+                return;
+            }
+            // `position` is in spacer pixels, `top` the matching offset into the full list.
+            const position = Math.max(0, container.scrollTop - spacer.offsetTop);
+            const top = position * scrollScale(contentHeight, spacerHeight, container.clientHeight);
+            const anchor = rowAtOffset(top);
+            const anchorShift = top - rowOffset(anchor);
+            const first = Math.max(0, anchor - ROW_BUFFER);
+            const last = Math.min(rowCount - 1, rowAtOffset(top + container.clientHeight) + ROW_BUFFER);
+
+            renderedRows.forEach((row, index) => {
+                if (index < first || index > last) {
+                    renderedRows.delete(index);
+                    releaseRow(row);
+                }
+            });
+            for (let i = first; i <= last; i++) {
+                if (!renderedRows.has(i)) {
+                    const row = acquireRow();
+                    row.innerHTML = renderBubble(messageAt(filteredIndices[i]));
+                    renderedRows.set(i, row);
+                }
+            }
+            const changed = measureRenderedRows();
 
-        currentIndex = endIndex;
+            let offset = rowOffset(first) - top + position;
+            for (let i = first; i <= last; i++) {
+                renderedRows.get(i).style.transform = `translateY(${offset}px)`;
+                offset += rowHeights[i];
+            }
+            if (!changed) return;
+            // Keep the first visible row where it was when rows above it turned out taller or shorter.
+            const newContentHeight = rowOffset(rowCount);
+            const newSpacerHeight = Math.min(newContentHeight, MAX_SPACER_HEIGHT);
+            spacer.style.height = `${newSpacerHeight}px`;
+            const anchoredTop = rowOffset(anchor) + anchorShift;
+            if (Math.abs(anchoredTop - top) >= 1) {
+                const scale = scrollScale(newContentHeight, newSpacerHeight, container.clientHeight);
+                container.scrollTop = anchoredTop / scale + spacer.offsetTop;
+            }
+        }
     }
 
     container.addEventListener("click", (event) => {
@@ -712,6 +1249,7 @@ document.addEventListener("DOMContentLoaded", () => {
         const panel = container.querySelector(`.tag-panel[data-msg-key="${msgKey}"]`);
         if (!panel) return;
         panel.classList.toggle("hidden");
+        scheduleRender();
     });
 
     container.addEventListener("change", (event) => {
@@ -727,36 +1265,264 @@ document.addEventListener("DOMContentLoaded", () => {
     document.addEventListener("click", (event) => {
         if (event.target.closest(".tag-editor")) return;
         container.querySelectorAll(".tag-panel").forEach(panel => panel.classList.add("hidden"));
+        scheduleRender();
     });
 
     // ----------------------
     // Reset & render (e.g., after search)
     // ----------------------
-    function resetAndRender(newMessages) {
-        container.innerHTML = "";
-        filteredMessages = newMessages.slice();
-        currentIndex = 0;
+    function resetAndRender(newIndices, keepPosition = false) {
+        releaseAllRows();
+        filteredIndices = newIndices;
+        buildHeightIndex();
+        if (!keepPosition) {
+            container.scrollTop = 0;
+        }
         updateMessageCount();
-        renderNextBatch();
+        renderVisibleRows();
     }
 
     function updateMessageCount() {
         if (!messageCount) return;
-        messageCount.textContent = `Showing ${filteredMessages.length} of ${messages.length} messages`;
+        let text = `Showing ${filteredIndices.length} of ${totalMessageCount()} messages`;
+        if (loadError) {
+            text += ` (${loadError})`;
+        } else if (!allMessagesLoaded) {
+            text += ` (loading ${totalMessageCount()} of ${expectedTotal}...)`;
+        } else if (filterPending) {
+            text += " (filtering...)";
+        }
+        messageCount.textContent = text;
     }
 
     // ----------------------
-    // Lazy load on scroll
+    // Progressive loading of data chunks (chunked export)
     // ----------------------
-    container.addEventListener("scroll", () => {
-        if (container.scrollTop + container.clientHeight >= container.scrollHeight - 10) {
-            renderNextBatch();
+    // Chunks are plain scripts calling bubblyAddChunk(), so they also load over file://
+    window.bubblyAddChunk = (block) => {
+        const start = appendMessageBlock(block);
+        if (indicesByKey !== null) {
+            addToKeyIndex(start);
         }
-    });
+        markTagsChanged();
+        filterEngine.postMessage(engineBlock(start));
+        uniqueChats = collectUniqueChats();
+        chatSelect.setOptions(buildChatOptions());
+        senderSelect.setOptions(buildSenderOptions());
+        applyFilters(true);
+    };
+
+    function loadMessageChunk(index) {
+        if (index >= chunkInfo.count) {
+            finishLoading();
+            return;
+        }
+        const script = document.createElement("script");
+        script.src = `${chunkInfo.base}chunk_${String(index).padStart(4, "0")}.js`;
+        script.onload = () => {
+            script.remove();
+            loadMessageChunk(index + 1);
+        };
+        script.onerror = () => {
+            loadError = `failed to load ${script.src}`;
+            updateMessageCount();
+        };
+        document.body.appendChild(script);
+    }
+
+    // ----------------------
+    // Compressed payload
+    // ----------------------
+    async function loadCompressedMessages() {
+        try {
+            const binary = atob(compressedInfo.data);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) {
+                bytes[i] = binary.charCodeAt(i);
+            }
+            let text;
+            if (typeof DecompressionStream !== "undefined") {
+                const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream(compressedInfo.format));
+                text = await new Response(stream).text();
+            } else {
+                // Older browsers: slower built-in inflate.
+                text = new TextDecoder().decode(inflatePayload(bytes, compressedInfo.format));
+            }
+            window.bubblyAddChunk(JSON.parse(text));
+            finishLoading();
+        } catch (error) {
+            loadError = `failed to decompress messages: ${error.message}`;
+            updateMessageCount();
+        }
+    }
+
+    // Minimal DEFLATE decoder (RFC 1951) with gzip (RFC 1952) / zlib (RFC 1950) framing.
+    function inflatePayload(src, format) {
+        let pos = 0;
+        if (format === "gzip") {
+            const flags = src[3];
+            pos = 10;
+            if (flags & 4) pos += 2 + (src[pos] | (src[pos + 1] << 8));
+            if (flags & 8) while (src[pos++] !== 0);
+            if (flags & 16) while (src[pos++] !== 0);
+            if (flags & 2) pos += 2;
+        } else {
+            pos = 2;
+        }
+
+        let out = new Uint8Array(Math.max(src.length * 4, 1024));
+        let outLen = 0;
+        let bitBuf = 0;
+        let bitCnt = 0;
+
+        function ensure(extra) {
+            if (outLen + extra <= out.length) return;
+            const next = new Uint8Array(Math.max(out.length * 2, outLen + extra));
+            next.set(out.subarray(0, outLen));
+            out = next;
+        }
+        function bits(count) {
+            while (bitCnt < count) {
+                if (pos >= src.length) throw new Error("Unexpected end of data");
+                bitBuf |= src[pos++] << bitCnt;
+                bitCnt += 8;
+            }
+            const value = bitBuf & ((1 << count) - 1);
+            bitBuf >>>= count;
+            bitCnt -= count;
+            return value;
+        }
+        function buildTable(lengths) {
+            const counts = new Uint16Array(16);
+            const offsets = new Uint16Array(16);
+            lengths.forEach(length => counts[length]++);
+            counts[0] = 0;
+            for (let i = 1; i < 16; i++) offsets[i] = offsets[i - 1] + counts[i - 1];
+            const symbols = new Uint16Array(lengths.length);
+            lengths.forEach((length, symbol) => {
+                if (length) symbols[offsets[length]++] = symbol;
+            });
+            return { counts, symbols };
+        }
+        function decodeSymbol(table) {
+            let code = 0;
+            let first = 0;
+            let index = 0;
+            for (let length = 1; length < 16; length++) {
+                code |= bits(1);
+                const count = table.counts[length];
+                if (code - count < first) return table.symbols[index + (code - first)];
+                index += count;
+                first = (first + count) << 1;
+                code <<= 1;
+            }
+            throw new Error("Invalid deflate data");
+        }
+
+        const LENGTH_BASE = [3, 4, 5, 6, 7, 8, 9, 10, 11, 13, 15, 17, 19, 23, 27, 31, 35, 43, 51, 59, 67, 83, 99, 115, 131, 163, 195, 227, 258];
+        const LENGTH_EXTRA = [0, 0, 0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 3, 3, 3, 3, 4, 4, 4, 4, 5, 5, 5, 5, 0];
+        const DIST_BASE = [1, 2, 3, 4, 5, 7, 9, 13, 17, 25, 33, 49, 65, 97, 129, 193, 257, 385, 513, 769, 1025, 1537, 2049, 3073, 4097, 6145, 8193, 12289, 16385, 24577];
+        const DIST_EXTRA = [0, 0, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5, 6, 6, 7, 7, 8, 8, 9, 9, 10, 10, 11, 11, 12, 12, 13, 13];
+        const CODE_LENGTH_ORDER = [16, 17, 18, 0, 8, 7, 9, 6, 10, 5, 11, 4, 12, 3, 13, 2, 14, 1, 15];
+
+        let fixedTables = null;
+        let final = 0;
+        while (!final) {
+            final = bits(1);
+            const type = bits(2);
+            if (type === 0) {
+                bitBuf = 0;
+                bitCnt = 0;
+                const length = src[pos] | (src[pos + 1] << 8);
+                pos += 4;
+                ensure(length);
+                out.set(src.subarray(pos, pos + length), outLen);
+                outLen += length;
+                pos += length;
+                continue;
+            }
+            let literals;
+            let distances;
+            if (type === 1) {
+                if (!fixedTables) {
+                    const lengths = new Array(288).fill(8, 0, 144).fill(9, 144, 256).fill(7, 256, 280).fill(8, 280);
+                    fixedTables = [buildTable(lengths), buildTable(new Array(30).fill(5))];
+                }
+                [literals, distances] = fixedTables;
+            } else if (type === 2) {
+                const literalCount = bits(5) + 257;
+                const distanceCount = bits(5) + 1;
+                const codeLengthCount = bits(4) + 4;
+                const codeLengths = new Array(19).fill(0);
+                for (let i = 0; i < codeLengthCount; i++) codeLengths[CODE_LENGTH_ORDER[i]] = bits(3);
+                const codeLengthTable = buildTable(codeLengths);
+                const lengths = [];
+                while (lengths.length < literalCount + distanceCount) {
+                    const symbol = decodeSymbol(codeLengthTable);
+                    if (symbol < 16) {
+                        lengths.push(symbol);
+                    } else if (symbol === 16) {
+                        const previous = lengths[lengths.length - 1];
+                        for (let repeat = 3 + bits(2); repeat > 0; repeat--) lengths.push(previous);
+                    } else {
+                        for (let repeat = symbol === 17 ? 3 + bits(3) : 11 + bits(7); repeat > 0; repeat--) lengths.push(0);
+                    }
+                }
+                literals = buildTable(lengths.slice(0, literalCount));
+                distances = buildTable(lengths.slice(literalCount));
+            } else {
+                throw new Error("Invalid deflate block type");
+            }
+            for (;;) {
+                const symbol = decodeSymbol(literals);
+                if (symbol < 256) {
+                    ensure(1);
+                    out[outLen++] = symbol;
+                } else if (symbol === 256) {
+                    break;
+                } else {
+                    const lengthIndex = symbol - 257;
+                    const length = LENGTH_BASE[lengthIndex] + bits(LENGTH_EXTRA[lengthIndex]);
+                    const distanceIndex = decodeSymbol(distances);
+                    const distance = DIST_BASE[distanceIndex] + bits(DIST_EXTRA[distanceIndex]);
+                    ensure(length);
+                    for (let i = 0; i < length; i++) {
+                        out[outLen] = out[outLen - distance];
+                        outLen++;
+                    }
+                }
+            }
+        }
+        return out.subarray(0, outLen);
+    }
+
+    function finishLoading() {
+        allMessagesLoaded = true;
+        // Keep tags set while loading on top of the stored ones.
+        const pendingTags = new Map(tagAssignments);
+        loadTagState();
+        pendingTags.forEach((tags, key) => tagAssignments.set(key, tags));
+        markTagsChanged();
+        if (pendingTags.size > 0) {
+            saveTagState();
+        }
+        applyFilters(true);
+    }
+
+    // ----------------------
+    // Render the visible rows on scroll and resize
+    // ----------------------
+    container.addEventListener("scroll", scheduleRender);
+    window.addEventListener("resize", scheduleRender);
 
     // ----------------------
     // Initial render
     // ----------------------
-    resetAndRender(sortMessagesByTimestamp(filteredMessages));
+    resetAndRender(filteredIndices);
+    if (chunkInfo) {
+        loadMessageChunk(0);
+    } else if (compressedInfo) {
+        loadCompressedMessages();
+    }
 
 });
@@ -1,12 +1,29 @@
 """Minimal unittest discovery runner for project test modules."""
 
+import argparse
+import sys
 import unittest
 from pathlib import Path
 
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Run the Bubbly test suite")
+    arg_parser.add_argument(
+        "--perf",
+        action="store_true",
+        help="Also run the performance regression gate against bench/perf_baseline.json",
+    )
+    args = arg_parser.parse_args()
+
     test_dir = Path(__file__).resolve().parent
     suite = unittest.defaultTestLoader.discover(str(test_dir), pattern="test_*.py")
     runner = unittest.TextTestRunner(verbosity=2)
     result = runner.run(suite)
-    raise SystemExit(0 if result.wasSuccessful() else 1)
+    success = result.wasSuccessful()
+
+    if args.perf:
+        sys.path.insert(0, str(test_dir.parent))
+        from bench.perf_gate import check
+
+        success = check() and success
+    raise SystemExit(0 if success else 1)
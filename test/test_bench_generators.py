@@ -0,0 +1,51 @@
+"""Tests for the synthetic benchmark dataset generators."""
+
+import hashlib
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from bench.generators import FORMATS, generate
+from bench.run_bench import run_case, ensure_dataset
+
+
+def _tree_digest(folder):
+    digest = hashlib.sha256()
+    for path in sorted(Path(folder).rglob("*")):
+        if path.is_file():
+            digest.update(path.relative_to(folder).as_posix().encode("utf-8"))
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+class TestBenchGenerators(unittest.TestCase):
+    """Generated datasets must be deterministic and parse to the requested size."""
+
+    def test_every_format_parses_to_requested_message_count(self):
+        """Each generated format should yield exactly the requested number of messages."""
+        options = {"seed": 3, "chats": 4, "media_ratio": 0.2, "media_files": 5, "media_size": 256}
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt in FORMATS:
+                with self.subTest(fmt=fmt):
+                    dataset_dir = ensure_dataset(tmp, fmt, 300, options)
+                    result = run_case("parse", dataset_dir)
+                    self.assertEqual(300, result["messages"])
+                    self.assertGreater(result["input_bytes"], 0)
+
+    def test_generation_is_deterministic(self):
+        """The same seed should produce byte-identical datasets."""
+        with tempfile.TemporaryDirectory() as tmp:
+            first = Path(tmp) / "first"
+            second = Path(tmp) / "second"
+            generate("threema", first, 200, seed=7, chats=3, media_files=3, media_size=128)
+            generate("threema", second, 200, seed=7, chats=3, media_files=3, media_size=128)
+            self.assertEqual(_tree_digest(first), _tree_digest(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -86,6 +86,31 @@ class TestCliConfig(unittest.TestCase):
             self.assertFalse(args.split_by_chat)
             self.assertEqual(["foo=cli"], args.parser_args)
 
+    def test_media_workers_from_config_and_cli(self):
+        """media_workers should come from config and be overridable on the CLI."""
+        with tempfile.TemporaryDirectory() as tmp:
+            cfg_path = Path(tmp) / "conf.json"
+            cfg_path.write_text(json.dumps({"media_workers": 8}), encoding="utf-8")
+            base_argv = [
+                "prog",
+                "--config", str(cfg_path),
+                "--parser", "dummy",
+                "--input", "/cli/input",
+                "--output", "/cli/output",
+                "--creator", "CliUser",
+                "--case", "CLI-1",
+            ]
+            with patch.object(sys, "argv", base_argv):
+                args = parse_args({"dummy": _DummyParser})
+            self.assertEqual(8, args.media_workers)
+            with patch.object(sys, "argv", base_argv + ["--media-workers", "2"]):
+                args = parse_args({"dummy": _DummyParser})
+            self.assertEqual(2, args.media_workers)
+            with patch.object(sys, "argv", base_argv + ["--media-workers", "0"]):
+                with patch.object(sys, "stderr", io.StringIO()):
+                    with self.assertRaises(SystemExit):
+                        parse_args({"dummy": _DummyParser})
+
     def test_show_parser_args_requires_parser(self):
         """show_parser_args without parser should terminate with argparse error."""
         with patch.object(sys, "argv", ["prog", "--show_parser_args"]):
@@ -1,17 +1,25 @@
 """Exporter integration tests for copied media and generated HTML content."""
 
+import base64
+import gzip
+import json
+import os
 import sys
 import tempfile
 import unittest
+import zlib
 from pathlib import Path
+from unittest.mock import patch
 
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
-from exporter import BubblyExporter
+import exporter as exporter_module
+from exporter import BubblyExporter, decode_message_blocks, timestamp_ms
 from utils.split_export import export_split_by_chat
+from utils.summary import MessageSummary
 
 
 class TestExporterMedia(unittest.TestCase):
@@ -91,10 +99,316 @@ class TestExporterMedia(unittest.TestCase):
             exporter.export_html("chat.html")
 
             html_content = (output_folder / "chat.html").read_text(encoding="utf-8")
-            self.assertIn('"media": "image1.jpg"', html_content)
-            self.assertIn('"media": "missing:missing_file.jpg"', html_content)
+            line = next(line for line in html_content.splitlines() if line.startswith("const messageData = "))
+            exported = decode_message_blocks([json.loads(line[len("const messageData = "):-1])])
+            self.assertEqual(["image1.jpg", "missing:missing_file.jpg"], [msg["media"] for msg in exported])
             self.assertFalse((output_folder / "media" / "missing_file.jpg").exists())
 
+    def test_parallel_media_copy_dedups_targets_and_keeps_order(self):
+        """Concurrent media copy should copy each target once and rewrite messages in order."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "input_media"
+            output_folder = tmp_path / "output"
+            media_folder.mkdir(parents=True, exist_ok=True)
+            for index in range(20):
+                (media_folder / f"media_{index}").write_bytes(b"\x89PNG\r\n\x1A\n" + bytes([index]))
+
+            messages = [
+                {
+                    "sender": "Alice",
+                    "content": f"Image {index}",
+                    "timestamp": "2026-02-01T12:00:00",
+                    "media": f"media_{index % 20}",
+                }
+                for index in range(60)
+            ]
+            exporter = BubblyExporter(
+                messages, media_folder, output_folder, self._base_metadata(), media_workers=8
+            )
+            copied_count = exporter._copy_media()
+
+            self.assertEqual(20, copied_count)
+            self.assertEqual([f"media_{index % 20}.png" for index in range(60)], [m["media"] for m in messages])
+            self.assertTrue(all(m["media_mime"] == "image/png" for m in messages))
+            self.assertEqual(20, len(list((output_folder / "media").iterdir())))
+
+    def test_link_media_modes_materialize_output_files(self):
+        """Link-based media modes should place usable files in output/media."""
+        for mode in ("hardlink", "symlink", "reflink", "auto"):
+            with self.subTest(mode=mode), tempfile.TemporaryDirectory() as tmp:
+                tmp_path = Path(tmp)
+                media_folder = tmp_path / "input_media"
+                output_folder = tmp_path / "output"
+                media_folder.mkdir(parents=True, exist_ok=True)
+                source = media_folder / "image1.jpg"
+                source.write_bytes(b"\xFF\xD8\xFF\xE0testjpeg")
+                messages = [
+                    {
+                        "sender": "Alice",
+                        "content": "Photo",
+                        "timestamp": "2026-02-01T12:00:00",
+                        "media": "image1.jpg",
+                    }
+                ]
+                exporter = BubblyExporter(
+                    messages, media_folder, output_folder, self._base_metadata(), media_mode=mode
+                )
+                self.assertEqual(1, exporter._copy_media())
+                target = output_folder / "media" / "image1.jpg"
+                self.assertEqual(source.read_bytes(), target.read_bytes())
+                if mode == "hardlink":
+                    self.assertTrue(os.path.samefile(source, target))
+                if mode == "symlink":
+                    self.assertTrue(target.is_symlink())
+
+    def test_auto_mode_hardlinks_when_reflink_is_unsupported(self):
+        """Without FICLONE, auto should fall through to a hardlink instead of a byte copy."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "input_media"
+            media_folder.mkdir()
+            source = media_folder / "image1.jpg"
+            source.write_bytes(b"\xFF\xD8\xFF\xE0testjpeg")
+            messages = [{"sender": "Alice", "content": "Photo", "timestamp": "2026-02-01T12:00:00", "media": "image1.jpg"}]
+            with patch.object(exporter_module, "fcntl", None):
+                exporter = BubblyExporter(
+                    messages, media_folder, tmp_path / "output", self._base_metadata(), media_mode="auto"
+                )
+                self.assertEqual(1, exporter._copy_media())
+            target = tmp_path / "output" / "media" / "image1.jpg"
+            self.assertTrue(os.path.samefile(source, target))
+            self.assertEqual(2, source.stat().st_nlink)
+
+    def test_switching_from_hardlink_never_writes_into_the_evidence(self):
+        """Re-exporting a hardlinked output with copy/reflink should replace the link, not truncate the source."""
+        for mode in ("copy", "reflink", "auto"):
+            with self.subTest(mode=mode), tempfile.TemporaryDirectory() as tmp:
+                tmp_path = Path(tmp)
+                media_folder = tmp_path / "input_media"
+                output_folder = tmp_path / "output"
+                media_folder.mkdir(parents=True, exist_ok=True)
+                source = media_folder / "image1.jpg"
+                content = b"\xFF\xD8\xFF\xE0testjpeg"
+                source.write_bytes(content)
+                for media_mode in ("hardlink", mode):
+                    messages = [
+                        {"sender": "Alice", "content": "Photo", "timestamp": "2026-02-01T12:00:00", "media": "image1.jpg"}
+                    ]
+                    BubblyExporter(
+                        messages, media_folder, output_folder, self._base_metadata(), media_mode=media_mode
+                    )._copy_media()
+                target = output_folder / "media" / "image1.jpg"
+                self.assertEqual(content, source.read_bytes())
+                self.assertEqual(content, target.read_bytes())
+                if mode == "copy":
+                    self.assertFalse(os.path.samefile(source, target))
+
+    def test_streamed_html_embeds_same_json_as_dumps(self):
+        """Streamed columnar payload should decode back to the messages and leave no spool file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            output_folder = tmp_path / "output"
+            messages = [
+                {
+                    "sender": "Alice",
+                    "content": f"Nachricht {index} ü",
+                    "timestamp": "2026-02-01T12:00:00",
+                    "media": None,
+                    "is_owner": index % 2 == 0,
+                }
+                for index in range(2500)
+            ]
+            exporter = BubblyExporter(messages, tmp_path, output_folder, self._base_metadata())
+            exporter.export_html("chat.html")
+
+            html_content = (output_folder / "chat.html").read_text(encoding="utf-8")
+            line = next(line for line in html_content.splitlines() if line.startswith("const messageData = "))
+            block = json.loads(line[len("const messageData = "):-1])
+            self.assertEqual({"sender": ["Alice"], "chat": ["Export Chat"], "mime": [None]}, block["tables"])
+            self.assertEqual({}, block["extra"])
+            self.assertEqual(
+                [{"chat": "Export Chat", "media_mime": None, **msg} for msg in messages],
+                decode_message_blocks([block]),
+            )
+            self.assertEqual(["chat.html", "chat.json", "media"], sorted(p.name for p in output_folder.iterdir()))
+
+    def test_messages_are_exported_in_time_order_with_ts_ms(self):
+        """The exporter should sort once by timestamp (unparseable last) and add ts_ms, also when spilling."""
+        timestamps = ["2026-02-01T12:00:05", "bad", "2026-02-01T11:00:00+02:00", "2026-02-01T09:00:00",
+                      "01/02/2026, 08:30"]
+        for sort_memory_mb in (None, 0.0001):
+            with self.subTest(sort_memory_mb=sort_memory_mb), tempfile.TemporaryDirectory() as tmp:
+                tmp_path = Path(tmp)
+                output_folder = tmp_path / "output"
+                messages = [
+                    {"sender": "Alice", "content": f"Text {index}", "timestamp": timestamp, "media": None}
+                    for index, timestamp in enumerate(timestamps * 3)
+                ]
+                BubblyExporter(
+                    messages, tmp_path, output_folder, self._base_metadata(), sort_memory_mb=sort_memory_mb
+                ).export_html("chat.html")
+
+                html_content = (output_folder / "chat.html").read_text(encoding="utf-8")
+                line = next(line for line in html_content.splitlines() if line.startswith("const messageData = "))
+                exported = decode_message_blocks([json.loads(line[len("const messageData = "):-1])])
+                self.assertEqual(
+                    ["Text 4", "Text 9", "Text 14", "Text 3", "Text 8", "Text 13", "Text 2", "Text 7", "Text 12",
+                     "Text 0", "Text 5", "Text 10", "Text 1", "Text 6", "Text 11"],
+                    [msg["content"] for msg in exported],
+                )
+                self.assertEqual(timestamp_ms("2026-02-01T11:00:00"), exported[6]["ts_ms"])
+                self.assertIsNone(exported[-1]["ts_ms"])
+                self.assertEqual(["chat.html", "chat.json", "media"], sorted(p.name for p in output_folder.iterdir()))
+        self.assertEqual(1769936400000, timestamp_ms("2026-02-01T09:00:00"))
+        # Offsets are dropped like in the displayed timestamp, matching chat.js wall-clock filter bounds.
+        self.assertEqual(timestamp_ms("2026-02-01T11:00:00"), timestamp_ms("2026-02-01T11:00:00+02:00"))
+        self.assertEqual(timestamp_ms("2026-02-01T11:00:00"), timestamp_ms("2026-02-01T11:00:00Z"))
+
+    def test_report_id_is_stable_across_input_order(self):
+        """The embedded report id should depend on the messages, not on their input order."""
+        messages = [
+            {"sender": "Alice", "content": f"Text {index}", "timestamp": f"2026-02-01T12:00:0{index % 3}",
+             "media": None, "chat": "Team"}
+            for index in range(6)
+        ]
+        variants = {
+            "forward": messages,
+            "reversed": messages[::-1],
+            "chunked": messages[3:] + messages[:3],
+            "edited": messages[:-1] + [dict(messages[-1], content="Changed")],
+        }
+        report_ids = {}
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            for name, variant in variants.items():
+                output_folder = tmp_path / name
+                layout = "chunks" if name == "chunked" else "inline"
+                BubblyExporter(
+                    [dict(msg) for msg in variant], tmp_path, output_folder, self._base_metadata(),
+                    message_layout=layout, chunk_size=2,
+                ).export_html("chat.html")
+                html_content = (output_folder / "chat.html").read_text(encoding="utf-8")
+                line = next(line for line in html_content.splitlines() if line.startswith("const reportId = "))
+                report_ids[name] = json.loads(line[len("const reportId = "):-1])
+        self.assertRegex(report_ids["forward"], r"^report-[0-9a-f]{16}$")
+        self.assertEqual(report_ids["forward"], report_ids["reversed"])
+        self.assertEqual(report_ids["forward"], report_ids["chunked"])
+        self.assertNotEqual(report_ids["forward"], report_ids["edited"])
+
+    def test_chunked_layout_writes_numbered_data_files(self):
+        """Chunk layout should write data/<report>/chunk_NNNN.js files and reference them from the page."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            output_folder = tmp_path / "output"
+            messages = [
+                {"sender": "Alice", "content": f"Text {index}", "timestamp": "2026-02-01T12:00:00", "media": None}
+                for index in range(5)
+            ]
+            exporter = BubblyExporter(
+                messages, tmp_path, output_folder, self._base_metadata(), message_layout="chunks", chunk_size=2
+            )
+            exporter.export_html("report.html")
+
+            chunk_files = sorted(path.name for path in (output_folder / "data" / "report").iterdir())
+            self.assertEqual(["chunk_0000.js", "chunk_0001.js", "chunk_0002.js"], chunk_files)
+            blocks = []
+            for name in chunk_files:
+                chunk = (output_folder / "data" / "report" / name).read_text(encoding="utf-8")
+                self.assertTrue(chunk.startswith("bubblyAddChunk({"))
+                blocks.append(json.loads(chunk[len("bubblyAddChunk("):-len(");\n")]))
+            # The sender table is shared: only the first chunk lists "Alice".
+            self.assertEqual([["Alice"], [], []], [block["tables"]["sender"] for block in blocks])
+            self.assertEqual(
+                [msg["content"] for msg in messages],
+                [msg["content"] for msg in decode_message_blocks(blocks)],
+            )
+            html_content = (output_folder / "report.html").read_text(encoding="utf-8")
+            self.assertIn("const messageData = null;", html_content)
+            self.assertIn('const messageChunks = {"base": "data/report/", "count": 3, "total": 5};', html_content)
+
+    def test_compressed_payload_round_trips(self):
+        """Compressed payloads should decode back to the uncompressed message block."""
+        messages = [
+            {"sender": "Alice", "content": f"Text {index} ü", "timestamp": "2026-02-01T12:00:00", "media": None}
+            for index in range(50)
+        ]
+        for compression, decompress in (("gzip", gzip.decompress), ("deflate", zlib.decompress)):
+            with self.subTest(compression=compression), tempfile.TemporaryDirectory() as tmp:
+                tmp_path = Path(tmp)
+                output_folder = tmp_path / "output"
+                exporter = BubblyExporter(
+                    [dict(msg) for msg in messages],
+                    tmp_path,
+                    output_folder,
+                    self._base_metadata(),
+                    payload_compression=compression,
+                )
+                exporter.export_html("chat.html")
+
+                html_content = (output_folder / "chat.html").read_text(encoding="utf-8")
+                self.assertIn("const messageData = null;", html_content)
+                line = next(
+                    line for line in html_content.splitlines() if line.startswith("const messagesCompressed = ")
+                )
+                payload = json.loads(line[len("const messagesCompressed = "):-1])
+                self.assertEqual(compression, payload["format"])
+                self.assertEqual(50, payload["total"])
+                decoded = decode_message_blocks([json.loads(decompress(base64.b64decode(payload["data"])).decode("utf-8"))])
+                self.assertEqual([msg["content"] for msg in messages], [msg["content"] for msg in decoded])
+                self.assertEqual(["chat.html", "chat.json", "media"], sorted(p.name for p in output_folder.iterdir()))
+
+    def test_payload_compression_requires_inline_layout(self):
+        """Compression combined with the chunk layout should be rejected."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                BubblyExporter(
+                    [], tmp, Path(tmp) / "out", self._base_metadata(),
+                    message_layout="chunks", payload_compression="gzip",
+                )
+
+    def test_unknown_media_mode_raises(self):
+        """Unknown media modes should be rejected."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with self.assertRaises(ValueError):
+                BubblyExporter([], tmp, Path(tmp) / "out", self._base_metadata(), media_mode="teleport")
+
+    def test_exporter_consumes_message_stream_once(self):
+        """Exporter should accept a generator and record final media values in a summary."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "input_media"
+            output_folder = tmp_path / "output"
+            media_folder.mkdir(parents=True, exist_ok=True)
+            (media_folder / "image1.jpg").write_bytes(b"\xFF\xD8\xFF\xE0testjpeg")
+
+            def stream():
+                yield {
+                    "sender": "Alice",
+                    "content": "Image message",
+                    "timestamp": "2026-02-01T12:00:00",
+                    "media": "image1.jpg",
+                }
+                yield {
+                    "sender": "Bob",
+                    "content": "Missing file message",
+                    "timestamp": "2026-02-01T12:01:00",
+                    "media": "missing_file.jpg",
+                }
+
+            summary = MessageSummary()
+            exporter = BubblyExporter(
+                stream(), media_folder, output_folder, self._base_metadata(), summary=summary
+            )
+            exporter.export_html("chat.html")
+
+            chat_json = json.loads((output_folder / "chat.json").read_text(encoding="utf-8"))
+            self.assertEqual(2, len(chat_json))
+            self.assertEqual("Export Chat", chat_json[0]["chat"])
+            self.assertEqual(2, summary.total_messages)
+            self.assertEqual("image", summary.media_files["image1.jpg"])
+            self.assertEqual("missing", summary.media_files["missing:missing_file.jpg"])
+
 
 class TestExportModes(unittest.TestCase):
     """Tests for split and merged HTML export modes."""
@@ -156,6 +470,125 @@ class TestExportModes(unittest.TestCase):
             index_html = index_path.read_text(encoding="utf-8")
             self.assertLess(index_html.find("Alpha Chat"), index_html.find("Zulu Chat"))
 
+    def test_split_export_with_jobs_matches_sequential_export(self):
+        """Process-parallel split export should produce the same reports and a merged summary."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "media_in"
+            media_folder.mkdir(parents=True, exist_ok=True)
+            results = {}
+            for jobs in (1, 2):
+                output_folder = tmp_path / f"output_{jobs}"
+                output_folder.mkdir(parents=True, exist_ok=True)
+                summary = MessageSummary()
+                export_split_by_chat(
+                    self._sample_messages_two_chats(),
+                    self._base_metadata(),
+                    media_folder,
+                    output_folder,
+                    logo_path=None,
+                    safe_case="CASE_EXPORT",
+                    summary=summary,
+                    jobs=jobs,
+                )
+                report_names = sorted(path.name for path in (output_folder / "reports").glob("*.html"))
+                report_json = {
+                    path.name: json.loads(path.read_text(encoding="utf-8"))
+                    for path in (output_folder / "reports").glob("*.json")
+                }
+                results[jobs] = (report_names, summary.total_messages, sorted(summary.chats), report_json)
+
+            self.assertEqual(results[1], results[2])
+            self.assertEqual(
+                ["Alpha Chat"], [msg["chat"] for msg in results[2][3]["CASE_EXPORT_Alpha_Chat.json"]]
+            )
+            self.assertEqual(
+                ["Zulu Chat"], [msg["chat"] for msg in results[2][3]["CASE_EXPORT_Zulu_Chat.json"]]
+            )
+            self.assertEqual(2, len(results[2][0]))
+            self.assertEqual(2, results[2][1])
+
+    def test_incremental_split_export_rewrites_only_changed_chats(self):
+        """Incremental export should keep unchanged reports, rewrite changed ones and drop removed chats."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "media_in"
+            output_folder = tmp_path / "output"
+            media_folder.mkdir(parents=True, exist_ok=True)
+
+            def run(messages):
+                summary = MessageSummary()
+                export_split_by_chat(
+                    messages,
+                    self._base_metadata(),
+                    media_folder,
+                    output_folder,
+                    logo_path=None,
+                    safe_case="CASE_EXPORT",
+                    summary=summary,
+                    incremental=True,
+                )
+                return summary
+
+            run(self._sample_messages_two_chats())
+            alpha = output_folder / "reports" / "CASE_EXPORT_Alpha_Chat.html"
+            zulu = output_folder / "reports" / "CASE_EXPORT_Zulu_Chat.html"
+            alpha.write_text("kept", encoding="utf-8")
+            zulu.write_text("stale", encoding="utf-8")
+
+            messages = self._sample_messages_two_chats()
+            messages[0]["content"] = "Chat zulu message, edited"
+            summary = run(messages)
+            self.assertEqual("kept", alpha.read_text(encoding="utf-8"))
+            self.assertIn("Chat zulu message, edited", zulu.read_text(encoding="utf-8"))
+            self.assertEqual(2, summary.total_messages)
+
+            run([msg for msg in self._sample_messages_two_chats() if msg["chat"] == "Alpha Chat"])
+            self.assertFalse(zulu.exists())
+            self.assertFalse(zulu.with_suffix(".json").exists())
+            manifest = json.loads((output_folder / "bubbly_manifest.json").read_text(encoding="utf-8"))
+            self.assertEqual(["CASE_EXPORT_Alpha_Chat.html"], list(manifest["reports"]))
+            index_html = (output_folder / "CASE_EXPORT_index.html").read_text(encoding="utf-8")
+            self.assertNotIn("Zulu Chat", index_html)
+
+    def test_incremental_summary_uses_exported_media_names(self):
+        """Kept reports should add the stored summary; media_workers should not force a rewrite."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "media_in"
+            output_folder = tmp_path / "output"
+            media_folder.mkdir(parents=True, exist_ok=True)
+            # No suffix: the exporter names the copy after the detected type.
+            (media_folder / "photo").write_bytes(b"\xFF\xD8\xFF\xE0testjpeg")
+            messages = self._sample_messages_two_chats()
+            messages[1]["media"] = "photo"
+
+            def run(media_workers):
+                summary = MessageSummary()
+                export_split_by_chat(
+                    [dict(msg) for msg in messages],
+                    self._base_metadata(),
+                    media_folder,
+                    output_folder,
+                    logo_path=None,
+                    safe_case="CASE_EXPORT",
+                    summary=summary,
+                    incremental=True,
+                    media_workers=media_workers,
+                )
+                return summary
+
+            first = run(1)
+            alpha = output_folder / "reports" / "CASE_EXPORT_Alpha_Chat.html"
+            alpha.write_text("kept", encoding="utf-8")
+            second = run(4)
+
+            self.assertEqual("kept", alpha.read_text(encoding="utf-8"))
+            self.assertEqual({"photo.jpg": "image"}, first.media_files)
+            self.assertEqual(first.media_files, second.media_files)
+            self.assertEqual(first.total_messages, second.total_messages)
+            self.assertEqual(first.chats, second.chats)
+
     def test_merged_export_creates_single_html_file(self):
         """Merged export should create one combined report file."""
         with tempfile.TemporaryDirectory() as tmp:
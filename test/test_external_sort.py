@@ -0,0 +1,51 @@
+"""Tests for the external merge sort of message streams."""
+
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from parsers.base_parser import Message
+from utils.external_sort import ExternalSorter, sort_messages
+
+
+def _messages(count, seed=3):
+    rng = random.Random(seed)
+    return [
+        Message(timestamp=f"2024-01-{rng.randint(1, 9):02d}T10:00:00", sender=f"S{index}",
+                content="x" * rng.randint(0, 50), chat="Chat")
+        for index in range(count)
+    ]
+
+
+class TestExternalSorter(unittest.TestCase):
+    """Tests for spilled runs, multi-pass merging and stability."""
+
+    def test_small_input_is_sorted_in_memory(self):
+        """Input within the budget should be sorted without temp files, returning the same objects."""
+        messages = _messages(50)
+        result = list(sort_messages(messages))
+        self.assertEqual(sorted(messages, key=lambda msg: msg["timestamp"]), result)
+        self.assertIs(result[0], min(messages, key=lambda msg: msg["timestamp"]))
+
+    def test_spilled_runs_merge_stably_and_are_removed(self):
+        """Runs beyond the fan-in should be merged in passes; equal timestamps keep input order."""
+        messages = _messages(2000)
+        with tempfile.TemporaryDirectory() as tmp:
+            sorter = ExternalSorter(memory_budget=20000, temp_dir=tmp, max_fan_in=4)
+            sorter.add_all(messages)
+            self.assertGreater(sorter.spilled_runs, 4)
+
+            result = list(sorter.iter_sorted())
+
+            self.assertEqual(sorted(messages, key=lambda msg: msg["timestamp"]), result)
+            self.assertEqual([], list(Path(tmp).iterdir()))
+
+
+if __name__ == "__main__":
+    unittest.main()
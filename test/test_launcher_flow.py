@@ -1,5 +1,7 @@
 """Launcher flow tests for exception logging behavior."""
 
+import json
+import pstats
 import sys
 import tempfile
 import unittest
@@ -19,6 +21,17 @@ class _FailingParser:
         raise ValueError("Parser exploded")
 
 
+class _CountingParser:
+    calls = 0
+
+    def parse(self, input_folder, media_folder=None, **kwargs):
+        _CountingParser.calls += 1
+        messages = [
+            {"sender": "Alice", "content": "Hello", "timestamp": "2026-02-01T12:00:00", "media": None},
+        ]
+        return messages, {"user": kwargs.get("user"), "case": kwargs.get("case"), "chat_name": "Cached"}
+
+
 class TestLauncherFlow(unittest.TestCase):
     """Tests for launcher-level exception/fallback log behavior."""
 
@@ -65,6 +78,138 @@ class TestLauncherFlow(unittest.TestCase):
             log_text = log_files[0].read_text(encoding="utf-8")
             self.assertIn("Unhandled exception during run", log_text)
 
+    def test_parse_cache_hit_skips_parser(self):
+        """A second run over unchanged input should export from the parse cache."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "input"
+            output_dir = tmp_path / "output"
+            input_dir.mkdir(parents=True, exist_ok=True)
+            (input_dir / "chat.txt").write_text("hello", encoding="utf-8")
+            _CountingParser.calls = 0
+
+            results = []
+            for creator in ("First", "Second"):
+                args = SimpleNamespace(
+                    parser="dummy",
+                    input=str(input_dir),
+                    output=str(output_dir),
+                    creator=creator,
+                    case="CASE-CACHE",
+                    logo=None,
+                    parser_args=None,
+                    split_by_chat=False,
+                    log_level="info",
+                    parse_cache=True,
+                    _config={},
+                )
+                with patch.object(bubbly_launcher, "PARSERS", {"dummy": _CountingParser}):
+                    results.append(bubbly_launcher.run_with_args(args))
+
+            self.assertEqual(1, _CountingParser.calls)
+            self.assertEqual([1, 1], [result["message_count"] for result in results])
+            self.assertTrue((output_dir / "bubbly_parse_cache" / "parse_cache.sqlite").is_file())
+            report_html = results[1]["report_path"].read_text(encoding="utf-8")
+            self.assertIn("Second", report_html)
+
+    def test_run_writes_stage_metrics_next_to_log(self):
+        """A run should write per-stage metrics next to its run log."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "input"
+            output_dir = tmp_path / "output"
+            input_dir.mkdir(parents=True, exist_ok=True)
+            (input_dir / "chat.txt").write_text("hello", encoding="utf-8")
+            args = SimpleNamespace(
+                parser="dummy",
+                input=str(input_dir),
+                output=str(output_dir),
+                creator="Tester",
+                case="CASE-METRICS",
+                logo=None,
+                parser_args=None,
+                split_by_chat=False,
+                log_level="info",
+                _config={},
+            )
+            with patch.object(bubbly_launcher, "PARSERS", {"dummy": _CountingParser}):
+                result = bubbly_launcher.run_with_args(args)
+
+            metrics_files = list((result["output_folder"] / "log").glob("bubbly_run_*.metrics.json"))
+            self.assertEqual(1, len(metrics_files))
+            stages = json.loads(metrics_files[0].read_text(encoding="utf-8"))["stages"]
+            for name in ("prepare_input", "parse", "media_copy", "json_export", "html_write"):
+                self.assertIn(name, stages)
+            self.assertEqual(1, stages["parse"]["items"])
+            self.assertEqual(1, stages["json_export"]["items"])
+            self.assertGreater(stages["html_write"]["bytes"], 0)
+
+    def test_profile_mode_writes_profile_and_allocation_snapshots(self):
+        """--profile should save a .prof file and per-stage allocation snapshots in the log folder."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "input"
+            output_dir = tmp_path / "output"
+            input_dir.mkdir(parents=True, exist_ok=True)
+            args = SimpleNamespace(
+                parser="dummy",
+                input=str(input_dir),
+                output=str(output_dir),
+                creator="Tester",
+                case="CASE-PROFILE",
+                logo=None,
+                parser_args=None,
+                split_by_chat=False,
+                log_level="info",
+                profile=True,
+                _config={},
+            )
+            with patch.object(bubbly_launcher, "PARSERS", {"dummy": _CountingParser}):
+                result = bubbly_launcher.run_with_args(args)
+
+            log_dir = result["output_folder"] / "log"
+            prof_files = list(log_dir.glob("bubbly_run_*.prof"))
+            self.assertEqual(1, len(prof_files))
+            stats = pstats.Stats(str(prof_files[0]))
+            self.assertTrue(stats.stats)
+            alloc_text = next(log_dir.glob("bubbly_run_*.alloc.txt")).read_text(encoding="utf-8")
+            for label in ("=== prepare_input ===", "=== html_write ===", "=== end of run ==="):
+                self.assertIn(label, alloc_text)
+            self.assertIn("Hot functions", next(log_dir.glob("bubbly_run_*.log")).read_text(encoding="utf-8"))
+
+    def test_trace_mode_writes_chrome_trace(self):
+        """--trace should write a Chrome trace with stage spans tagged by process and thread."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "input"
+            output_dir = tmp_path / "output"
+            input_dir.mkdir(parents=True, exist_ok=True)
+            args = SimpleNamespace(
+                parser="dummy",
+                input=str(input_dir),
+                output=str(output_dir),
+                creator="Tester",
+                case="CASE-TRACE",
+                logo=None,
+                parser_args=None,
+                split_by_chat=True,
+                log_level="info",
+                trace=True,
+                _config={},
+            )
+            with patch.object(bubbly_launcher, "PARSERS", {"dummy": _CountingParser}):
+                result = bubbly_launcher.run_with_args(args)
+
+            trace_files = list((result["output_folder"] / "log").glob("bubbly_run_*.trace.json"))
+            self.assertEqual(1, len(trace_files))
+            events = json.loads(trace_files[0].read_text(encoding="utf-8"))["traceEvents"]
+            spans = [event for event in events if event["ph"] == "X"]
+            names = {event["name"] for event in spans}
+            for name in ("prepare_input", "read_batch", "export_chat", "html_write", "index_write"):
+                self.assertIn(name, names)
+            self.assertTrue(all("pid" in event and "tid" in event for event in spans))
+            self.assertTrue(any(event["name"] == "process_name" for event in events))
+
 
 if __name__ == "__main__":
     unittest.main()
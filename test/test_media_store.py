@@ -0,0 +1,109 @@
+"""Tests for the content-addressed media store and digest-based exporter layout."""
+
+import hashlib
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from exporter import BubblyExporter
+from utils.media_store import ContentMediaStore
+
+
+class TestContentMediaStore(unittest.TestCase):
+    """Tests for digest storage, deduplication and the persistent index."""
+
+    def test_identical_content_is_stored_once_and_index_persists(self):
+        """Duplicate files should share one stored copy; re-opening should skip re-hashing."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            first = tmp_path / "a.jpg"
+            second = tmp_path / "forwarded_copy.jpg"
+            first.write_bytes(b"same-bytes")
+            second.write_bytes(b"same-bytes")
+            expected = hashlib.sha256(b"same-bytes").hexdigest()
+
+            with ContentMediaStore(tmp_path / "store") as store:
+                digest_a, stored_a = store.add(first, ".jpg")
+                digest_b, stored_b = store.add(second, ".jpg")
+                self.assertEqual(2, store.hashed_count)
+                self.assertEqual(1, store.stored_count)
+            self.assertEqual(expected, digest_a)
+            self.assertEqual(digest_a, digest_b)
+            self.assertEqual(stored_a, stored_b)
+            self.assertEqual(tmp_path / "store" / expected[:2] / f"{expected}.jpg", stored_a)
+
+            with ContentMediaStore(tmp_path / "store") as store:
+                store.add(first, ".jpg")
+                self.assertEqual(0, store.hashed_count)
+                self.assertEqual(0, store.stored_count)
+
+    def test_store_links_sources_instead_of_copying(self):
+        """Stored objects and hardlinked report media should share the source inode."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "input_media"
+            media_folder.mkdir()
+            source = media_folder / "image1.jpg"
+            source.write_bytes(b"\xFF\xD8\xFF\xE0testjpeg")
+            messages = [{"sender": "Alice", "content": "A", "timestamp": "2026-02-01T12:00:00", "media": "image1.jpg"}]
+
+            with ContentMediaStore(tmp_path / "store") as store:
+                BubblyExporter(
+                    messages, media_folder, tmp_path / "output", {"chat_name": "Store Chat"},
+                    media_store=store, media_mode="hardlink",
+                )._copy_media()
+
+            stored = tmp_path / "store" / messages[0]["media"]
+            self.assertTrue(os.path.samefile(source, stored))
+            self.assertTrue(os.path.samefile(source, tmp_path / "output" / "media" / messages[0]["media"]))
+            self.assertEqual(3, source.stat().st_nlink)
+            self.assertEqual(b"\xFF\xD8\xFF\xE0testjpeg", source.read_bytes())
+
+
+class TestContentLayoutExport(unittest.TestCase):
+    """Tests for exporter output when a content-addressed store is used."""
+
+    def test_messages_reference_digest_paths(self):
+        """Exporter should rewrite media to digest paths and keep the original name."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media_folder = tmp_path / "input_media"
+            output_folder = tmp_path / "output"
+            media_folder.mkdir(parents=True, exist_ok=True)
+            (media_folder / "image1.jpg").write_bytes(b"\xFF\xD8\xFF\xE0testjpeg")
+            (media_folder / "image1_forwarded.jpg").write_bytes(b"\xFF\xD8\xFF\xE0testjpeg")
+            digest = hashlib.sha256(b"\xFF\xD8\xFF\xE0testjpeg").hexdigest()
+            messages = [
+                {"sender": "Alice", "content": "A", "timestamp": "2026-02-01T12:00:00", "media": "image1.jpg"},
+                {
+                    "sender": "Bob",
+                    "content": "B",
+                    "timestamp": "2026-02-01T12:01:00",
+                    "media": "image1_forwarded.jpg",
+                },
+            ]
+            with ContentMediaStore(tmp_path / "store") as store:
+                exporter = BubblyExporter(
+                    messages,
+                    media_folder,
+                    output_folder,
+                    {"chat_name": "Store Chat"},
+                    media_store=store,
+                )
+                copied_count = exporter._copy_media()
+
+            self.assertEqual(1, copied_count)
+            self.assertEqual([f"{digest[:2]}/{digest}.jpg"] * 2, [m["media"] for m in messages])
+            self.assertEqual(["image1.jpg", "image1_forwarded.jpg"], [m["media_name"] for m in messages])
+            self.assertEqual(digest, messages[0]["media_sha256"])
+            self.assertTrue((output_folder / "media" / digest[:2] / f"{digest}.jpg").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
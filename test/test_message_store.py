@@ -0,0 +1,104 @@
+"""Tests for the SQLite message spill store."""
+
+import json
+import pickle
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from exporter import _ts_sort_key, timestamp_ms
+from parsers.base_parser import Message
+from utils.message_store import MessageStore
+from utils.split_export import MANIFEST_NAME, export_split_by_chat, group_messages_by_chat
+
+
+def _message(timestamp, sender, chat, content="", media=None):
+    return Message(timestamp=timestamp, sender=sender, content=content or f"{sender} {timestamp}",
+                   media=media, url=None, is_owner=False, chat=chat)
+
+
+class TestMessageStore(unittest.TestCase):
+    """Tests for per-chat, timestamp-ordered reads from the spill store."""
+
+    def test_chat_groups_are_timestamp_ordered_views(self):
+        """Groups should follow first appearance and yield each chat's messages by timestamp."""
+        messages = [
+            _message("2024-01-02T10:00:00", "Bob", "Team"),
+            _message("2024-01-01T09:00:00", "Alice", None),
+            _message("2024-01-01T08:00:00", "Carol", "Team"),
+            _message("2024-01-02T10:00:00", "Dave", "Team"),
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            with MessageStore(tmp) as store:
+                self.assertEqual(2, store.add(messages[:2]))
+                self.assertEqual(2, store.add(messages[2:]))
+                folder = store.folder
+
+                groups = group_messages_by_chat(store, "Default")
+                self.assertEqual(["Team", "Default"], list(groups))
+                self.assertEqual(3, len(groups["Team"]))
+                # Equal timestamps keep parser order; views can be read repeatedly and pickled.
+                self.assertEqual(["Carol", "Bob", "Dave"], [msg["sender"] for msg in groups["Team"]])
+                restored = pickle.loads(pickle.dumps(groups["Team"]))
+                self.assertEqual(list(groups["Team"]), list(restored))
+                self.assertEqual(messages[1], next(iter(groups["Default"])))
+                self.assertEqual(
+                    ["Carol", "Alice", "Bob", "Dave"], [msg["sender"] for msg in store]
+                )
+                with self.assertRaises(RuntimeError):
+                    store.add(messages)
+            self.assertFalse(folder.exists())
+
+    def test_store_orders_like_the_exporter_sort(self):
+        """Non-ISO, offset and unparseable timestamps should come back in exporter (ts_ms) order."""
+        timestamps = ["bad", "02.01.2024, 08:00", "2024-01-01T11:00:00+02:00", "01/01/2024, 10:00",
+                      "2024-01-01T08:30:00", None, "2024-01-01T09:00:00"]
+        messages = [_message(timestamp, f"S{index}", "Team") for index, timestamp in enumerate(timestamps)]
+        expected = sorted(
+            messages, key=lambda msg: _ts_sort_key({"ts_ms": timestamp_ms(msg["timestamp"])})
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            with MessageStore(tmp) as store:
+                store.add(messages)
+                self.assertEqual(
+                    ["S4", "S6", "S3", "S2", "S1", "S0", "S5"], [msg["sender"] for msg in store]
+                )
+                self.assertEqual([msg["sender"] for msg in expected], [msg["sender"] for msg in store])
+                self.assertEqual(
+                    [msg["sender"] for msg in expected],
+                    [msg["sender"] for msg in group_messages_by_chat(store, "Default")["Team"]],
+                )
+
+    def test_split_export_reads_chats_from_store(self):
+        """A split export from the store should produce the same reports as one from a list."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            media = tmp_path / "media"
+            media.mkdir()
+            (media / "a.jpg").write_bytes(b"jpeg")
+            messages = [
+                _message("2024-01-02T10:00:00", "Bob", "Team", media="a.jpg"),
+                _message("2024-01-01T09:00:00", "Alice", "Family"),
+                _message("2024-01-01T08:00:00", "Carol", "Team", media="gone.jpg"),
+            ]
+            with MessageStore(tmp_path / "spill") as store:
+                store.add(messages)
+                export_split_by_chat(
+                    store, {"chat_name": "Chats", "case": "C"}, media, tmp_path / "out", None, "C",
+                    jobs=2, incremental=True,
+                )
+            manifest = json.loads((tmp_path / "out" / MANIFEST_NAME).read_text(encoding="utf-8"))["reports"]
+            self.assertEqual(
+                [("Team", 2, 1), ("Family", 1, 0)],
+                [(entry["chat_name"], entry["message_count"], entry["media_count"]) for entry in manifest.values()],
+            )
+            self.assertTrue((tmp_path / "out" / "reports" / "C_Team.html").is_file())
+
+
+if __name__ == "__main__":
+    unittest.main()
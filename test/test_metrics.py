@@ -0,0 +1,76 @@
+"""Tests for per-stage run metrics."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.metrics import RunMetrics
+from utils.profiling import RunProfiler
+
+
+class TestRunMetrics(unittest.TestCase):
+    """Tests for RunMetrics stage accounting."""
+
+    def test_stage_and_timed_iter_accumulate(self):
+        """Repeated stages should add up and timed_iter should count yielded items."""
+        metrics = RunMetrics()
+        with metrics.stage("export", items=2) as stage:
+            stage["bytes"] = 100
+        with metrics.stage("export", items=3, byte_count=50):
+            pass
+        self.assertEqual([1, 2, 3], list(metrics.timed_iter("parse", [1, 2, 3])))
+
+        self.assertEqual(5, metrics.stages["export"]["items"])
+        self.assertEqual(150, metrics.stages["export"]["bytes"])
+        self.assertEqual(3, metrics.stages["parse"]["items"])
+        self.assertEqual(["export", "parse"], list(metrics.stages))
+
+    def test_merge_and_write(self):
+        """Merged metrics should be written as JSON with derived rates."""
+        worker = RunMetrics()
+        worker.add("html_write", wall_s=0.5, cpu_s=0.25, items=1, byte_count=1_000_000)
+        metrics = RunMetrics()
+        metrics.add("html_write", wall_s=0.5, cpu_s=0.25, items=1, byte_count=1_000_000)
+        metrics.merge(worker)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "metrics.json"
+            metrics.write(path)
+            data = json.loads(path.read_text(encoding="utf-8"))
+        stage = data["stages"]["html_write"]
+        self.assertEqual(2, stage["items"])
+        self.assertEqual(1.0, stage["wall_s"])
+        self.assertEqual(2.0, stage["mb_per_s"])
+        self.assertIn("total_wall_s", data)
+
+
+class TestRunProfiler(unittest.TestCase):
+    """Tests for per-stage allocation snapshots."""
+
+    def test_every_stage_run_is_snapshotted(self):
+        """A stage that ends twice should get two allocation sections."""
+        metrics = RunMetrics()
+        profiler = RunProfiler(top_n=1)
+        metrics.on_stage_end = profiler.stage_finished
+        profiler.start()
+        try:
+            for _ in range(2):
+                with metrics.stage("json_export"):
+                    pass
+        finally:
+            profiler.stop()
+        with tempfile.TemporaryDirectory() as tmp:
+            _, alloc_path = profiler.write(Path(tmp) / "run.log")
+            alloc_text = alloc_path.read_text(encoding="utf-8")
+        self.assertIn("=== json_export ===", alloc_text)
+        self.assertIn("=== json_export (#2) ===", alloc_text)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Tests for shared header-only MIME detection and its cache."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils import mime_detection
+from utils.mime_detection import clear_mime_cache, detect_mime, media_category
+
+
+class TestMimeDetection(unittest.TestCase):
+    """Tests for magic-byte detection, cache keys and category mapping."""
+
+    def setUp(self):
+        clear_mime_cache()
+
+    def test_detects_common_signatures_and_mp4_disambiguation(self):
+        """Signatures should map to MIME types; ambiguous MP4 brands use suffix or audio hint."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            samples = {
+                "a.jpg": (b"\xFF\xD8\xFF\xE0", "image/jpeg"),
+                "a.png": (b"\x89PNG\r\n\x1A\n", "image/png"),
+                "a.pdf": (b"%PDF-1.7", "application/pdf"),
+                "clip.mp4": (b"\x00\x00\x00\x18ftypisom", "video/mp4"),
+                "voice.m4a": (b"\x00\x00\x00\x18ftypisom", "audio/mp4"),
+                "a.bin": (b"plain text", None),
+            }
+            for name, (content, expected) in samples.items():
+                (tmp_path / name).write_bytes(content)
+                self.assertEqual(expected, detect_mime(tmp_path / name), name)
+            voice = tmp_path / "message_media_voice"
+            voice.write_bytes(b"\x00\x00\x00\x18ftypmp42")
+            # The hint is applied to the cached sniff result in both orders.
+            self.assertEqual("video/mp4", detect_mime(voice))
+            self.assertEqual("audio/mp4", detect_mime(voice, audio_hint=True))
+            self.assertEqual("video/mp4", detect_mime(voice))
+            quicktime = tmp_path / "message_media_clip"
+            quicktime.write_bytes(b"\x00\x00\x00\x18ftypqt  ")
+            self.assertEqual("video/quicktime", detect_mime(quicktime, audio_hint=True))
+            self.assertIsNone(detect_mime(tmp_path / "does_not_exist.jpg"))
+
+    def test_reads_only_header_and_caches_by_size_and_mtime(self):
+        """A file should be opened once per (path, size, mtime) and read only up to the header."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "large.jpg"
+            path.write_bytes(b"\xFF\xD8\xFF" + b"\x00" * (mime_detection.HEADER_SIZE * 100))
+            real_open = open
+            read_sizes = []
+
+            class _RecordingHandle:
+                def __init__(self, handle):
+                    self.handle = handle
+
+                def __enter__(self):
+                    return self
+
+                def __exit__(self, *exc):
+                    self.handle.close()
+
+                def read(self, size=-1):
+                    read_sizes.append(size)
+                    return self.handle.read(size)
+
+            def _open(*args, **kwargs):
+                return _RecordingHandle(real_open(*args, **kwargs))
+
+            with patch("builtins.open", side_effect=_open):
+                self.assertEqual("image/jpeg", detect_mime(path))
+                self.assertEqual("image/jpeg", detect_mime(path))
+                self.assertEqual("image/jpeg", detect_mime(path, audio_hint=True))
+                self.assertEqual([mime_detection.HEADER_SIZE], read_sizes)
+
+                path.write_bytes(b"\x89PNG\r\n\x1A\n")
+                os.utime(path, ns=(0, 0))
+                self.assertEqual("image/png", detect_mime(path))
+            self.assertEqual(2, len(read_sizes))
+
+    def test_media_category_prefers_mime_then_extension(self):
+        """Category should come from MIME type when known, else from the file extension."""
+        self.assertEqual("video", media_category("video/mp4", "file.bin"))
+        self.assertEqual("document", media_category("application/pdf", "file"))
+        self.assertEqual("audio", media_category(None, "voice.opus"))
+        self.assertEqual("other", media_category("", "archive.zip"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""Tests for the persistent parse-result cache."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.parse_cache import ParseCache
+
+
+class TestParseCache(unittest.TestCase):
+    """Tests for cache keys, storing on stream exhaustion and replay."""
+
+    def _messages(self, count):
+        return [
+            {"sender": "Alice", "content": f"Text {index}", "timestamp": "2026-02-01T12:00:00", "media": None}
+            for index in range(count)
+        ]
+
+    def test_record_stores_only_exhausted_streams_and_replays_them(self):
+        """A fully consumed stream should be replayed unchanged; a partial one should not be stored."""
+        with tempfile.TemporaryDirectory() as tmp:
+            with ParseCache(Path(tmp) / "cache", "1.0") as cache:
+                metadata = {}
+                stream = cache.record("partial", iter(self._messages(5)), metadata)
+                next(stream)
+                stream.close()
+                self.assertIsNone(cache.load("partial"))
+
+                metadata = {"chat_name": None}
+
+                def parser_stream():
+                    yield from self._messages(2500)
+                    metadata["chat_name"] = "Filled while streaming"
+
+                for msg in cache.record("full", parser_stream(), metadata):
+                    msg["media"] = "changed by exporter"
+
+                cached_messages, cached_metadata = cache.load("full")
+                self.assertEqual(self._messages(2500), list(cached_messages))
+                self.assertEqual({"chat_name": "Filled while streaming"}, cached_metadata)
+
+    def test_key_covers_inputs_parser_args_and_version_but_not_report_fields(self):
+        """Input changes, parser args and version should change the key; creator/case should not."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            input_dir = tmp_path / "input"
+            input_dir.mkdir()
+            chat_file = input_dir / "chat.txt"
+            chat_file.write_text("hello", encoding="utf-8")
+
+            with ParseCache(tmp_path / "cache", "1.0") as cache, ParseCache(tmp_path / "cache", "2.0") as other:
+                key = cache.make_key("whatsapp_export", input_dir, {"platform": "ios", "user": "A", "case": "1"})
+                self.assertEqual(
+                    key, cache.make_key("whatsapp_export", input_dir, {"platform": "ios", "user": "B", "case": "2"})
+                )
+                self.assertNotEqual(key, cache.make_key("whatsapp_export", input_dir, {"platform": "android"}))
+                self.assertNotEqual(key, cache.make_key("generic_json", input_dir, {"platform": "ios"}))
+                self.assertNotEqual(key, other.make_key("whatsapp_export", input_dir, {"platform": "ios"}))
+
+                chat_file.write_text("hello!", encoding="utf-8")
+                self.assertNotEqual(key, cache.make_key("whatsapp_export", input_dir, {"platform": "ios"}))
+                key = cache.make_key("whatsapp_export", input_dir, {"platform": "ios"})
+                (input_dir / "media.jpg").write_bytes(b"\xFF\xD8\xFF")
+                self.assertNotEqual(key, cache.make_key("whatsapp_export", input_dir, {"platform": "ios"}))
+
+    def test_hash_inputs_detects_same_size_and_mtime_changes(self):
+        """With hashing enabled, content changes with equal size and mtime should change the key."""
+        with tempfile.TemporaryDirectory() as tmp:
+            tmp_path = Path(tmp)
+            source = tmp_path / "backup.zip"
+            source.write_bytes(b"aaaa")
+            stat = source.stat()
+            with ParseCache(tmp_path / "cache", "1.0", hash_inputs=True) as cache:
+                key = cache.make_key("threema_messenger_backup", source, {})
+                source.write_bytes(b"bbbb")
+                os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+                self.assertNotEqual(key, cache.make_key("threema_messenger_backup", source, {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
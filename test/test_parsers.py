@@ -6,17 +6,51 @@ import json
 import shutil
 import tempfile
 from pathlib import Path
+from unittest.mock import patch
 
 REPO_ROOT = Path(__file__).resolve().parent.parent
 if str(REPO_ROOT) not in sys.path:
     sys.path.insert(0, str(REPO_ROOT))
 
+from parsers.base_parser import Message
 from parsers.generic_json_parser import GenericJsonParser
 from parsers.romeo_android_db import RomeoAndroidDbParser
 from parsers.telegram_desktop_chat_export import TelegramDesktopChatExportParser
 from parsers.threema_messenger_backup import ThreemaMessengerBackupParser
 from parsers.whatsapp_chat_export import WhatsAppChatExportParser
 from parsers.wire_messenger_backup import WireMessengerBackupParser
+import utils.external_sort as external_sort_module
+
+
+class TestMessage(unittest.TestCase):
+    """Tests for the slotted message record."""
+
+    def test_mapping_interface_matches_dict(self):
+        """Message should read, update, serialize and compare like the equivalent dict."""
+        plain = {"timestamp": "2024-01-01T10:00:00", "sender": "Alice", "content": "Hi", "media": None,
+                 "url": None, "is_owner": False, "chat": "Group"}
+        msg = Message.from_mapping(plain)
+
+        self.assertEqual(plain, msg)
+        self.assertNotIn("media_mime", msg)
+        self.assertIsNone(msg.get("media_mime"))
+        with self.assertRaises(KeyError):
+            msg["media_mime"]
+
+        msg["media_mime"] = "image/jpeg"
+        msg["custom"] = 1
+        self.assertEqual([*plain, "media_mime", "custom"], list(msg))
+        self.assertEqual("image/jpeg", msg.pop("media_mime"))
+        self.assertNotIn("media_mime", msg)
+        self.assertEqual(json.dumps({**plain, "custom": 1}), json.dumps(msg.to_dict()))
+
+    def test_repeated_strings_are_interned(self):
+        """Sender and chat values built separately should share one string object."""
+        first = Message("", "".join(["Al", "ice"]), "", chat="".join(["Gro", "up"]))
+        second = Message("", "".join(["Ali", "ce"]), "", chat="".join(["Grou", "p"]))
+
+        self.assertIs(first["sender"], second["sender"])
+        self.assertIs(first["chat"], second["chat"])
 
 
 class TestGenericJsonParser(unittest.TestCase):
@@ -144,6 +178,32 @@ class TestWhatsAppParser(unittest.TestCase):
         self.assertTrue(any(m.get("media") == "image1.jpg" for m in messages))
         self.assertTrue(any(m.get("url") == "https://example.com" for m in messages))
 
+    def test_iter_messages_streams_and_fills_metadata(self):
+        """iter_messages should return a lazy iterator matching parse() output."""
+        metadata = {}
+        stream = self.parser.iter_messages(
+            self.input_dir,
+            platform="ios",
+            wa_account_name="M.",
+            metadata=metadata,
+            user="Tester",
+            case="CASE-2S",
+            chat_name="WhatsApp Test Chat",
+        )
+        self.assertNotIsInstance(stream, list)
+        self.assertEqual("WhatsApp", metadata["source"])
+        first = next(stream)
+        self.assertEqual("WhatsApp Test Chat", first["chat"])
+        messages, _ = self.parser.parse(
+            self.input_dir,
+            platform="ios",
+            wa_account_name="M.",
+            user="Tester",
+            case="CASE-2S",
+            chat_name="WhatsApp Test Chat",
+        )
+        self.assertEqual(len(messages), 1 + sum(1 for _ in stream))
+
     def test_invalid_platform_raises(self):
         """Unsupported WhatsApp platform should raise ValueError."""
         with self.assertRaises(ValueError):
@@ -220,6 +280,31 @@ class TestThreemaParser(unittest.TestCase):
         self.assertTrue(any(m.get("is_owner") for m in messages))
         self.assertTrue(any(m.get("media") == "message_media_img1" for m in messages))
 
+    def test_spilled_sort_matches_in_memory_sort(self):
+        """A tiny sort budget should spill runs to disk and still give the same timeline."""
+        in_memory, _ = self.parser.parse(self.input_dir, self.media_dir, user="Tester", case="CASE-4")
+        spilled, _ = self.parser.parse(
+            self.input_dir, self.media_dir, user="Tester", case="CASE-4", sort_memory_mb="0.5"
+        )
+        self.assertEqual(in_memory, spilled)
+        timestamps = [m["timestamp"] for m in spilled]
+        self.assertEqual(sorted(timestamps), timestamps)
+
+    def test_spilled_sort_runs_go_to_the_given_folder(self):
+        """sort_temp_dir should hold the sorted runs instead of the system temp folder."""
+        real_mkdtemp = tempfile.mkdtemp
+        with tempfile.TemporaryDirectory() as tmp, patch.object(
+            external_sort_module.tempfile, "mkdtemp", side_effect=real_mkdtemp
+        ) as mkdtemp:
+            run_root = Path(tmp) / "output"
+            self.parser.parse(
+                self.input_dir, self.media_dir, user="Tester", case="CASE-4",
+                sort_memory_mb="0.5", sort_temp_dir=run_root,
+            )
+            self.assertTrue(mkdtemp.called)
+            self.assertEqual(run_root, mkdtemp.call_args.kwargs["dir"])
+            self.assertEqual([], list(run_root.iterdir()))
+
     def test_default_owner_name_is_me_when_not_provided(self):
         """Without threema_account_name, outbound messages should use 'Me' as sender."""
         messages, _ = self.parser.parse(
@@ -257,6 +342,26 @@ class TestWireParser(unittest.TestCase):
         self.assertTrue(any(m.get("is_owner") for m in messages))
         self.assertTrue(any(m.get("media") == "wire_image.jpg" for m in messages))
 
+    def test_iter_messages_sets_header_chat_name_when_exhausted(self):
+        """Wire header chat name should be derived once the stream is consumed."""
+        wire_objects = {
+            "conversations_*.binpb": [{"1": "conv-1", "2": "Only Chat"}],
+            "messages_*.binpb": [{"2": 1767225600000, "3": "u1", "5": "conv-1", "6": {"1": "Hi"}}],
+            "users_*.binpb": [],
+        }
+        metadata = {}
+        with patch.object(self.parser, "_find_account_id", return_value=""):
+            with patch.object(
+                self.parser,
+                "_load_wire_objects",
+                side_effect=lambda root, pattern, field_key: wire_objects[pattern],
+            ):
+                stream = self.parser.iter_messages(self.input_dir, self.media_dir, metadata=metadata)
+        self.assertEqual("Wire Backup", metadata["chat_name"])
+        messages = list(stream)
+        self.assertEqual(1, len(messages))
+        self.assertEqual("Only Chat", metadata["chat_name"])
+
     def test_missing_wire_media_marked_as_missing(self):
         """Missing media file should be marked with missing: prefix."""
         with tempfile.TemporaryDirectory() as tmp:
@@ -0,0 +1,48 @@
+"""Tests for the performance gate comparison logic."""
+
+import sys
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from bench.perf_gate import compare
+
+
+class TestPerfGate(unittest.TestCase):
+    """Tests for tolerance bands in the performance gate."""
+
+    def test_compare_flags_only_slowdowns_beyond_tolerance(self):
+        """Benchmarks slower than baseline * (1 + tolerance) should be reported as regressions."""
+        baseline = {
+            "tolerance": 0.5,
+            "tolerances": {"copy_media": 1.0},
+            "benchmarks": {
+                "parse_wire": {"normalized": 1.0},
+                "export_html": {"normalized": 2.0},
+                "copy_media": {"normalized": 1.0},
+            },
+        }
+        measured = {
+            "benchmarks": {
+                "parse_wire": {"normalized": 1.6},
+                "export_html": {"normalized": 2.9},
+                "copy_media": {"normalized": 1.9},
+                "wire_decode": {"normalized": 0.5},
+            },
+        }
+
+        rows, regressions = compare(baseline, measured)
+
+        self.assertEqual(["parse_wire"], regressions)
+        statuses = {row[0]: row[-1] for row in rows}
+        self.assertEqual("ok", statuses["export_html"])
+        self.assertEqual("ok", statuses["copy_media"])
+        self.assertEqual("new", statuses["wire_decode"])
+        self.assertEqual([], compare(baseline, measured, tolerance=1.0)[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Tests for the compiled HTML report template."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from utils.report_template import ReportTemplate, clear_template_cache, load_report_template
+
+
+class TestReportTemplate(unittest.TestCase):
+    """Tests for template segmentation, rendering and per-process caching."""
+
+    def setUp(self):
+        clear_template_cache()
+
+    def test_render_matches_replace_chain_for_bundled_templates(self):
+        """Rendering the bundled templates should match the former str.replace chain."""
+        folder = REPO_ROOT / "templates"
+        html, css, js = (
+            (folder / name).read_text(encoding="utf-8") for name in ("chat.html", "style.css", "chat.js")
+        )
+        values = {
+            "header": "<div>header</div>",
+            "signature": "<div>sig</div>",
+            "branding_logo": "",
+            "home_button": '<a href="../index.html">Home</a>',
+            "messages_json_content": '[{"content": "{{header}}"}]',
+            "message_chunks": "null",
+            "messages_compressed": "null",
+            "search_index": "null",
+            "report_id": '"report-0123456789abcdef"',
+        }
+        expected = html.replace(
+            '<link rel="stylesheet" href="style.css">', f"<style>{css}</style>"
+        ).replace(
+            '<script src="chat.js"></script>', f"<script>{js}</script>"
+        )
+        for name, value in values.items():
+            expected = expected.replace("{{" + name + "}}", value)
+
+        template = load_report_template(folder)
+        self.assertEqual(set(values), template.placeholders)
+        self.assertEqual(expected, template.render(values))
+
+    def test_missing_values_are_kept_and_inlined_code_is_not_scanned(self):
+        """Unknown placeholders stay literal; placeholders inside inlined JS are not substituted."""
+        template = ReportTemplate(
+            '<p>{{a}}{{b}}</p><script src="chat.js"></script>',
+            js_content="const x = '{{a}}';",
+        )
+        self.assertEqual("<p>1{{b}}</p><script>const x = '{{a}}';</script>", template.render({"a": 1}))
+
+    def test_template_is_compiled_once_until_files_change(self):
+        """The compiled template should be reused and rebuilt after a template edit."""
+        with tempfile.TemporaryDirectory() as tmp:
+            folder = Path(tmp)
+            (folder / "chat.html").write_text("<b>{{header}}</b>", encoding="utf-8")
+            (folder / "style.css").write_text("", encoding="utf-8")
+            (folder / "chat.js").write_text("", encoding="utf-8")
+
+            first = load_report_template(folder)
+            self.assertIs(first, load_report_template(folder))
+
+            (folder / "chat.html").write_text("<i>{{header}}</i>", encoding="utf-8")
+            stat = (folder / "chat.html").stat()
+            os.utime(folder / "chat.html", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            self.assertEqual("<i>x</i>", load_report_template(folder).render({"header": "x"}))
+
+            (folder / "chat.js").unlink()
+            with self.assertRaises(FileNotFoundError):
+                load_report_template(folder)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,158 @@
+"""Tests for the word index embedded in HTML reports."""
+
+import base64
+import io
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Runs the report's filter engine (filterEngineMain in chat.js) once with and once without the
+# index and prints the matching message numbers of every query as JSON.
+_ENGINE_SCRIPT = r"""
+const fs = require("fs");
+const input = JSON.parse(fs.readFileSync(0, "utf8"));
+const source = fs.readFileSync(input.chat_js, "utf8");
+const start = source.indexOf("function filterEngineMain(scope) {");
+const end = source.indexOf("\n    }\n", start) + 6;
+const filterEngineMain = new Function(`return ${source.slice(start, end)}`)();
+function search(index) {
+    let latest = null;
+    const scope = { postMessage(data) { latest = Array.from(data.indices); } };
+    filterEngineMain(scope);
+    const messages = input.messages;
+    scope.onmessage({ data: {
+        type: "add", senderTable: messages.map(msg => msg.sender), chat: messages.map(() => 0),
+        sender: messages.map((msg, i) => i), media: messages.map(() => -1), ts: messages.map(() => null),
+        content: messages.map(msg => msg.content)
+    } });
+    if (index) scope.onmessage({ data: { type: "index", index } });
+    return input.queries.map((text, id) => {
+        scope.onmessage({ data: { type: "query", query: {
+            id: id + 1, chats: null, senders: [], mediaTypes: [], tags: [], rangeStart: null, rangeEnd: null, text
+        } } });
+        return latest;
+    });
+}
+console.log(JSON.stringify({ indexed: search(input.index), scanned: search(null) }));
+"""
+if str(REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(REPO_ROOT))
+
+from exporter import BubblyExporter
+from utils.search_index import MAX_TOKEN_LENGTH, SearchIndexBuilder, tokenize
+
+
+def _decode(document):
+    """Return {term: [message numbers]} from a written index, decoded like chat.js does."""
+    data = base64.b64decode(document["postings"])
+    postings = {}
+    offset = 0
+    for term, length in zip(document["terms"], document["lengths"]):
+        numbers = []
+        current, gap, shift = -1, 0, 0
+        for byte in data[offset:offset + length]:
+            gap |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            current += gap
+            numbers.append(current)
+            gap, shift = 0, 0
+        postings[term] = numbers
+        offset += length
+    return postings
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Tests for tokenizing, posting lists and embedding the index in reports."""
+
+    def test_postings_are_written_in_utf16_term_order(self):
+        """Terms should be lowercased words of content and sender, with gap-encoded postings."""
+        index = SearchIndexBuilder()
+        index.add({"sender": "Alice", "content": "Meet at Zürich café, ok?"})
+        index.add({"sender": "Bob", "content": "ok " + "x" * 40})
+        for _ in range(2, 300):
+            index.add({"sender": "Alice", "content": "filler"})
+        index.add({"sender": "Bob", "content": "OK \U00020000 \uff41"})
+
+        out = io.StringIO()
+        index.write_json(out)
+        document = json.loads(out.getvalue())
+        postings = _decode(document)
+
+        self.assertEqual(301, document["count"])
+        self.assertEqual(MAX_TOKEN_LENGTH, document["max_token_length"])
+        # chat.js compares UTF-16 code units: the surrogate pair of U+20000 sorts before U+FF41.
+        terms = document["terms"]
+        self.assertLess(terms.index("\U00020000"), terms.index("\uff41"))
+        self.assertEqual(sorted(terms, key=lambda term: term.encode("utf-16-be")), terms)
+        self.assertEqual([0, 1, 300], postings["ok"])
+        self.assertEqual([0] + list(range(2, 300)), postings["alice"])
+        self.assertEqual([0], postings["zürich"])
+        self.assertEqual([1], postings["x" * MAX_TOKEN_LENGTH])
+        self.assertEqual(index.term_postings("filler"), postings["filler"])
+        self.assertEqual({"meet", "at", "zürich", "café", "ok"}, tokenize("Meet at Zürich café, ok?"))
+
+    def test_exporter_embeds_index_unless_disabled(self):
+        """Reports should carry the index in payload order, or null with search_index=False."""
+        messages = [
+            {"sender": "A", "content": "second invoice", "timestamp": "2024-01-02T10:00:00", "chat": "C"},
+            {"sender": "B", "content": "first invoice", "timestamp": "2024-01-01T10:00:00", "chat": "C"},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            for enabled in (True, False):
+                output_folder = Path(tmp) / str(enabled)
+                with redirect_stdout(io.StringIO()):
+                    BubblyExporter([dict(msg) for msg in messages], Path(tmp), output_folder, {"chat_name": "C"},
+                                   search_index=enabled).export_html()
+                html = (output_folder / "chat.html").read_text(encoding="utf-8")
+                embedded = re.search(r"^const searchIndex = (.*);$", html, re.MULTILINE).group(1)
+                if not enabled:
+                    self.assertEqual("null", embedded)
+                    continue
+                postings = _decode(json.loads(embedded))
+                # Numbers follow the exported (time-sorted) order: "first" is message 0.
+                self.assertEqual([0], postings["first"])
+                self.assertEqual([1], postings["second"])
+                self.assertEqual([0, 1], postings["invoice"])
+
+    @unittest.skipUnless(shutil.which("node"), "node is needed to run chat.js")
+    def test_indexed_search_matches_full_scan_for_in_word_text(self):
+        """chat.js should find the same messages with and without the index, also inside words."""
+        messages = [
+            {"sender": "Alice", "content": "please pay the invoice"},
+            {"sender": "Bob", "content": "voicemail later"},
+            {"sender": "Davoice", "content": "nothing"},
+            {"sender": "Alice", "content": "x" * 30 + "voice"},
+            {"sender": "Bob", "content": "no match here"},
+        ]
+        queries = ["voice", "oice", "voicemail", "pay the inv", "il la", "avoi", "xvoice", "here", "zzz", "!!"]
+        index = SearchIndexBuilder()
+        for msg in messages:
+            index.add(msg)
+        out = io.StringIO()
+        index.write_json(out)
+        request = {
+            "chat_js": str(REPO_ROOT / "templates" / "chat.js"),
+            "messages": messages,
+            "index": json.loads(out.getvalue()),
+            "queries": queries,
+        }
+        completed = subprocess.run(
+            ["node", "-e", _ENGINE_SCRIPT], input=json.dumps(request), capture_output=True, text=True,
+            encoding="utf-8", check=True,
+        )
+        results = json.loads(completed.stdout)
+        self.assertEqual([0, 1, 2, 3], results["indexed"][0])
+        self.assertEqual(dict(zip(queries, results["scanned"])), dict(zip(queries, results["indexed"])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -3,10 +3,16 @@
 from .cli_config import parse_args, parse_parser_args
 from .interactive_cli import run_interactive_wizard
 from .index_report import write_split_index
+from .media_store import ContentMediaStore
+from .message_store import MessageStore
+from .metrics import RunMetrics
+from .parse_cache import ParseCache
+from .profiling import RunProfiler
 from .processed_files import collect_processed_files
 from .run_logger import RunLogger, log_fallback_exception, write_fallback_exception_log
 from .split_export import export_split_by_chat
-from .summary import print_cli_summary
+from .summary import MessageSummary, print_cli_summary
+from .tracing import TraceRecorder
 from .utils import normalize_user_path, prepare_input_generic
 
 __all__ = [
@@ -14,7 +20,12 @@ __all__ = [
     "normalize_user_path",
     "run_interactive_wizard",
     "write_split_index",
+    "ContentMediaStore",
+    "MessageStore",
+    "RunMetrics",
+    "ParseCache",
     "collect_processed_files",
+    "RunProfiler",
     "RunLogger",
     "log_fallback_exception",
     "write_fallback_exception_log",
@@ -22,4 +33,6 @@ __all__ = [
     "parse_parser_args",
     "export_split_by_chat",
     "print_cli_summary",
+    "MessageSummary",
+    "TraceRecorder",
 ]
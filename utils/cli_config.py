@@ -41,6 +41,22 @@ def apply_config(parser, config):
         "logo",
         "log_level",
         "split_by_chat",
+        "media_workers",
+        "media_mode",
+        "media_layout",
+        "media_store",
+        "jobs",
+        "incremental",
+        "message_layout",
+        "chunk_size",
+        "payload_compression",
+        "parse_cache",
+        "parse_cache_hash",
+        "spill",
+        "sort_memory_mb",
+        "search_index",
+        "profile",
+        "trace",
         "parser_args",
     ):
         if key in config:
@@ -49,6 +65,17 @@ def apply_config(parser, config):
         parser.set_defaults(**defaults)
 
 
+def _positive_int(value):
+    """Argparse type for strictly positive integer options."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}") from None
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected a positive integer, got {value!r}")
+    return number
+
+
 def parse_parser_args(parser_args_list):
     """Parse parser-specific key=value pairs from CLI/config into a dictionary."""
     parsed_parser_args = {}
@@ -69,7 +96,7 @@ def parse_parser_args(parser_args_list):
 def parse_args(parsers, banner_printer=None):
     """Parse CLI arguments, merge config defaults, and validate required fields."""
     parser = argparse.ArgumentParser(description="Bubbly Launcher - Chat Export Viewer")
-    parser.set_defaults(split_by_chat=True)
+    parser.set_defaults(split_by_chat=True, search_index=True)
     parser.add_argument("-f", "--config", help="Path to JSON config file")
     parser.add_argument("-p", "--parser", help="Parser name")
     parser.add_argument("-i", "--input", help="Input file/folder/zip")
@@ -89,6 +116,95 @@ def parse_args(parsers, banner_printer=None):
         action="store_false",
         help="Generate one merged HTML instead of per-chat files",
     )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=_positive_int,
+        help="Number of processes used to export chats in split-by-chat mode (default: 1)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Update the export in <output>/bubbly_<case>, rewriting only chats that changed",
+    )
+    parser.add_argument(
+        "--media-workers",
+        type=_positive_int,
+        help="Number of threads used to copy media files (default: 4)",
+    )
+    parser.add_argument(
+        "--media-mode",
+        default="copy",
+        choices=["copy", "hardlink", "symlink", "reflink", "auto"],
+        help="How media files are placed in the output folder (default: copy)",
+    )
+    parser.add_argument(
+        "--media-layout",
+        default="named",
+        choices=["named", "content"],
+        help="Media file layout: original names or content-addressed by SHA-256 (default: named)",
+    )
+    parser.add_argument(
+        "--media-store",
+        help="Persistent content-addressed media store folder (default: <output>/bubbly_media_store)",
+    )
+    parser.add_argument(
+        "--message-layout",
+        default="inline",
+        choices=["inline", "chunks"],
+        help="Embed messages in the HTML or write them as data/<report>/chunk_NNNN.js files (default: inline)",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=_positive_int,
+        help="Messages per data chunk file with --message-layout chunks (default: 5000)",
+    )
+    parser.add_argument(
+        "--payload-compression",
+        default="none",
+        choices=["none", "gzip", "deflate"],
+        help="Embed the messages compressed and base64-encoded (inline layout only, default: none)",
+    )
+    parser.add_argument(
+        "--parse-cache",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Reuse parsed messages of unchanged input from a cache folder (default: <output>/bubbly_parse_cache)",
+    )
+    parser.add_argument(
+        "--parse-cache-hash",
+        action="store_true",
+        help="Also compare SHA-256 hashes of the input files for the parse cache key",
+    )
+    parser.add_argument(
+        "--spill",
+        nargs="?",
+        const="",
+        metavar="DIR",
+        help="Keep parsed messages in a temporary SQLite store instead of memory (default folder: <output>)",
+    )
+    parser.add_argument(
+        "--sort-memory-mb",
+        type=_positive_int,
+        help="Memory budget for sorting messages by time before sorted runs spill to disk (default: 256)",
+    )
+    parser.add_argument(
+        "--no-search-index",
+        dest="search_index",
+        action="store_false",
+        help="Do not embed the word index that speeds up search in large reports",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Profile the run (cProfile + tracemalloc) and save the results in the run's log folder",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        help="Write a Chrome trace (Perfetto / chrome://tracing) of the run to its log folder",
+    )
     parser.add_argument("-a", "--parser_args", nargs="*", help="Parser-specific args as key=value pairs")
     parser.add_argument(
         "-s",
@@ -0,0 +1,134 @@
+"""External merge sort for message streams that may not fit in memory."""
+
+import heapq
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+from parsers.base_parser import Message, message_json_default
+
+# Memory the in-memory run buffer may use before it is sorted and spilled to disk.
+DEFAULT_SORT_BUDGET = 256 * 1024 * 1024
+# Rough per-message cost besides the content text: record, small strings, list slot.
+_MESSAGE_OVERHEAD = 300
+# Runs merged at once; more runs are first merged into longer runs in several passes.
+MAX_MERGE_FAN_IN = 64
+_RUN_BUFFER_SIZE = 64 * 1024
+
+
+def timestamp_key(msg):
+    """Sort key of normalized messages: the ISO timestamp string, missing timestamps first."""
+    return msg.get("timestamp") or ""
+
+
+def _estimated_size(msg):
+    content = msg.get("content")
+    return _MESSAGE_OVERHEAD + (len(content) if isinstance(content, str) else 0)
+
+
+def _read_run(path):
+    with open(path, "r", encoding="utf-8", buffering=_RUN_BUFFER_SIZE) as handle:
+        for line in handle:
+            yield Message.from_mapping(json.loads(line))
+
+
+class ExternalSorter:
+    """Sort messages with bounded memory: sorted runs spilled to temp files, then a k-way heap merge.
+
+    Add messages with `add`/`add_all`, then iterate `iter_sorted()` once. While the
+    estimated size of the buffered messages stays below `memory_budget`, nothing is
+    written and the original message objects are returned. The sort is stable:
+    messages with equal keys keep their input order.
+    """
+
+    def __init__(self, key=timestamp_key, memory_budget=None, temp_dir=None, max_fan_in=MAX_MERGE_FAN_IN):
+        """Create an empty sorter; `temp_dir` is where the run folder is created (default: system temp)."""
+        self.key = key
+        self.memory_budget = max(1, int(memory_budget or DEFAULT_SORT_BUDGET))
+        self.temp_dir = temp_dir
+        self.max_fan_in = max(2, int(max_fan_in))
+        self.count = 0
+        self._buffer = []
+        self._buffer_size = 0
+        self._runs = []
+        self._run_names = 0
+        self._folder = None
+
+    @property
+    def spilled_runs(self):
+        """Number of runs written to disk so far."""
+        return len(self._runs)
+
+    def add(self, msg):
+        """Buffer one message, spilling a sorted run when the memory budget is exceeded."""
+        self._buffer.append(msg)
+        self._buffer_size += _estimated_size(msg)
+        self.count += 1
+        if self._buffer_size >= self.memory_budget:
+            self._spill_buffer()
+
+    def add_all(self, messages):
+        """Buffer every message of an iterable."""
+        for msg in messages:
+            self.add(msg)
+
+    def _new_run_path(self):
+        if self._folder is None:
+            self._folder = Path(tempfile.mkdtemp(prefix="bubbly_sort_", dir=self.temp_dir))
+        self._run_names += 1
+        return self._folder / f"run_{self._run_names:05d}.jsonl"
+
+    def _write_run(self, messages):
+        path = self._new_run_path()
+        with open(path, "w", encoding="utf-8", buffering=_RUN_BUFFER_SIZE) as handle:
+            for msg in messages:
+                handle.write(json.dumps(msg, ensure_ascii=False, default=message_json_default))
+                handle.write("\n")
+        self._runs.append(path)
+
+    def _spill_buffer(self):
+        self._buffer.sort(key=self.key)
+        self._write_run(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
+
+    def _reduce_runs(self):
+        # Merge the oldest runs first, so equal keys keep their input order across passes.
+        while len(self._runs) > self.max_fan_in:
+            group, rest = self._runs[:self.max_fan_in], self._runs[self.max_fan_in:]
+            self._runs = []
+            self._write_run(heapq.merge(*(_read_run(path) for path in group), key=self.key))
+            for path in group:
+                path.unlink()
+            self._runs.extend(rest)
+
+    def iter_sorted(self):
+        """Yield all added messages in key order; temp files are removed when iteration ends."""
+        try:
+            if not self._runs:
+                self._buffer.sort(key=self.key)
+                buffer, self._buffer = self._buffer, []
+                yield from buffer
+                return
+            if self._buffer:
+                self._spill_buffer()
+            self._reduce_runs()
+            yield from heapq.merge(*(_read_run(path) for path in self._runs), key=self.key)
+        finally:
+            self.close()
+
+    def close(self):
+        """Drop buffered messages and remove spilled runs."""
+        self._buffer = []
+        self._runs = []
+        if self._folder is not None:
+            shutil.rmtree(self._folder, ignore_errors=True)
+            self._folder = None
+
+
+def sort_messages(messages, key=timestamp_key, memory_budget=None, temp_dir=None):
+    """Consume `messages` now and return an iterator over them in stable key order."""
+    sorter = ExternalSorter(key=key, memory_budget=memory_budget, temp_dir=temp_dir)
+    sorter.add_all(messages)
+    return sorter.iter_sorted()
@@ -0,0 +1,111 @@
+"""Content-addressed media store with a persistent digest index."""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ContentMediaStore:
+    """Store media files once under their SHA-256 digest and remember digests across runs.
+
+    Files live at `<root>/<first two hex chars>/<digest><suffix>`. The SQLite index
+    maps a source fingerprint (resolved path, size, mtime) to its digest, so
+    unchanged sources are neither re-hashed nor re-copied by later runs. New
+    content is hardlinked into the store when it shares a filesystem with the
+    source and copied otherwise, so the store does not double disk use.
+    Safe to use from the exporter's media thread pool.
+    """
+
+    INDEX_NAME = "index.sqlite"
+
+    def __init__(self, root):
+        """Open (or create) the store and its digest index."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root / self.INDEX_NAME), timeout=60, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sources ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, sha256 TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self.hashed_count = 0
+        self.stored_count = 0
+
+    def __enter__(self):
+        """Return the store for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Close the index connection."""
+        self.close()
+        return False
+
+    def close(self):
+        """Close the index connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def relative_path(self, digest, suffix=""):
+        """Return the store-relative path for a digest."""
+        return f"{digest[:2]}/{digest}{suffix.lower()}"
+
+    def add(self, src, suffix=""):
+        """Store `src` if its content is new; return (digest, absolute stored path)."""
+        src = Path(src)
+        stat = src.stat()
+        key = str(src.resolve())
+        digest = self._lookup(key, stat)
+        if digest is None:
+            digest = self._hash_file(src)
+            with self._lock:
+                self.hashed_count += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                    (key, stat.st_size, stat.st_mtime_ns, digest),
+                )
+                self._conn.commit()
+
+        stored = self.root / self.relative_path(digest, suffix)
+        if not stored.is_file():
+            stored.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temp file first so concurrent writers never expose partial content.
+            handle, temp_name = tempfile.mkstemp(dir=stored.parent, prefix=".incoming_")
+            os.close(handle)
+            try:
+                try:
+                    os.unlink(temp_name)
+                    os.link(src, temp_name)
+                except OSError:
+                    # Cross-device or no hardlink support: fall back to a byte copy.
+                    shutil.copyfile(src, temp_name)
+                os.replace(temp_name, stored)
+            finally:
+                if os.path.exists(temp_name):
+                    os.unlink(temp_name)
+            with self._lock:
+                self.stored_count += 1
+        return digest, stored
+
+    def _lookup(self, key, stat):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT sha256 FROM sources WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (key, stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        return row[0] if row else None
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,157 @@
+"""Temporary SQLite store for parsed messages, used to keep memory bounded on large inputs."""
+
+import json
+import shutil
+import sqlite3
+import tempfile
+from pathlib import Path
+
+# Module import: exporter itself imports utils, so its names may not exist yet at import time.
+import exporter as exporter_module
+from parsers.base_parser import Message, message_json_default
+
+# Rows fetched per cursor round trip when reading messages back.
+_FETCH_SIZE = 1000
+# SQLite page cache per connection, in KiB (negative cache_size); bounds the store's own memory.
+_CACHE_KIB = 16 * 1024
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(str(db_path))
+    conn.execute(f"PRAGMA cache_size = -{_CACHE_KIB}")
+    # Throwaway data: no journal and no fsync.
+    conn.execute("PRAGMA journal_mode = OFF")
+    conn.execute("PRAGMA synchronous = OFF")
+    return conn
+
+
+class StoredMessages:
+    """Re-iterable, timestamp-ordered view of stored messages (all chats or a set of chat keys).
+
+    Every iteration opens its own read cursor, so views can be iterated several
+    times and passed to worker processes (they hold only the database path).
+    """
+
+    def __init__(self, db_path, chat_keys, count):
+        """Create a view; `chat_keys` None selects every message."""
+        self.db_path = str(db_path)
+        self.chat_keys = None if chat_keys is None else tuple(chat_keys)
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        query = "SELECT data FROM messages"
+        params = ()
+        if self.chat_keys is not None:
+            query += f" WHERE chat IN ({', '.join('?' * len(self.chat_keys))})"
+            params = self.chat_keys
+        # Same order as the exporter's sort: by ts_ms, unparseable timestamps last; parser order
+        # breaks ties, so equal timestamps keep their original sequence.
+        query += " ORDER BY ts_ms IS NULL, ts_ms, seq"
+        conn = _connect(self.db_path)
+        try:
+            cursor = conn.execute(query, params)
+            while True:
+                rows = cursor.fetchmany(_FETCH_SIZE)
+                if not rows:
+                    return
+                for (data,) in rows:
+                    yield Message.from_mapping(json.loads(data))
+        finally:
+            conn.close()
+
+
+class MessageStore:
+    """Spill parsed messages to a temporary SQLite file instead of holding them in memory.
+
+    Messages are appended with `add` and read back through timestamp-ordered
+    cursors: iterating the store yields every message, `chat_groups` returns one
+    `StoredMessages` view per chat label. The database lives in a private
+    temporary folder below `root` that is removed on `close`.
+    """
+
+    def __init__(self, root):
+        """Create an empty store in a new temporary folder below `root`."""
+        root = Path(root)
+        root.mkdir(parents=True, exist_ok=True)
+        self.folder = Path(tempfile.mkdtemp(prefix="bubbly_spill_", dir=str(root)))
+        self.db_path = self.folder / "messages.sqlite"
+        self.count = 0
+        self._indexed = False
+        self._conn = _connect(self.db_path)
+        self._conn.execute(
+            "CREATE TABLE messages (seq INTEGER PRIMARY KEY, chat TEXT NOT NULL, ts_ms INTEGER, data TEXT NOT NULL)"
+        )
+
+    def __enter__(self):
+        """Return the store for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Close the database and remove its folder."""
+        self.close()
+        return False
+
+    def close(self):
+        """Close the database and remove its folder."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def add(self, messages):
+        """Append messages in the given order; return how many were added."""
+        if self._indexed:
+            raise RuntimeError("Messages cannot be added after the store has been read")
+        rows = []
+        for msg in messages:
+            self.count += 1
+            rows.append((
+                self.count,
+                # Falsy chat values all fall back to the default chat name when grouping.
+                str(msg.get("chat") or ""),
+                # Raw timestamp text does not sort chronologically for non-ISO layouts.
+                exporter_module.timestamp_ms(msg.get("timestamp")),
+                json.dumps(msg, ensure_ascii=False, default=message_json_default),
+            ))
+        self._conn.executemany("INSERT INTO messages (seq, chat, ts_ms, data) VALUES (?, ?, ?, ?)", rows)
+        self._conn.commit()
+        return len(rows)
+
+    def size_bytes(self):
+        """Return the current size of the database file."""
+        return self.db_path.stat().st_size
+
+    def _finish_writes(self):
+        # Building the indexes once after the bulk insert is much cheaper than maintaining them per row.
+        if not self._indexed:
+            self._conn.execute("CREATE INDEX messages_chat_ts ON messages (chat, ts_ms IS NULL, ts_ms, seq)")
+            self._conn.execute("CREATE INDEX messages_ts ON messages (ts_ms IS NULL, ts_ms, seq)")
+            self._conn.commit()
+            self._indexed = True
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        self._finish_writes()
+        return iter(StoredMessages(self.db_path, None, self.count))
+
+    def chat_groups(self, default_chat_name):
+        """Return `{chat label: StoredMessages}` in order of first appearance, like group_messages_by_chat."""
+        self._finish_writes()
+        rows = self._conn.execute(
+            "SELECT chat, COUNT(*) FROM messages GROUP BY chat ORDER BY MIN(seq)"
+        ).fetchall()
+        keys_by_label = {}
+        counts = {}
+        for chat_key, count in rows:
+            label = str(chat_key or default_chat_name or "Chat").strip() or "Chat"
+            keys_by_label.setdefault(label, []).append(chat_key)
+            counts[label] = counts.get(label, 0) + count
+        return {
+            label: StoredMessages(self.db_path, chat_keys, counts[label])
+            for label, chat_keys in keys_by_label.items()
+        }
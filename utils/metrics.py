@@ -0,0 +1,116 @@
+"""Per-stage timing and throughput metrics for a Bubbly run."""
+
+import json
+import time
+from contextlib import contextmanager
+
+from .tracing import trace_span
+
+
+class RunMetrics:
+    """Accumulate wall time, CPU time, item counts and bytes per named stage.
+
+    A stage may be recorded many times (e.g. once per export batch or per chat); the
+    values add up. CPU time is process-wide (`time.process_time`), so it includes the
+    media threads. Metrics from split-export worker processes are added with `merge`.
+    """
+
+    def __init__(self):
+        """Initialize empty stages; stage order is the order of first use."""
+        self.stages = {}
+        self._started = time.perf_counter()
+        # Optional callable(stage_name) run whenever a timed stage ends (e.g. RunProfiler.stage_finished).
+        self.on_stage_end = None
+
+    def add(self, name, wall_s=0.0, cpu_s=0.0, items=0, byte_count=0):
+        """Add measured values to a stage."""
+        stage = self.stages.setdefault(name, {"wall_s": 0.0, "cpu_s": 0.0, "items": 0, "bytes": 0})
+        stage["wall_s"] += wall_s
+        stage["cpu_s"] += cpu_s
+        stage["items"] += items
+        stage["bytes"] += byte_count
+
+    @contextmanager
+    def stage(self, name, items=0, byte_count=0):
+        """Time a block; the yielded dict's `items`/`bytes` may be updated inside the block."""
+        counts = {"items": items, "bytes": byte_count}
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            with trace_span(name, "stage"):
+                yield counts
+        finally:
+            self.add(
+                name,
+                time.perf_counter() - wall_start,
+                time.process_time() - cpu_start,
+                counts["items"],
+                counts["bytes"],
+            )
+            if self.on_stage_end is not None:
+                self.on_stage_end(name)
+
+    def timed_iter(self, name, iterable):
+        """Yield from `iterable`, recording the time spent producing items (e.g. parsing) under `name`."""
+        iterator = iter(iterable)
+        wall_s = 0.0
+        cpu_s = 0.0
+        items = 0
+        try:
+            while True:
+                wall_start = time.perf_counter()
+                cpu_start = time.process_time()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    wall_s += time.perf_counter() - wall_start
+                    cpu_s += time.process_time() - cpu_start
+                items += 1
+                yield item
+        finally:
+            self.add(name, wall_s, cpu_s, items)
+            if self.on_stage_end is not None:
+                self.on_stage_end(name)
+
+    def merge(self, other):
+        """Add all stages of another metrics object."""
+        for name, stage in other.stages.items():
+            self.add(name, stage["wall_s"], stage["cpu_s"], stage["items"], stage["bytes"])
+
+    def to_dict(self):
+        """Return the metrics as a JSON-serializable dict, including derived rates."""
+        stages = {}
+        for name, stage in self.stages.items():
+            wall_s = stage["wall_s"]
+            stages[name] = {
+                "wall_s": round(wall_s, 6),
+                "cpu_s": round(stage["cpu_s"], 6),
+                "items": stage["items"],
+                "bytes": stage["bytes"],
+                "items_per_s": round(stage["items"] / wall_s, 1) if wall_s > 0 else None,
+                "mb_per_s": round(stage["bytes"] / wall_s / 1e6, 3) if wall_s > 0 else None,
+            }
+        return {"total_wall_s": round(time.perf_counter() - self._started, 6), "stages": stages}
+
+    def write(self, path):
+        """Write the metrics as JSON to `path`."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, indent=2)
+
+    def print_summary(self):
+        """Print one line per stage."""
+        data = self.to_dict()
+        print(f"Stages (total {data['total_wall_s']:.2f}s):")
+        for name, stage in data["stages"].items():
+            line = f" - {name}: {stage['wall_s']:.2f}s wall, {stage['cpu_s']:.2f}s CPU"
+            if stage["items"]:
+                line += f", {stage['items']} items"
+                if stage["items_per_s"] is not None:
+                    line += f" ({stage['items_per_s']:.0f}/s)"
+            if stage["bytes"]:
+                line += f", {stage['bytes'] / 1e6:.1f} MB"
+                if stage["mb_per_s"] is not None:
+                    line += f" ({stage['mb_per_s']:.1f} MB/s)"
+            print(line)
@@ -0,0 +1,156 @@
+"""Shared media MIME detection with header-only reads and a run-wide cache."""
+
+import mimetypes
+from functools import lru_cache
+from pathlib import Path
+
+# Every signature below fits in the first bytes; never read more than this.
+HEADER_SIZE = 64
+
+_EXTENSIONS = {
+    "image/jpeg": "jpg",
+    "image/png": "png",
+    "image/gif": "gif",
+    "image/webp": "webp",
+    "video/mp4": "mp4",
+    "video/quicktime": "mov",
+    "video/webm": "webm",
+    "audio/mpeg": "mp3",
+    "audio/mp4": "m4a",
+    "audio/ogg": "ogg",
+    "audio/wav": "wav",
+    "application/pdf": "pdf",
+}
+
+_DOCUMENT_MIMES = {
+    "application/pdf",
+    "application/msword",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.ms-excel",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+
+def detect_mime(path, audio_hint=False):
+    """Detect a media MIME type from the file header (magic bytes), or return None.
+
+    Results are cached per (path, size, mtime), so each file is sniffed once per run
+    even when both a parser and the exporter ask for it. `audio_hint` resolves
+    ambiguous MP4 containers (isom/mp41/mp42) to audio/mp4 for known voice messages;
+    it is applied after the cache lookup, so it does not cause a second read.
+    """
+    path = Path(path)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    mime, ambiguous_mp4 = _detect_cached(str(path), stat.st_size, stat.st_mtime_ns)
+    if ambiguous_mp4 and audio_hint:
+        return "audio/mp4"
+    return mime
+
+
+def clear_mime_cache():
+    """Forget all cached detection results."""
+    _detect_cached.cache_clear()
+
+
+# Bounded so a run over millions of media files cannot grow the cache without limit.
+_DETECT_CACHE_SIZE = 65536
+
+
+@lru_cache(maxsize=_DETECT_CACHE_SIZE)
+def _detect_cached(path_text, size, mtime_ns):
+    del size, mtime_ns  # Part of the cache key only.
+    try:
+        with open(path_text, "rb") as handle:
+            header = handle.read(HEADER_SIZE)
+    except OSError:
+        return None, False
+    return _mime_from_header(header, Path(path_text).suffix.lower())
+
+
+def _mime_from_header(header, suffix):
+    """Return (mime, ambiguous_mp4); the flag marks MP4 brands an audio hint may turn into audio."""
+    mime = _sniff_header(header, suffix)
+    ambiguous_mp4 = (
+        mime == "video/mp4" and len(header) >= 12 and header[4:8] == b"ftyp"
+        and header[8:12] in {b"isom", b"mp41", b"mp42"}
+    )
+    return mime, ambiguous_mp4
+
+
+def _sniff_header(header, suffix):
+    if not header:
+        return None
+
+    if header.startswith(b"\xFF\xD8\xFF"):
+        return "image/jpeg"
+    if header.startswith(b"\x89PNG\r\n\x1A\n"):
+        return "image/png"
+    if header.startswith((b"GIF87a", b"GIF89a")):
+        return "image/gif"
+    if header.startswith(b"RIFF") and len(header) >= 12 and header[8:12] == b"WEBP":
+        return "image/webp"
+    if header.startswith(b"%PDF-"):
+        return "application/pdf"
+    if header.startswith(b"OggS"):
+        return "audio/ogg"
+    if header.startswith(b"ID3"):
+        return "audio/mpeg"
+    if len(header) >= 2 and header[0] == 0xFF and (header[1] & 0xE0) == 0xE0:
+        return "audio/mpeg"
+    if header.startswith(b"RIFF") and len(header) >= 12 and header[8:12] == b"WAVE":
+        return "audio/wav"
+    if len(header) >= 12 and header[4:8] == b"ftyp":
+        brand = header[8:12]
+        if brand == b"M4A ":
+            return "audio/mp4"
+        # `isom/mp41/mp42` are common for both audio and video MP4 containers.
+        # Prefer extension-based disambiguation to avoid classifying videos as audio.
+        if brand in {b"isom", b"mp41", b"mp42"}:
+            if suffix in {".m4a", ".aac"}:
+                return "audio/mp4"
+            return "video/mp4"
+        if brand in {b"qt  "}:
+            return "video/quicktime"
+        return "video/mp4"
+    if header.startswith(b"\x1A\x45\xDF\xA3"):
+        return "video/webm"
+    return None
+
+
+def extension_for_mime(mime):
+    """Return a file extension (without dot) for a MIME type, or None."""
+    mime = (mime or "").lower().strip()
+    if mime in _EXTENSIONS:
+        return _EXTENSIONS[mime]
+    guessed = mimetypes.guess_extension(mime) if mime else None
+    if guessed:
+        return guessed.lstrip(".")
+    return None
+
+
+def media_category(mime, file_name):
+    """Classify media as image/video/audio/document/other from MIME type, then extension."""
+    mime = str(mime or "").lower().strip()
+    if mime.startswith("image/"):
+        return "image"
+    if mime.startswith("video/"):
+        return "video"
+    if mime.startswith("audio/"):
+        return "audio"
+    if mime in _DOCUMENT_MIMES:
+        return "document"
+
+    name = str(file_name or "")
+    ext = name.rsplit(".", 1)[-1].lower() if "." in name else ""
+    if ext in {"jpg", "jpeg", "png", "gif", "webp"}:
+        return "image"
+    if ext in {"mp4", "mov", "webm", "3gp"}:
+        return "video"
+    if ext in {"mp3", "wav", "m4a", "aac", "opus", "ogg"}:
+        return "audio"
+    if ext in {"pdf", "doc", "docx", "xls", "xlsx"}:
+        return "document"
+    return "other"
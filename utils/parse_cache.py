@@ -0,0 +1,150 @@
+"""Persistent cache of normalized parser output, keyed by input fingerprint."""
+
+import hashlib
+import json
+import sqlite3
+import zlib
+from datetime import datetime
+from pathlib import Path
+
+from parsers.base_parser import Message, message_json_default
+
+# Messages per compressed row; rows are decoded one at a time on a cache hit.
+_ROW_SIZE = 1000
+_HASH_CHUNK_SIZE = 1024 * 1024
+# Run-specific report fields and resource settings that do not change the parsed messages; not part of the key.
+_UNKEYED_PARSER_ARGS = ("user", "case")
+
+
+class ParseCache:
+    """Store parser messages and metadata in SQLite so re-runs of the same evidence skip parsing.
+
+    The key covers the input files (relative path, size, mtime and optionally a
+    SHA-256 of the content), the parser name, parser_args and the Bubbly version.
+    Messages are stored as zlib-compressed JSON rows of `_ROW_SIZE` messages.
+    """
+
+    DB_NAME = "parse_cache.sqlite"
+
+    def __init__(self, root, version, hash_inputs=False):
+        """Open (or create) the cache database."""
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.version = str(version)
+        self.hash_inputs = bool(hash_inputs)
+        self._conn = sqlite3.connect(str(self.root / self.DB_NAME), timeout=60)
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, created_at TEXT NOT NULL, message_count INTEGER NOT NULL, metadata TEXT NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS rows ("
+            "key TEXT NOT NULL, seq INTEGER NOT NULL, data BLOB NOT NULL, PRIMARY KEY (key, seq));"
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        """Return the cache for use as a context manager."""
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Close the database connection."""
+        self.close()
+        return False
+
+    def close(self):
+        """Close the database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def make_key(self, parser_name, input_path, parser_kwargs):
+        """Return the cache key for parsing `input_path` with a parser and its arguments."""
+        parser_args = {
+            key: value for key, value in (parser_kwargs or {}).items() if key not in _UNKEYED_PARSER_ARGS
+        }
+        payload = {
+            "version": self.version,
+            "parser": parser_name,
+            "parser_args": parser_args,
+            "inputs": self._fingerprint(Path(input_path)),
+        }
+        text = json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def load(self, key):
+        """Return `(message iterator, metadata)` for a cached key, or None on a miss."""
+        row = self._conn.execute("SELECT metadata FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return self._iter_rows(key), json.loads(row[0])
+
+    def record(self, key, messages, metadata):
+        """Yield `messages` unchanged and store them under `key` once the stream is exhausted.
+
+        Each message is encoded when it is yielded, before consumers modify it. `metadata`
+        is read at the end, so parsers that complete it while streaming are covered.
+        Nothing is stored if the stream is not consumed to the end.
+        """
+        self._conn.execute("DELETE FROM rows WHERE key = ?", (key,))
+        encoded = []
+        seq = 0
+        count = 0
+        completed = False
+        try:
+            for msg in messages:
+                encoded.append(json.dumps(msg, ensure_ascii=False, default=message_json_default))
+                count += 1
+                if len(encoded) >= _ROW_SIZE:
+                    self._write_row(key, seq, encoded)
+                    seq += 1
+                    encoded = []
+                yield msg
+            if encoded:
+                self._write_row(key, seq, encoded)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, created_at, message_count, metadata) VALUES (?, ?, ?, ?)",
+                (key, datetime.now().isoformat(timespec="seconds"), count, json.dumps(metadata, default=str)),
+            )
+            self._conn.commit()
+            completed = True
+            print(f"Parse cache stored {count} messages ({key[:12]})")
+        finally:
+            if not completed and self._conn is not None:
+                self._conn.rollback()
+
+    def _write_row(self, key, seq, encoded):
+        data = zlib.compress(("[" + ",".join(encoded) + "]").encode("utf-8"))
+        self._conn.execute("INSERT INTO rows (key, seq, data) VALUES (?, ?, ?)", (key, seq, data))
+
+    def _iter_rows(self, key):
+        seq = 0
+        while True:
+            row = self._conn.execute("SELECT data FROM rows WHERE key = ? AND seq = ?", (key, seq)).fetchone()
+            if row is None:
+                return
+            yield from map(Message.from_mapping, json.loads(zlib.decompress(row[0]).decode("utf-8")))
+            seq += 1
+
+    def _fingerprint(self, input_path):
+        if input_path.is_file():
+            files = [(input_path.name, input_path)]
+        else:
+            files = sorted(
+                (path.relative_to(input_path).as_posix(), path)
+                for path in input_path.rglob("*")
+                if path.is_file()
+            )
+        fingerprint = []
+        for relative, path in files:
+            stat = path.stat()
+            entry = [relative, stat.st_size, stat.st_mtime_ns]
+            if self.hash_inputs:
+                entry.append(self._hash_file(path))
+            fingerprint.append(entry)
+        return fingerprint
+
+    def _hash_file(self, path):
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for chunk in iter(lambda: handle.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
@@ -0,0 +1,112 @@
+"""Optional cProfile/tracemalloc capture for a Bubbly run (`--profile`)."""
+
+import cProfile
+import os
+import pstats
+import tracemalloc
+
+# Rows in the hot-function table and the per-stage allocation listings.
+DEFAULT_TOP_N = 15
+# Frames kept per allocation traceback; 1 groups allocations by source line.
+_TRACEMALLOC_FRAMES = 1
+
+
+class RunProfiler:
+    """Run the pipeline under cProfile and tracemalloc and save the results next to the run log.
+
+    Register `stage_finished` as `RunMetrics.on_stage_end`: every time a stage finishes,
+    the allocations since the previous snapshot are recorded, so a stage that runs once
+    per batch or per chat shows each run (labelled `name (#2)`, ...). Only the calling
+    thread is profiled by cProfile; media threads and split-export worker processes show
+    up in the allocation snapshots (threads) or not at all (processes).
+    """
+
+    def __init__(self, top_n=DEFAULT_TOP_N):
+        """Initialize an idle profiler."""
+        self.top_n = top_n
+        self._profile = cProfile.Profile()
+        self._running = False
+        self._owns_tracemalloc = False
+        self._previous_snapshot = None
+        self._sections = []
+        self._stage_runs = {}
+
+    def start(self):
+        """Start CPU and allocation profiling."""
+        if self._running:
+            return
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(_TRACEMALLOC_FRAMES)
+            self._owns_tracemalloc = True
+        self._previous_snapshot = self._take_snapshot()
+        self._profile.enable()
+        self._running = True
+
+    def stop(self):
+        """Stop profiling; safe to call more than once."""
+        if not self._running:
+            return
+        self._profile.disable()
+        self._running = False
+        if tracemalloc.is_tracing():
+            self._record_allocations("end of run")
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+                self._owns_tracemalloc = False
+
+    def stage_finished(self, name):
+        """Record an allocation snapshot each time stage `name` finishes."""
+        if not self._running:
+            return
+        runs = self._stage_runs.get(name, 0) + 1
+        self._stage_runs[name] = runs
+        self._record_allocations(name if runs == 1 else f"{name} (#{runs})")
+
+    def _take_snapshot(self):
+        snapshot = tracemalloc.take_snapshot()
+        # Exclude the profiler's and tracemalloc's own bookkeeping and frozen bootstrap frames.
+        return snapshot.filter_traces((
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<unknown>"),
+        ))
+
+    def _record_allocations(self, label):
+        # The profiler's own work is not attributed to the pipeline.
+        if self._running:
+            self._profile.disable()
+        try:
+            snapshot = self._take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            stats = snapshot.compare_to(self._previous_snapshot, "lineno")
+            self._previous_snapshot = snapshot
+            lines = [
+                f"=== {label} ===",
+                f"traced memory: current {current / 1e6:.1f} MB, peak since previous snapshot {peak / 1e6:.1f} MB",
+                f"top {self.top_n} allocation sites since previous snapshot:",
+            ]
+            lines.extend(f"  {stat}" for stat in stats[:self.top_n])
+            self._sections.append("\n".join(lines))
+        finally:
+            if self._running:
+                self._profile.enable()
+
+    def write(self, log_path):
+        """Write `<log stem>.prof` and `<log stem>.alloc.txt` next to `log_path`; return both paths."""
+        prof_path = log_path.with_suffix(".prof")
+        alloc_path = log_path.with_suffix(".alloc.txt")
+        self._profile.dump_stats(str(prof_path))
+        alloc_path.write_text("\n\n".join(self._sections) + "\n", encoding="utf-8")
+        return prof_path, alloc_path
+
+    def print_hot_functions(self):
+        """Print the functions with the highest own (self) time."""
+        stats = pstats.Stats(self._profile).stats
+        rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top_n]
+        print(f"Hot functions (top {len(rows)} by own time):")
+        print(f" {'calls':>10} {'own s':>8} {'total s':>8}  function")
+        for (file_name, line, func_name), (_, calls, own_time, total_time, _) in rows:
+            location = f" ({os.path.basename(file_name)}:{line})" if line else ""
+            print(f" {calls:>10} {own_time:>8.3f} {total_time:>8.3f}  {func_name}{location}")
@@ -0,0 +1,126 @@
+"""Compiled HTML report template, loaded and split into segments once per process."""
+
+import io
+import re
+from functools import lru_cache
+from pathlib import Path
+
+TEMPLATE_FILES = ("chat.html", "style.css", "chat.js")
+
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+_STYLE_LINK = '<link rel="stylesheet" href="style.css">'
+_SCRIPT_TAG = '<script src="chat.js"></script>'
+
+
+class ReportTemplate:
+    """`chat.html` with inlined CSS/JS, pre-split into literal and placeholder segments.
+
+    `segments` is a tuple of `(is_placeholder, text)` pairs; for placeholders `text`
+    is the placeholder name. Rendering walks the segments once and writes each
+    piece directly, instead of running one full-document `str.replace` per placeholder.
+    """
+
+    def __init__(self, html_template, css_content="", js_content=""):
+        """Split the template; CSS/JS are inlined as literals and never scanned for placeholders."""
+        segments = []
+        for part, inline in self._split_inline(html_template, css_content, js_content):
+            if inline:
+                segments.append((False, part))
+                continue
+            position = 0
+            for match in _PLACEHOLDER_RE.finditer(part):
+                segments.append((False, part[position:match.start()]))
+                segments.append((True, match.group(1)))
+                position = match.end()
+            segments.append((False, part[position:]))
+        self.segments = tuple(_merge_literals(segments))
+        self.placeholders = frozenset(text for is_placeholder, text in self.segments if is_placeholder)
+
+    @staticmethod
+    def _split_inline(html_template, css_content, js_content):
+        pending = [(html_template, False)]
+        for tag, replacement in (
+            (_STYLE_LINK, f"<style>{css_content}</style>"),
+            (_SCRIPT_TAG, f"<script>{js_content}</script>"),
+        ):
+            expanded = []
+            for part, inline in pending:
+                if inline or tag not in part:
+                    expanded.append((part, inline))
+                    continue
+                pieces = part.split(tag)
+                for index, piece in enumerate(pieces):
+                    if index:
+                        expanded.append((replacement, True))
+                    expanded.append((piece, False))
+            pending = expanded
+        return pending
+
+    def render_to(self, handle, values):
+        """Write the rendered document to a text file handle.
+
+        A value may be a callable taking the handle, which lets large content
+        (e.g. the message array) be streamed instead of built as one string.
+        Placeholders without a value are written unchanged, like the old `str.replace` chain.
+        """
+        write = handle.write
+        for is_placeholder, text in self.segments:
+            if not is_placeholder:
+                write(text)
+            elif text not in values:
+                write(f"{{{{{text}}}}}")
+            elif callable(values[text]):
+                values[text](handle)
+            else:
+                write(str(values[text]))
+
+    def render(self, values):
+        """Return the rendered document as a string."""
+        buffer = io.StringIO()
+        self.render_to(buffer, values)
+        return buffer.getvalue()
+
+
+def _merge_literals(segments):
+    merged = []
+    for is_placeholder, text in segments:
+        if not is_placeholder and not text:
+            continue
+        if not is_placeholder and merged and not merged[-1][0]:
+            merged[-1] = (False, merged[-1][1] + text)
+        else:
+            merged.append((is_placeholder, text))
+    return merged
+
+
+def load_report_template(templates_folder):
+    """Return the compiled report template for a templates folder.
+
+    Compiled once per process and reused by every exporter of a run; the cache key
+    includes the file sizes and mtimes, so edited templates are picked up.
+    """
+    folder = Path(templates_folder)
+    fingerprint = []
+    for file_name in TEMPLATE_FILES:
+        path = folder / file_name
+        try:
+            stat = path.stat()
+        except OSError:
+            raise FileNotFoundError(f"Template not found: {path}") from None
+        fingerprint.append((stat.st_size, stat.st_mtime_ns))
+    return _compile_cached(str(folder), tuple(fingerprint))
+
+
+def clear_template_cache():
+    """Forget all compiled templates."""
+    _compile_cached.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _compile_cached(folder_text, fingerprint):
+    del fingerprint  # Part of the cache key only.
+    folder = Path(folder_text)
+    html_template, css_content, js_content = (
+        (folder / file_name).read_text(encoding="utf-8") for file_name in TEMPLATE_FILES
+    )
+    return ReportTemplate(html_template, css_content, js_content)
@@ -0,0 +1,101 @@
+"""Inverted word index embedded in reports, so chat.js narrows text searches without a full scan."""
+
+import base64
+import json
+import re
+
+# Word tokens as chat.js splits them: runs of letters, digits and underscores (/[\p{L}\p{N}_]+/gu).
+_TOKEN_PATTERN = re.compile(r"\w+")
+# Longer tokens (URLs, hashes, ...) are indexed by their first characters; chat.js treats terms
+# of this length as possibly holding any text and checks all candidates against the full text.
+MAX_TOKEN_LENGTH = 24
+SEARCH_INDEX_VERSION = 1
+# Bytes per base64 block when writing the postings; a multiple of 3 avoids padding.
+_BASE64_BLOCK_SIZE = 3 * 256 * 1024
+
+
+def tokenize(text):
+    """Return the distinct index tokens of `text`: lowercased words, truncated to MAX_TOKEN_LENGTH."""
+    if not text:
+        return set()
+    return {token[:MAX_TOKEN_LENGTH] for token in _TOKEN_PATTERN.findall(str(text).lower())}
+
+
+def _utf16_order(term):
+    # chat.js compares strings by UTF-16 code units; its binary search needs the same order.
+    return term.encode("utf-16-be")
+
+
+class SearchIndexBuilder:
+    """Collect the words of exported messages into posting lists for the report.
+
+    Messages are numbered in the order they are added, which must be the order of
+    the report's message payload. Every term keeps its postings as varint-encoded
+    gaps between message numbers, about one or two bytes per (term, message) pair.
+    Content and sender are indexed; tags are assigned in the browser and searched there.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        self.count = 0
+        self._postings = {}
+        self._last = {}
+
+    def add(self, msg):
+        """Index the next message of the payload."""
+        number = self.count
+        self.count += 1
+        tokens = tokenize(msg.get("content"))
+        tokens.update(tokenize(msg.get("sender")))
+        postings = self._postings
+        last = self._last
+        for token in tokens:
+            encoded = postings.get(token)
+            if encoded is None:
+                encoded = postings[token] = bytearray()
+                gap = number + 1
+            else:
+                gap = number - last[token]
+            last[token] = number
+            while gap >= 0x80:
+                encoded.append((gap & 0x7F) | 0x80)
+                gap >>= 7
+            encoded.append(gap)
+
+    def write_json(self, out):
+        """Write the index as a JSON object to the text stream `out`.
+
+        Layout: `terms` sorted by UTF-16 code units, `lengths` the byte length of each
+        term's postings, `postings` all posting bytes concatenated in term order, base64.
+        """
+        terms = sorted(self._postings, key=_utf16_order)
+        data = b"".join(self._postings[term] for term in terms)
+        out.write(
+            f'{{"version": {SEARCH_INDEX_VERSION}, "count": {self.count}, '
+            f'"max_token_length": {MAX_TOKEN_LENGTH}, "terms": '
+        )
+        out.write(json.dumps(terms, ensure_ascii=False))
+        out.write(', "lengths": ')
+        out.write(json.dumps([len(self._postings[term]) for term in terms]))
+        out.write(', "postings": "')
+        view = memoryview(data)
+        for start in range(0, len(data), _BASE64_BLOCK_SIZE):
+            out.write(base64.b64encode(view[start:start + _BASE64_BLOCK_SIZE]).decode("ascii"))
+        out.write('"}')
+
+    def term_postings(self, term):
+        """Return the message numbers of one term (mainly for tests and debugging)."""
+        numbers = []
+        current = -1
+        gap = 0
+        shift = 0
+        for byte in self._postings.get(term, b""):
+            gap |= (byte & 0x7F) << shift
+            if byte & 0x80:
+                shift += 7
+                continue
+            current += gap
+            numbers.append(current)
+            gap = 0
+            shift = 0
+        return numbers
@@ -1,11 +1,28 @@
 """Helpers for split-by-chat HTML exports."""
 
+import hashlib
+import json
 import re
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import datetime
 
-from exporter import BubblyExporter
+# Module import: exporter itself imports utils, so BubblyExporter may not exist yet at import time.
+import exporter as exporter_module
 
 from .index_report import write_split_index
+from .media_store import ContentMediaStore
+from .message_store import MessageStore
+from .metrics import RunMetrics
+from .summary import MessageSummary
+from .tracing import TraceRecorder, active_recorder, trace_span
+
+# Per-chat content digests of the last export, used by incremental re-exports.
+MANIFEST_NAME = "bubbly_manifest.json"
+MANIFEST_VERSION = 2
+# Exporter options that change how fast a report is written, not what it contains; not part of the digest.
+_UNRENDERED_OPTIONS = ("media_workers", "sort_memory_mb")
 
 
 def safe_slug(value, fallback="chat"):
@@ -17,7 +34,12 @@ def safe_slug(value, fallback="chat"):
 
 
 def group_messages_by_chat(messages, default_chat_name):
-    """Group parsed messages by chat label."""
+    """Group parsed messages by chat label.
+
+    A MessageStore is grouped in SQLite; its groups are timestamp-ordered views, not lists.
+    """
+    if isinstance(messages, MessageStore):
+        return messages.chat_groups(default_chat_name)
     groups = {}
     for msg in messages:
         chat_name = str(msg.get("chat") or default_chat_name or "Chat").strip() or "Chat"
@@ -25,15 +47,127 @@ def group_messages_by_chat(messages, default_chat_name):
     return groups
 
 
-def export_split_by_chat(messages, metadata, media_folder, output_folder, logo_path, safe_case):
-    """Export one HTML report per chat and create a top-level index file."""
+def _load_manifest(output_folder):
+    path = output_folder / MANIFEST_NAME
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+        return {}
+    reports = data.get("reports")
+    return reports if isinstance(reports, dict) else {}
+
+
+def _write_manifest(output_folder, reports):
+    path = output_folder / MANIFEST_NAME
+    payload = {"version": MANIFEST_VERSION, "reports": reports}
+    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def _chat_digest(chat_messages, chat_meta, render_settings):
+    """Hash everything a chat report is rendered from: messages, metadata and export settings."""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([chat_meta, render_settings], sort_keys=True, default=str).encode("utf-8"))
+    for msg in chat_messages:
+        digest.update(b"\n")
+        digest.update(json.dumps(dict(msg), sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _remove_stale_report(split_output_folder, file_name):
+    report_path = split_output_folder / file_name
+    for path in (report_path, report_path.with_suffix(".json")):
+        if path.is_file():
+            path.unlink()
+    data_folder = split_output_folder / "data" / report_path.stem
+    if data_folder.is_dir():
+        shutil.rmtree(data_folder)
+
+
+def _export_chat(chat_name, chat_messages, file_name, chat_meta, media_folder, split_output_folder,
+                 logo_path, exporter_options, metrics=None):
+    """Export one chat report; return its index entry and a summary of its messages."""
+    summary = MessageSummary()
+    with trace_span("export_chat", "chat", chat=chat_name, messages=len(chat_messages)):
+        exporter = exporter_module.BubblyExporter(
+            chat_messages,
+            media_folder,
+            split_output_folder,
+            chat_meta,
+            logo_path=logo_path,
+            summary=summary,
+            metrics=metrics,
+            **exporter_options,
+        )
+        exporter.export_html(output_html_name=file_name)
+    # Counted from the summary, which saw the final media names; `chat_messages` may be re-read from a store.
+    media_count = len([name for name in summary.media_files if not name.startswith("missing:")])
+    report = {
+        "chat_name": chat_name,
+        "file_name": file_name,
+        "message_count": len(chat_messages),
+        "media_count": media_count,
+    }
+    return report, summary
+
+
+def _export_chat_in_worker(task):
+    """Process-pool entry point; reopens the media store, which cannot be pickled."""
+    *chat_args, exporter_options = task
+    exporter_options = dict(exporter_options)
+    store_root = exporter_options.pop("media_store_root", None)
+    trace_origin = exporter_options.pop("trace_origin_ns", None)
+    metrics = RunMetrics()
+    tracer = TraceRecorder(trace_origin) if trace_origin is not None else None
+    with tracer or nullcontext():
+        if store_root is None:
+            report, summary = _export_chat(*chat_args, exporter_options, metrics)
+            return report, summary, metrics, tracer, (0, 0)
+        with ContentMediaStore(store_root) as media_store:
+            exporter_options["media_store"] = media_store
+            report, summary = _export_chat(*chat_args, exporter_options, metrics)
+            return report, summary, metrics, tracer, (media_store.hashed_count, media_store.stored_count)
+
+
+def export_split_by_chat(
+    messages,
+    metadata,
+    media_folder,
+    output_folder,
+    logo_path,
+    safe_case,
+    summary=None,
+    jobs=None,
+    incremental=False,
+    metrics=None,
+    **exporter_options,
+):
+    """Export one HTML report per chat and create a top-level index file.
+
+    `messages` may be any iterable (e.g. a parser stream); it is consumed once.
+    A MessageStore is read back per chat, in timestamp order.
+    If `summary` is given, every exported message is recorded in it.
+    With `jobs` > 1 chats are exported in a process pool; file names, media
+    targets and index order stay the same as for a sequential export.
+    With `incremental`, a manifest of per-chat digests and summaries in `output_folder` is
+    compared with the previous export: unchanged reports are kept as they are,
+    changed ones are rewritten (reusing media files already in place), reports
+    of chats that no longer exist are removed, and the index is rebuilt.
+    If `metrics` (a RunMetrics) is given, the exporter stages of every chat are
+    added to it; with worker processes their times are summed over the workers.
+    `exporter_options` (e.g. media_workers) are passed to each BubblyExporter.
+    """
+    if metrics is None:
+        metrics = RunMetrics()
     chat_groups = group_messages_by_chat(messages, metadata.get("chat_name"))
     used_names = set()
-    reports = []
     split_folder_name = "reports"
     split_output_folder = output_folder / split_folder_name
     split_output_folder.mkdir(parents=True, exist_ok=True)
 
+    # File names are assigned up front in chat order so collisions resolve the same way for any job count.
+    tasks = []
     for chat_name, chat_messages in chat_groups.items():
         chat_slug = safe_slug(chat_name, "chat")
         base_name = f"{safe_case}_{chat_slug}"
@@ -47,40 +181,113 @@ def export_split_by_chat(messages, metadata, media_folder, output_folder, logo_p
         chat_meta = dict(metadata)
         chat_meta["chat_name"] = chat_name
         chat_meta["index_href"] = f"../{safe_case}_index.html"
-        exporter = BubblyExporter(
-            chat_messages,
-            media_folder,
-            split_output_folder,
-            chat_meta,
-            logo_path=logo_path,
-        )
-        exporter.export_html(output_html_name=file_name)
-        media_count = len(
-            {
-                str(msg.get("media") or "").strip()
-                for msg in chat_messages
-                if str(msg.get("media") or "").strip()
-                and not str(msg.get("media") or "").strip().startswith("missing:")
-            }
-        )
-        reports.append(
-            {
-                "chat_name": chat_name,
-                "file_name": file_name,
-                "file_href": f"{split_folder_name}/{file_name}",
-                "message_count": len(chat_messages),
-                "media_count": media_count,
-            }
+        tasks.append((chat_name, chat_messages, file_name, chat_meta, media_folder, split_output_folder, logo_path))
+
+    previous_manifest = _load_manifest(output_folder) if incremental else {}
+    manifest = {}
+    kept_reports = {}
+    kept_summaries = {}
+    if incremental:
+        exporter_options = {**exporter_options, "reuse_existing_media": True}
+        render_settings = {
+            "version": exporter_module.BUBBLY_VERSION,
+            "logo": str(logo_path or ""),
+            "options": {
+                key: (str(value.root) if key == "media_store" and value is not None else value)
+                for key, value in exporter_options.items()
+                if key not in _UNRENDERED_OPTIONS
+            },
+        }
+        changed_tasks = []
+        for task in tasks:
+            chat_name, chat_messages, file_name, chat_meta = task[:4]
+            digest = _chat_digest(chat_messages, chat_meta, render_settings)
+            previous = previous_manifest.get(file_name) or {}
+            if (
+                previous.get("digest") == digest
+                and previous.get("chat_name") == chat_name
+                and (split_output_folder / file_name).is_file()
+            ):
+                kept_reports[file_name] = {
+                    "chat_name": chat_name,
+                    "file_name": file_name,
+                    "message_count": previous.get("message_count", len(chat_messages)),
+                    "media_count": previous.get("media_count", 0),
+                }
+                # The stored summary saw the exported media names, unlike the raw parser messages.
+                kept_summaries[file_name] = MessageSummary.from_dict(previous.get("summary") or {})
+            else:
+                changed_tasks.append(task)
+            manifest[file_name] = {"chat_name": chat_name, "digest": digest}
+        for file_name in sorted(set(previous_manifest) - set(manifest)):
+            _remove_stale_report(split_output_folder, file_name)
+        print(
+            f"Incremental export: {len(kept_reports)} unchanged, {len(changed_tasks)} to write, "
+            f"{len(set(previous_manifest) - set(manifest))} removed"
         )
+        tasks_to_export = changed_tasks
+    else:
+        tasks_to_export = tasks
+
+    jobs = max(1, int(jobs or 1))
+    media_store = exporter_options.get("media_store")
+    if jobs > 1 and len(tasks_to_export) > 1:
+        worker_options = dict(exporter_options)
+        worker_options.pop("media_store", None)
+        if media_store is not None:
+            worker_options["media_store_root"] = str(media_store.root)
+        tracer = active_recorder()
+        if tracer is not None:
+            worker_options["trace_origin_ns"] = tracer.origin_ns
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks_to_export))) as executor:
+            results = list(executor.map(
+                _export_chat_in_worker,
+                [task + (worker_options,) for task in tasks_to_export],
+            ))
+        for _, _, chat_metrics, chat_tracer, (hashed_count, stored_count) in results:
+            metrics.merge(chat_metrics)
+            if chat_tracer is not None:
+                tracer.merge(chat_tracer)
+            if media_store is not None:
+                media_store.hashed_count += hashed_count
+                media_store.stored_count += stored_count
+        results = [(report, chat_summary) for report, chat_summary, *_ in results]
+    else:
+        results = [_export_chat(*task, exporter_options, metrics) for task in tasks_to_export]
+
+    exported_reports = {}
+    chat_summaries = dict(kept_summaries)
+    for report, chat_summary in results:
+        exported_reports[report["file_name"]] = report
+        chat_summaries[report["file_name"]] = chat_summary
+
+    # Index order follows the chat order, whether a report was kept or rewritten.
+    reports = []
+    for task in tasks:
+        file_name = task[2]
+        report = exported_reports.get(file_name) or kept_reports[file_name]
+        report["file_href"] = f"{split_folder_name}/{file_name}"
+        reports.append(report)
+        if summary is not None:
+            summary.merge(chat_summaries[file_name])
+        if incremental:
+            manifest[file_name].update(
+                message_count=report["message_count"],
+                media_count=report["media_count"],
+                summary=chat_summaries[file_name].to_dict(),
+            )
+    if incremental:
+        _write_manifest(output_folder, manifest)
 
     if reports:
-        write_split_index(
-            output_folder,
-            safe_case,
-            reports,
-            metadata.get("case"),
-            creator=metadata.get("user"),
-            logo_path=logo_path,
-            created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        )
+        with metrics.stage("index_write", items=len(reports)):
+            write_split_index(
+                output_folder,
+                safe_case,
+                reports,
+                metadata.get("case"),
+                creator=metadata.get("user"),
+                logo_path=logo_path,
+                created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            )
         print(f"Index saved to {output_folder / f'{safe_case}_index.html'}")
@@ -1,73 +1,89 @@
 """CLI summary output helpers."""
 
+from .mime_detection import media_category
+
 
 def _media_category(message):
     media = str(message.get("media") or "").strip()
     if media.startswith("missing:"):
         return "missing"
+    return media_category(message.get("media_mime"), media)
 
-    mime = str(message.get("media_mime") or "").lower().strip()
-    if mime.startswith("image/"):
-        return "image"
-    if mime.startswith("video/"):
-        return "video"
-    if mime.startswith("audio/"):
-        return "audio"
-    if mime in {
-        "application/pdf",
-        "application/msword",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        "application/vnd.ms-excel",
-        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-    }:
-        return "document"
 
-    ext = media.rsplit(".", 1)[-1].lower() if "." in media else ""
-    if ext in {"jpg", "jpeg", "png", "gif", "webp"}:
-        return "image"
-    if ext in {"mp4", "mov", "webm", "3gp"}:
-        return "video"
-    if ext in {"mp3", "wav", "m4a", "aac", "opus", "ogg"}:
-        return "audio"
-    if ext in {"pdf", "doc", "docx", "xls", "xlsx"}:
-        return "document"
-    return "other"
+class MessageSummary:
+    """Accumulate CLI summary counters from a message stream in a single pass."""
 
+    def __init__(self):
+        """Initialize empty counters."""
+        self.total_messages = 0
+        self.chats = set()
+        self.media_files = {}
 
-def print_cli_summary(messages, metadata):
-    """Print a concise summary of parsed messages and media categories."""
-    total_messages = len(messages or [])
-    default_chat = str((metadata or {}).get("chat_name") or "Chat").strip() or "Chat"
-    chats = {
-        str(msg.get("chat") or default_chat).strip() or default_chat
-        for msg in (messages or [])
-    }
-    media_files = {}
-    for msg in (messages or []):
-        media = msg.get("media")
+    def add(self, message):
+        """Record one message."""
+        self.total_messages += 1
+        self.chats.add(str(message.get("chat") or "").strip())
+        media = message.get("media")
         if not media:
-            continue
+            return
         media_text = str(media).strip()
-        if not media_text:
-            continue
-        if media_text not in media_files:
-            media_files[media_text] = _media_category(msg)
+        if media_text and media_text not in self.media_files:
+            self.media_files[media_text] = _media_category(message)
+
+    def to_dict(self):
+        """Return the counters as JSON-serializable data (e.g. for the split-export manifest)."""
+        return {
+            "total_messages": self.total_messages,
+            "chats": sorted(self.chats),
+            "media_files": dict(self.media_files),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a summary from `to_dict` data."""
+        summary = cls()
+        summary.total_messages = int(data.get("total_messages") or 0)
+        summary.chats = set(data.get("chats") or ())
+        summary.media_files = dict(data.get("media_files") or {})
+        return summary
 
-    found_media_files = {name for name in media_files if not name.startswith("missing:")}
-    media_type_counts = {"audio": 0, "video": 0, "image": 0, "document": 0, "other": 0, "missing": 0}
-    for category in media_files.values():
-        media_type_counts[category] += 1
+    def merge(self, other):
+        """Add the counters of another summary (e.g. from a split-export worker)."""
+        self.total_messages += other.total_messages
+        self.chats.update(other.chats)
+        for name, category in other.media_files.items():
+            self.media_files.setdefault(name, category)
 
-    print("Summary:")
-    print(f" - Messages: {total_messages}")
-    print(f" - Chats: {len(chats)}")
-    print(f" - Found media files: {len(found_media_files)}")
-    print(
-        " - Media by type: "
-        f"audio={media_type_counts['audio']}, "
-        f"video={media_type_counts['video']}, "
-        f"image={media_type_counts['image']}, "
-        f"document={media_type_counts['document']}, "
-        f"other={media_type_counts['other']}, "
-        f"missing={media_type_counts['missing']}"
-    )
+    def print_summary(self, metadata, metrics=None):
+        """Print the accumulated summary, followed by stage timings if `metrics` is given."""
+        default_chat = str((metadata or {}).get("chat_name") or "Chat").strip() or "Chat"
+        chats = {chat or default_chat for chat in self.chats}
+        found_media_files = {name for name in self.media_files if not name.startswith("missing:")}
+        media_type_counts = {"audio": 0, "video": 0, "image": 0, "document": 0, "other": 0, "missing": 0}
+        for category in self.media_files.values():
+            media_type_counts[category] += 1
+
+        print("Summary:")
+        print(f" - Messages: {self.total_messages}")
+        print(f" - Chats: {len(chats)}")
+        print(f" - Found media files: {len(found_media_files)}")
+        print(
+            " - Media by type: "
+            f"audio={media_type_counts['audio']}, "
+            f"video={media_type_counts['video']}, "
+            f"image={media_type_counts['image']}, "
+            f"document={media_type_counts['document']}, "
+            f"other={media_type_counts['other']}, "
+            f"missing={media_type_counts['missing']}"
+        )
+        if metrics is not None:
+            metrics.print_summary()
+
+
+def print_cli_summary(messages, metadata, metrics=None):
+    """Print a concise summary of parsed messages and media categories."""
+    summary = MessageSummary()
+    for msg in (messages or []):
+        summary.add(msg)
+    summary.print_summary(metadata, metrics=metrics)
+    return summary
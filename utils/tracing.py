@@ -0,0 +1,121 @@
+"""Chrome Trace Event recording for a Bubbly run (`--trace`).
+
+The resulting JSON loads in Perfetto (ui.perfetto.dev) or chrome://tracing. Code marks
+work with `trace_span(...)`, which does nothing unless a TraceRecorder is active.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_active_recorder = None
+
+
+class TraceRecorder:
+    """Collect complete ("X") trace events, tagged with process and thread id.
+
+    Timestamps are microseconds since `origin_ns` on the monotonic `perf_counter`
+    clock, which is shared between processes; split-export workers create a recorder
+    with the parent's origin and their events are added with `merge`.
+    """
+
+    def __init__(self, origin_ns=None):
+        """Initialize an empty recorder; `origin_ns` defaults to now."""
+        self.origin_ns = time.perf_counter_ns() if origin_ns is None else origin_ns
+        self.events = []
+        self._thread_names = {}
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        """Activate the recorder for the duration of a with block."""
+        self.activate()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        """Deactivate the recorder."""
+        self.deactivate()
+        return False
+
+    def activate(self):
+        """Make this the recorder used by `trace_span`."""
+        global _active_recorder
+        _active_recorder = self
+
+    def deactivate(self):
+        """Stop recording if this is the active recorder."""
+        global _active_recorder
+        if _active_recorder is self:
+            _active_recorder = None
+
+    def add_span(self, name, category, start_ns, end_ns, args=None):
+        """Record a finished span of the current thread."""
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start_ns - self.origin_ns) / 1000,
+            "dur": (end_ns - start_ns) / 1000,
+            "pid": os.getpid(),
+            "tid": thread.ident,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self.events.append(event)
+            self._thread_names.setdefault((os.getpid(), thread.ident), thread.name)
+
+    def merge(self, other):
+        """Add the events (and thread names) recorded by another recorder."""
+        with self._lock:
+            self.events.extend(other.events)
+            for key, name in other._thread_names.items():
+                self._thread_names.setdefault(key, name)
+
+    def to_dict(self):
+        """Return the trace in Chrome Trace Event format."""
+        main_pid = os.getpid()
+        metadata = []
+        for pid in sorted({pid for pid, _ in self._thread_names}):
+            process_name = "bubbly" if pid == main_pid else f"bubbly worker {pid}"
+            metadata.append({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": process_name}})
+        for (pid, tid), name in self._thread_names.items():
+            metadata.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}})
+        return {"traceEvents": metadata + self.events, "displayTimeUnit": "ms"}
+
+    def write(self, path):
+        """Write the trace JSON to `path`."""
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(self.to_dict(), handle, ensure_ascii=False)
+
+    def __getstate__(self):
+        """Pickle without the lock (recorders are returned from worker processes)."""
+        state = dict(self.__dict__)
+        state.pop("_lock", None)
+        return state
+
+    def __setstate__(self, state):
+        """Restore a pickled recorder with a fresh lock."""
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+
+def active_recorder():
+    """Return the active TraceRecorder, or None when tracing is off."""
+    return _active_recorder
+
+
+@contextmanager
+def trace_span(name, category="bubbly", **args):
+    """Record the enclosed block as a span if a TraceRecorder is active."""
+    recorder = _active_recorder
+    if recorder is None:
+        yield
+        return
+    start_ns = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        recorder.add_span(name, category, start_ns, time.perf_counter_ns(), args)